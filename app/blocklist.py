@@ -0,0 +1,281 @@
+import bisect
+import logging
+import os
+import threading
+from collections import deque
+from typing import Iterable, Optional
+from urllib.parse import unquote, urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Schemes the WHATWG URL parser treats as "special" (backslashes act as slashes).
+_SPECIAL_SCHEMES = frozenset({"http", "https", "ws", "wss", "ftp"})
+_C0_AND_SPACE = "".join(chr(code) for code in range(0x21))
+_TAB_AND_NEWLINE = str.maketrans("", "", "\t\n\r")
+
+
+def normalize_url(url: str) -> tuple[str, str]:
+    """Return the ``(host, path)`` a browser would request for ``url``.
+
+    Follows the WHATWG URL parser where it differs from ``urlsplit``: tabs and
+    newlines are dropped, backslashes count as slashes, any number of slashes
+    may follow the scheme, and the host is percent-decoded, lowercased and
+    IDNA-encoded. The path is percent-decoded with empty and dot segments
+    removed, as a server resolving it would. Raises ``ValueError`` for URLs
+    ``urlsplit`` rejects.
+    """
+    url = url.strip(_C0_AND_SPACE).translate(_TAB_AND_NEWLINE)
+    scheme, colon, rest = url.partition(":")
+    if not colon or scheme.lower() not in _SPECIAL_SCHEMES:
+        parts = urlsplit(url)
+        return _canonical_host(parts.hostname or ""), _normalize_path(parts.path)
+    rest = rest.replace("\\", "/").lstrip("/")
+    end = min((index for index in map(rest.find, "/?#") if index != -1), default=len(rest))
+    host = rest[:end].rpartition("@")[2]
+    if host.startswith("["):
+        host = host[1:host.find("]")]
+    else:
+        host = host.partition(":")[0]
+    path = rest[end:]
+    for delimiter in "?#":
+        path = path.partition(delimiter)[0]
+    return _canonical_host(unquote(host)), _normalize_path(path)
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher; one pass over the text regardless of pattern count."""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[Optional[str]] = [None]
+        for pattern in patterns:
+            if pattern:
+                self._add(pattern)
+        self._build()
+
+    def __bool__(self) -> bool:
+        return len(self._goto) > 1
+
+    def search(self, text: str) -> Optional[str]:
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state] is not None:
+                return output[state]
+        return None
+
+    def _add(self, pattern: str):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+            state = next_state
+        self._output[state] = pattern
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                # Report the shorter pattern ending here if this state has none of its own.
+                if self._output[next_state] is None:
+                    self._output[next_state] = self._output[self._fail[next_state]]
+
+
+class BlocklistIndex:
+    """Immutable, compiled blocklist.
+
+    * ``example.com`` blocks the domain and every subdomain. Lookups walk the
+      host's label suffixes (``a.b.example.com``, ``b.example.com``, ...)
+      against a set, so cost depends on the number of labels, not entries.
+    * ``=host.example.com`` blocks that exact host only.
+    * ``prefix:host.example.com/path`` blocks URLs on that host whose path
+      starts with ``/path``; prefixes are kept sorted per host with redundant
+      longer prefixes removed, so a single bisect finds the only candidate.
+    * ``contains:text`` blocks URLs containing ``text`` (case-insensitive),
+      matched with Aho-Corasick against the URL as given and percent-decoded.
+
+    Hosts and paths are compared after ``normalize_url``, so spellings that
+    browsers resolve to a blocked destination are blocked too.
+    """
+
+    def __init__(
+        self,
+        domains: Iterable[str] = (),
+        exact_hosts: Iterable[str] = (),
+        prefixes: Iterable[tuple[str, str]] = (),
+        patterns: Iterable[str] = (),
+    ):
+        patterns = frozenset(pattern.lower() for pattern in patterns)
+        self._domains = frozenset(domains)
+        self._exact_hosts = frozenset(exact_hosts)
+        self._prefixes = _compile_prefixes(prefixes)
+        self._patterns = AhoCorasick(patterns)
+        self.size = (
+            len(self._domains)
+            + len(self._exact_hosts)
+            + sum(len(paths) for paths in self._prefixes.values())
+            + len(patterns)
+        )
+
+    def check(self, url: str) -> Optional[str]:
+        """Return the matching rule if ``url`` is blocked, otherwise ``None``."""
+        try:
+            host, path = normalize_url(url)
+        except ValueError:
+            return None
+
+        if host:
+            if host in self._exact_hosts:
+                return f"={host}"
+            domains = self._domains
+            if domains:
+                if host in domains:
+                    return host
+                index = host.find(".")
+                while index != -1:
+                    suffix = host[index + 1:]
+                    if suffix in domains:
+                        return suffix
+                    index = host.find(".", index + 1)
+
+            paths = self._prefixes.get(host)
+            if paths:
+                position = bisect.bisect_right(paths, path)
+                if position and path.startswith(paths[position - 1]):
+                    return f"prefix:{host}{paths[position - 1]}"
+
+        if self._patterns:
+            lowered = url.lower()
+            match = self._patterns.search(lowered)
+            if match is None and "%" in lowered:
+                match = self._patterns.search(unquote(lowered))
+            if match is not None:
+                return f"contains:{match}"
+        return None
+
+
+def parse_blocklist(lines: Iterable[str]) -> BlocklistIndex:
+    domains, exact_hosts, prefixes, patterns = set(), set(), [], set()
+    for line in lines:
+        entry = line.strip()
+        if not entry or entry.startswith("#"):
+            continue
+        if entry.startswith("contains:"):
+            patterns.add(entry[len("contains:"):])
+        elif entry.startswith("prefix:"):
+            target = entry[len("prefix:"):]
+            if "://" not in target:
+                target = "http://" + target
+            try:
+                host, path = normalize_url(target)
+            except ValueError:
+                continue
+            if host:
+                prefixes.append((host, path))
+        elif entry.startswith("="):
+            exact_hosts.add(_normalize_host(entry[1:]))
+        else:
+            domains.add(_normalize_host(entry))
+    return BlocklistIndex(domains, exact_hosts, prefixes, patterns)
+
+
+class Blocklist:
+    """Holds the active ``BlocklistIndex`` and swaps in a new one on reload.
+
+    Reloads compile the new index off to the side and replace the reference
+    in one assignment, so requests never wait on a reload.
+    """
+
+    def __init__(self, path: Optional[str] = None, check_on_redirect: bool = False):
+        self.path = path
+        self.check_on_redirect = check_on_redirect
+        self.index = BlocklistIndex()
+        self._mtime: Optional[float] = None
+        self._reload_lock = threading.Lock()
+
+    def check(self, url: str) -> Optional[str]:
+        return self.index.check(url)
+
+    def load(self, lines: Iterable[str]):
+        self.index = parse_blocklist(lines)
+
+    def reload(self) -> bool:
+        if not self.path:
+            return False
+        with self._reload_lock:
+            mtime = os.stat(self.path).st_mtime
+            with open(self.path, encoding="utf-8") as handle:
+                index = parse_blocklist(handle)
+            self.index = index
+            self._mtime = mtime
+        logger.info("Loaded %d blocklist entries from %s", index.size, self.path)
+        return True
+
+    def reload_if_changed(self) -> bool:
+        if not self.path:
+            return False
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            logger.warning("Blocklist file %s not found", self.path)
+            return False
+        if mtime == self._mtime:
+            return False
+        return self.reload()
+
+
+def _normalize_host(host: str) -> str:
+    return _canonical_host(host.strip().lstrip("*."))
+
+
+def _canonical_host(host: str) -> str:
+    host = host.lower().rstrip(".")
+    try:
+        return host.encode("idna").decode("ascii")
+    except UnicodeError:
+        return host
+
+
+def _normalize_path(path: str) -> str:
+    segments: list[str] = []
+    for segment in unquote(path).split("/"):
+        if segment in ("", "."):
+            continue
+        if segment == "..":
+            if segments:
+                segments.pop()
+            continue
+        segments.append(segment)
+    trailing = "/" if segments and path.endswith("/") else ""
+    return "/" + "/".join(segments) + trailing
+
+
+def _compile_prefixes(prefixes: Iterable[tuple[str, str]]) -> dict[str, tuple[str, ...]]:
+    by_host: dict[str, list[str]] = {}
+    for host, path in prefixes:
+        by_host.setdefault(host.lower(), []).append(path)
+    compiled = {}
+    for host, paths in by_host.items():
+        kept: list[str] = []
+        for path in sorted(set(paths)):
+            # Sorted order puts a prefix right before the paths it covers.
+            if kept and path.startswith(kept[-1]):
+                continue
+            kept.append(path)
+        compiled[host] = tuple(kept)
+    return compiled
@@ -1,19 +1,31 @@
 import os
-from sqlalchemy import create_engine
+from pathlib import Path
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
 from typing import Optional
 from app.models.url import Base
+from app.models.api_key import APIKeyModel  # noqa: F401 - registers the table on Base
+from app.models.url_event import URLEventModel  # noqa: F401 - registers the table on Base
+from app.models.link_health import LinkHealthModel  # noqa: F401 - registers the table on Base
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+# Serializes migration runs when several app instances start at once (PostgreSQL only).
+_MIGRATION_LOCK_ID = 7_301_948_211
 
 
 class DatabaseConfig:
-    def __init__(self):
+    def __init__(self, connection_string: Optional[str] = None):
         self.host = os.getenv("DB_HOST", "localhost")
         self.port = int(os.getenv("DB_PORT", "5432"))
         self.database = os.getenv("DB_NAME", "urlshortener")
         self.user = os.getenv("DB_USER", "postgres")
         self.password = os.getenv("DB_PASSWORD", "password")
-        self.connection_string = f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
+        self.connection_string = (
+            connection_string
+            or f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
+        )
 
 
 class DatabaseConnection:
@@ -43,9 +55,9 @@ class DatabaseConnection:
         Base.metadata.create_all(bind=self.engine)
 
     def execute_migration(self, migration_sql: str):
-        with self.engine.connect() as connection:
-            connection.execute(migration_sql)
-            connection.commit()
+        with self.engine.begin() as connection:
+            for statement in split_statements(migration_sql):
+                connection.exec_driver_sql(statement)
 
 
 def create_database_connection() -> DatabaseConnection:
@@ -53,5 +65,96 @@ def create_database_connection() -> DatabaseConnection:
     return DatabaseConnection(config)
 
 
+def create_shard_connections(connection_strings: list[str]) -> list[DatabaseConnection]:
+    return [DatabaseConnection(DatabaseConfig(connection_string)) for connection_string in connection_strings]
+
+
+def split_statements(sql: str) -> list[str]:
+    """Split a migration file into statements; the files hold no function bodies."""
+    lines = [line for line in sql.splitlines() if not line.lstrip().startswith("--")]
+    return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+
+def list_migrations(migrations_dir: Path = MIGRATIONS_DIR) -> list[tuple[int, Path]]:
+    """Return ``(version, path)`` for each ``NNN_name.sql`` file, in version order."""
+    return sorted((int(path.name.split("_", 1)[0]), path) for path in migrations_dir.glob("[0-9]*_*.sql"))
+
+
+def apply_sql_migrations(db_connection: DatabaseConnection, migrations_dir: Path = MIGRATIONS_DIR) -> list[int]:
+    """Apply the migration files not yet recorded in ``schema_migrations``, in order.
+
+    A database without ``schema_migrations`` but with a ``urls`` table predates
+    version tracking and is taken to be at version 1; an empty database gets the
+    current schema from the models and every version recorded as applied.
+    Returns the versions applied.
+    """
+    migrations = list_migrations(migrations_dir)
+    applied: list[int] = []
+    with db_connection.engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.exec_driver_sql(f"SELECT pg_advisory_xact_lock({_MIGRATION_LOCK_ID})")
+        tables = set(inspect(connection).get_table_names())
+        connection.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, "
+            "name VARCHAR(255) NOT NULL, "
+            "applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP)"
+        )
+        done = {row[0] for row in connection.exec_driver_sql("SELECT version FROM schema_migrations")}
+        if not done:
+            if "urls" in tables:
+                done = {version for version, _ in migrations[:1]}
+            else:
+                Base.metadata.create_all(bind=connection)
+                done = {version for version, _ in migrations}
+            _record_versions(connection, [(version, path) for version, path in migrations if version in done])
+        for version, path in migrations:
+            if version in done:
+                continue
+            for statement in split_statements(path.read_text()):
+                connection.exec_driver_sql(statement)
+            _record_versions(connection, [(version, path)])
+            applied.append(version)
+    return applied
+
+
+def add_missing_columns(db_connection: DatabaseConnection) -> list[str]:
+    """Create missing tables, then add model columns and indexes missing from existing ones.
+
+    Used instead of the SQL files on databases other than PostgreSQL.
+    Returns the ``table.column`` names added.
+    """
+    added: list[str] = []
+    with db_connection.engine.begin() as connection:
+        Base.metadata.create_all(bind=connection)
+        inspector = inspect(connection)
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=connection.dialect)
+                    connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+                    added.append(f"{table.name}.{column.name}")
+            for index in table.indexes:
+                index.create(bind=connection, checkfirst=True)
+    return added
+
+
 def run_migrations(db_connection: DatabaseConnection):
-    db_connection.create_tables()
+    """Bring the schema up to date.
+
+    The files in ``migrations/`` are written for PostgreSQL. Other databases
+    (SQLite in tests and local development) are synced from the models instead.
+    """
+    if db_connection.engine.dialect.name == "postgresql":
+        apply_sql_migrations(db_connection)
+    else:
+        add_missing_columns(db_connection)
+
+
+def _record_versions(connection, migrations: list[tuple[int, Path]]):
+    for version, path in migrations:
+        connection.execute(
+            text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+            {"version": version, "name": path.name},
+        )
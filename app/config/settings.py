@@ -2,6 +2,35 @@ import os
 from typing import Optional
 
 
+def parse_shard_urls(value: str) -> dict[int, str]:
+    """Parse ``DB_SHARD_URLS`` into ``{slot: url}``.
+
+    Entries may be written as ``<slot>=<url>``; unprefixed entries take their
+    position in the list as the slot.
+    """
+    shards: dict[int, str] = {}
+    entries = [entry.strip() for entry in value.split(",") if entry.strip()]
+    for position, entry in enumerate(entries):
+        prefix, _, url = entry.partition("=")
+        if prefix.strip().isdigit():
+            slot = int(prefix)
+        else:
+            slot, url = position, entry
+        if slot in shards:
+            raise ValueError(f"Duplicate shard slot {slot} in DB_SHARD_URLS")
+        shards[slot] = url.strip()
+    return shards
+
+
+def parse_shard_rings(value: str) -> list[list[int]]:
+    """Parse ``DB_SHARD_PREVIOUS_SLOTS``: rings separated by ``;``, slots by ``,``."""
+    return [
+        [int(slot) for slot in ring.split(",") if slot.strip()]
+        for ring in value.split(";")
+        if ring.strip()
+    ]
+
+
 class Settings:
     def __init__(self):
         self.debug = os.getenv("DEBUG", "False").lower() == "true"
@@ -15,11 +44,92 @@ class Settings:
         self.db_name = os.getenv("DB_NAME", "urlshortener")
         self.db_user = os.getenv("DB_USER", "postgres")
         self.db_password = os.getenv("DB_PASSWORD", "password")
+
+        # Repository implementation: "orm" or "core" (SQLAlchemy Core with cached statements)
+        self.repository_mode = os.getenv("REPOSITORY_MODE", "orm").lower()
+
+        # Sharding settings (comma-separated "<slot>=<url>" entries, one per shard)
+        shards = parse_shard_urls(os.getenv("DB_SHARD_URLS", ""))
+        self.db_shard_slots: list[int] = list(shards)
+        self.db_shard_urls: list[str] = list(shards.values())
+        # Slots of each earlier ring, newest first ("0,1,2;0,1"); lookups that
+        # miss on the current owner fall back to the owner in each of them.
+        self.db_shard_previous_rings: list[list[int]] = parse_shard_rings(os.getenv("DB_SHARD_PREVIOUS_SLOTS", ""))
         
         # URL shortening settings
         self.short_code_length = int(os.getenv("SHORT_CODE_LENGTH", "6"))
         self.max_url_length = int(os.getenv("MAX_URL_LENGTH", "2048"))
+
+        # Lookup cache settings (TTL of 0 disables the cache)
+        self.lookup_cache_ttl = float(os.getenv("LOOKUP_CACHE_TTL", "30"))
+        self.lookup_cache_refresh_ahead = float(os.getenv("LOOKUP_CACHE_REFRESH_AHEAD", "5"))
+        self.lookup_cache_max_entries = int(os.getenv("LOOKUP_CACHE_MAX_ENTRIES", "100000"))
         
+        # Background task settings
+        self.background_max_workers = int(os.getenv("BACKGROUND_MAX_WORKERS", "4"))
+        self.background_shutdown_deadline = float(os.getenv("BACKGROUND_SHUTDOWN_DEADLINE", "10"))
+        self.click_queue_size = int(os.getenv("CLICK_QUEUE_SIZE", "10000"))
+        self.click_flush_batch_size = int(os.getenv("CLICK_FLUSH_BATCH_SIZE", "500"))
+        self.expiry_sweep_interval = float(os.getenv("EXPIRY_SWEEP_INTERVAL", "300"))
+        self.cache_purge_interval = float(os.getenv("CACHE_PURGE_INTERVAL", "60"))
+
+        # Profiling settings (both 0 disables profiling entirely)
+        self.profile_sample_rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+        self.profile_sample_interval_ms = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+        self.slow_request_threshold_ms = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "0"))
+
+        # Blocklist settings
+        self.blocklist_path = os.getenv("BLOCKLIST_PATH", "")
+        self.blocklist_check_on_redirect = os.getenv("BLOCKLIST_CHECK_ON_REDIRECT", "False").lower() == "true"
+        self.blocklist_reload_interval = float(os.getenv("BLOCKLIST_RELOAD_INTERVAL", "30"))
+
+        # Admin endpoints are only served to requests carrying this key in X-Admin-Key
+        self.admin_api_key = os.getenv("ADMIN_API_KEY", "")
+
+        # API key settings
+        self.require_api_key = os.getenv("REQUIRE_API_KEY", "False").lower() == "true"
+        self.api_key_cache_ttl = float(os.getenv("API_KEY_CACHE_TTL", "300"))
+        self.api_key_cache_max_entries = int(os.getenv("API_KEY_CACHE_MAX_ENTRIES", "10000"))
+        self.api_key_failure_cache_ttl = float(os.getenv("API_KEY_FAILURE_CACHE_TTL", "10"))
+        self.api_key_max_failures = int(os.getenv("API_KEY_MAX_FAILURES", "20"))
+        self.owner_link_quota = int(os.getenv("OWNER_LINK_QUOTA", "0"))
+        self.quota_sync_interval = float(os.getenv("QUOTA_SYNC_INTERVAL", "60"))
+
+        # Event outbox settings
+        self.event_webhook_urls: list[str] = []
+        webhook_urls_str = os.getenv("EVENT_WEBHOOK_URLS", "")
+        if webhook_urls_str:
+            self.event_webhook_urls = [url.strip() for url in webhook_urls_str.split(",") if url.strip()]
+        self.event_dispatch_interval = float(os.getenv("EVENT_DISPATCH_INTERVAL", "1"))
+        self.event_batch_size = int(os.getenv("EVENT_BATCH_SIZE", "100"))
+        self.event_delivery_partitions = int(os.getenv("EVENT_DELIVERY_PARTITIONS", "8"))
+        self.event_max_attempts = int(os.getenv("EVENT_MAX_ATTEMPTS", "3"))
+        self.event_webhook_timeout = float(os.getenv("EVENT_WEBHOOK_TIMEOUT", "5"))
+        self.event_retention_hours = float(os.getenv("EVENT_RETENTION_HOURS", "168"))
+        # Undelivered events older than this stop being retried (0 keeps retrying them)
+        self.event_dead_letter_hours = float(os.getenv("EVENT_DEAD_LETTER_HOURS", "24"))
+
+        # QR code settings (an empty QR_DISK_CACHE_DIR keeps renders in memory only)
+        self.qr_memory_cache_mb = float(os.getenv("QR_MEMORY_CACHE_MB", "64"))
+        self.qr_disk_cache_dir = os.getenv("QR_DISK_CACHE_DIR", "")
+        self.qr_disk_cache_mb = float(os.getenv("QR_DISK_CACHE_MB", "1024"))
+        self.qr_render_workers = int(os.getenv("QR_RENDER_WORKERS", "2"))
+
+        # Link health checker settings (LINK_HEALTH_ACTION is "flag" or "deactivate")
+        self.link_health_enabled = os.getenv("LINK_HEALTH_ENABLED", "False").lower() == "true"
+        self.link_health_action = os.getenv("LINK_HEALTH_ACTION", "flag").lower()
+        self.link_health_interval = float(os.getenv("LINK_HEALTH_INTERVAL", "10"))
+        self.link_health_links_per_run = int(os.getenv("LINK_HEALTH_LINKS_PER_RUN", "20000"))
+        self.link_health_batch_size = int(os.getenv("LINK_HEALTH_BATCH_SIZE", "500"))
+        self.link_health_concurrency = int(os.getenv("LINK_HEALTH_CONCURRENCY", "200"))
+        self.link_health_per_host = int(os.getenv("LINK_HEALTH_PER_HOST", "2"))
+        self.link_health_host_interval = float(os.getenv("LINK_HEALTH_HOST_INTERVAL", "1"))
+        self.link_health_timeout = float(os.getenv("LINK_HEALTH_TIMEOUT", "10"))
+        self.link_health_recheck_interval = float(os.getenv("LINK_HEALTH_RECHECK_INTERVAL", "86400"))
+        self.link_health_failing_recheck_interval = float(os.getenv("LINK_HEALTH_FAILING_RECHECK_INTERVAL", "3600"))
+        self.link_health_failure_threshold = int(os.getenv("LINK_HEALTH_FAILURE_THRESHOLD", "3"))
+        self.link_health_dns_ttl = float(os.getenv("LINK_HEALTH_DNS_TTL", "300"))
+
         # Security settings
         self.allowed_origins: list[str] = []
         origins_str = os.getenv("ALLOWED_ORIGINS", "")
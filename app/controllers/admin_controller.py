@@ -0,0 +1,87 @@
+from typing import Optional
+from litestar import Controller, get, delete, Response
+from litestar.params import Parameter
+from litestar.status_codes import HTTP_204_NO_CONTENT
+from app.services.lookup_cache import LookupCache
+from app.services.background_tasks import BackgroundTaskManager
+from app.services.quota_tracker import QuotaTracker
+from app.services.api_key_service import APIKeyService
+from app.services.event_dispatcher import EventDispatcher
+from app.services.qr_service import QRCodeService
+from app.services.link_health_checker import LinkHealthChecker
+from app.middleware.profiling import RequestProfiler
+from app.guards import require_admin_key
+
+
+class AdminController(Controller):
+    path = "/api/v1/admin"
+    guards = [require_admin_key]
+
+    @get("/lookup-cache")
+    async def get_lookup_cache_stats(self, lookup_cache: Optional[LookupCache]) -> dict:
+        if lookup_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **lookup_cache.stats()}
+
+    @get("/background-tasks")
+    async def get_background_task_stats(self, background_tasks: BackgroundTaskManager) -> dict:
+        return background_tasks.stats()
+
+    @get("/quotas")
+    async def get_quota_stats(self, quota_tracker: QuotaTracker, api_keys: APIKeyService) -> dict:
+        return {
+            "api_key_required": api_keys.required,
+            "api_key_cache": api_keys.cache.stats() if api_keys.cache is not None else None,
+            "api_key_rejections": api_keys.rejected.stats() if api_keys.rejected is not None else None,
+            "api_key_throttled": api_keys.throttled,
+            **quota_tracker.stats(),
+        }
+
+    @get("/event-delivery")
+    async def get_event_delivery_stats(self, event_dispatcher: Optional[EventDispatcher]) -> dict:
+        if event_dispatcher is None:
+            return {"enabled": False}
+        return {"enabled": True, **event_dispatcher.stats()}
+
+    @get("/qr-cache")
+    async def get_qr_cache_stats(self, qr_codes: QRCodeService) -> dict:
+        return qr_codes.stats()
+
+    @get("/link-health")
+    async def get_link_health_stats(self, link_health: Optional[LinkHealthChecker]) -> dict:
+        if link_health is None:
+            return {"enabled": False}
+        return {"enabled": True, **link_health.stats()}
+
+    @get("/link-health/broken")
+    async def list_broken_links(
+        self,
+        link_health: Optional[LinkHealthChecker],
+        limit: int = Parameter(default=100, ge=1, le=1000),
+    ) -> dict:
+        if link_health is None:
+            return {"enabled": False, "links": []}
+        return {"enabled": True, "links": link_health.broken_links(limit)}
+
+    @get("/profile/stacks", media_type="text/plain")
+    async def download_profile_stacks(self, profiler: RequestProfiler) -> Response:
+        return Response(
+            content=profiler.sampler.folded(),
+            media_type="text/plain",
+            headers={"Content-Disposition": 'attachment; filename="stacks.folded"'}
+        )
+
+    @delete("/profile/stacks", status_code=HTTP_204_NO_CONTENT)
+    async def reset_profile_stacks(self, profiler: RequestProfiler) -> None:
+        profiler.sampler.reset()
+
+    @get("/profile/slow-requests")
+    async def get_slow_requests(self, profiler: RequestProfiler) -> dict:
+        return {
+            "enabled": profiler.enabled,
+            "sample_rate": profiler.sample_rate,
+            "profiled_requests": profiler.profiled_requests,
+            "samples": profiler.sampler.samples,
+            "slow_request_threshold_ms": profiler.slow_request_ms,
+            "slow_requests": list(profiler.slow_requests),
+        }
@@ -0,0 +1,25 @@
+from typing import Optional
+from litestar import Controller, get
+from litestar.params import Parameter
+from app.services.event_feed import EventFeed
+from app.exceptions import InvalidCursorException
+from app.guards import require_admin_key
+
+
+class EventController(Controller):
+    path = "/api/v1/events"
+    # Events carry every owner's links and destinations, so the feed is admin-only.
+    guards = [require_admin_key]
+
+    @get("/")
+    async def list_events(
+        self,
+        event_feed: EventFeed,
+        cursor: Optional[str] = None,
+        limit: int = Parameter(default=100, ge=1, le=1000),
+    ) -> dict:
+        try:
+            events, next_cursor = event_feed.read(cursor, limit)
+        except ValueError as e:
+            raise InvalidCursorException(detail=str(e))
+        return {"events": events, "next_cursor": next_cursor}
@@ -1,36 +1,81 @@
-from typing import Annotated
-from litestar import Controller, post, get, Request, Response
+import json
+from typing import Annotated, AsyncIterator, Iterator, Literal, Optional
+from litestar import Controller, delete, post, get, Request, Response
+from litestar.response import Stream
+from litestar.serialization import encode_json
 from litestar.di import Provide
-from litestar.status_codes import HTTP_201_CREATED, HTTP_301_MOVED_PERMANENTLY, HTTP_404_NOT_FOUND
+from litestar.params import Parameter
+from litestar.status_codes import HTTP_200_OK, HTTP_201_CREATED, HTTP_204_NO_CONTENT, HTTP_304_NOT_MODIFIED, HTTP_301_MOVED_PERMANENTLY, HTTP_302_FOUND, HTTP_404_NOT_FOUND
 from litestar.exceptions import NotFoundException, ValidationException
-from app.schemas.url import CreateURLRequest, URLResponse, URLStatsResponse, CreateURLDTO, URLResponseDTO, URLStatsDTO
+from app.schemas.url import (
+    CreateURLRequest, BatchStatsRequest, QRBatchRequest, URLResponse, URLStatsResponse,
+    CreateURLDTO, BatchStatsDTO, QRBatchDTO, URLResponseDTO, URLStatsDTO
+)
 from app.services.url_service import URLService
-from app.exceptions import URLNotFoundException, DuplicateShortCodeException, InvalidURLException, ExpiredURLException
+from app.services.api_key_service import APIKeyIdentity, APIKeyService
+from app.services.quota_tracker import QuotaExceededError
+from app.services.qr_service import QRCodeService, stream_zip
+from app.exceptions import (
+    URLNotFoundException, DuplicateShortCodeException, InvalidURLException, ExpiredURLException, BlockedURLException,
+    InvalidAPIKeyException, URLOwnershipException, QuotaExceededException
+)
 from app.validators import URLValidator
+from app.blocklist import Blocklist
+from app.routing import compile_rules
+from app.qr import QR_FORMATS, qr_digest, snap_size
+from app.middleware.profiling import span
 
 
 class URLController(Controller):
     path = "/api/v1/urls"
 
     @post("/", dto=CreateURLDTO, return_dto=URLResponseDTO, status_code=HTTP_201_CREATED)
-    async def create_short_url(self, data: CreateURLRequest, request: Request, url_service: URLService) -> URLResponse:
+    async def create_short_url(
+        self,
+        data: CreateURLRequest,
+        request: Request,
+        url_service: URLService,
+        blocklist: Blocklist,
+        api_keys: APIKeyService
+    ) -> URLResponse:
         original_url = str(data.original_url)
+
+        with span("auth"):
+            identity = await _authenticate(request, api_keys, required=api_keys.required)
         
-        if not URLValidator.is_valid_url(original_url):
-            raise InvalidURLException(detail="Invalid URL format")
-        
-        if not URLValidator.validate_url_length(original_url):
-            raise InvalidURLException(detail="URL is too long")
-        
-        if data.custom_code and not URLValidator.is_valid_short_code(data.custom_code):
-            raise InvalidURLException(detail="Invalid custom short code format")
+        with span("validation"):
+            if not URLValidator.is_valid_url(original_url):
+                raise InvalidURLException(detail="Invalid URL format")
+
+            if not URLValidator.validate_url_length(original_url):
+                raise InvalidURLException(detail="URL is too long")
+
+            if data.custom_code and not URLValidator.is_valid_short_code(data.custom_code):
+                raise InvalidURLException(detail="Invalid custom short code format")
+
+            if blocklist.check(original_url):
+                raise BlockedURLException(detail="URL is blocked")
+
+            routing_rules = None
+            if data.routing_rules:
+                for rule in data.routing_rules:
+                    for target in rule["targets"]:
+                        if not URLValidator.is_valid_url(target["url"]) or not URLValidator.validate_url_length(target["url"]):
+                            raise InvalidURLException(detail="Invalid routing target URL")
+                        if blocklist.check(target["url"]):
+                            raise BlockedURLException(detail="Routing target URL is blocked")
+                routing_rules = json.dumps(data.routing_rules, separators=(",", ":"))
         
         try:
-            url = url_service.create_url(
-                original_url=original_url,
-                custom_code=data.custom_code,
-                expires_at=data.expires_at
-            )
+            with span("db"):
+                url = url_service.create_url(
+                    original_url=original_url,
+                    custom_code=data.custom_code,
+                    expires_at=data.expires_at,
+                    routing_rules=routing_rules,
+                    owner=identity.owner if identity else None,
+                    link_quota=identity.link_quota if identity else None
+                )
             
             base_url = f"{request.url.scheme}://{request.url.netloc}"
             short_url = f"{base_url}/{url.short_code}"
@@ -45,6 +90,8 @@ class URLController(Controller):
                 expires_at=url.expires_at,
                 is_active=url.is_active
             )
+        except QuotaExceededError as e:
+            raise QuotaExceededException(detail=str(e))
         except ValueError as e:
             if "already exists" in str(e):
                 raise DuplicateShortCodeException(detail=str(e))
@@ -52,10 +99,12 @@ class URLController(Controller):
 
     @get("/{short_code:str}/stats", return_dto=URLStatsDTO)
     async def get_url_stats(self, short_code: str, request: Request, url_service: URLService) -> URLStatsResponse:
-        if not URLValidator.is_valid_short_code(short_code):
-            raise InvalidURLException(detail="Invalid short code format")
+        with span("validation"):
+            if not URLValidator.is_valid_short_code(short_code):
+                raise InvalidURLException(detail="Invalid short code format")
             
-        url = url_service.get_url_by_short_code(short_code)
+        with span("db"):
+            url = url_service.get_url_by_short_code(short_code)
         if not url:
             raise URLNotFoundException(detail=f"URL with short code '{short_code}' not found")
         
@@ -73,16 +122,172 @@ class URLController(Controller):
             is_active=url.is_active
         )
 
+    @delete("/{short_code:str}", status_code=HTTP_204_NO_CONTENT)
+    async def deactivate_short_url(
+        self, short_code: str, request: Request, url_service: URLService, api_keys: APIKeyService
+    ) -> None:
+        with span("auth"):
+            identity = await _authenticate(request, api_keys, required=True)
+
+        with span("validation"):
+            if not URLValidator.is_valid_short_code(short_code):
+                raise InvalidURLException(detail="Invalid short code format")
+
+        with span("db"):
+            url = url_service.get_url_by_short_code(short_code)
+            if not url:
+                raise URLNotFoundException(detail=f"URL with short code '{short_code}' not found")
+            if url.owner != identity.owner:
+                raise URLOwnershipException(detail="URL belongs to another owner")
+            url_service.deactivate_url(url.id)
+
+    @post("/stats:batch", dto=BatchStatsDTO, status_code=HTTP_200_OK)
+    async def get_batch_stats(self, data: BatchStatsRequest, request: Request, url_service: URLService) -> Stream:
+        """Stats for many short codes, streamed as NDJSON in request order."""
+        short_codes = list(dict.fromkeys(data.short_codes))
+        with span("validation"):
+            valid_codes = [code for code in short_codes if URLValidator.is_valid_short_code(code)]
+
+        with span("db"):
+            # Stats are read fresh; the lookup cache would serve click counts up to a TTL old.
+            urls = url_service.get_urls_by_short_codes(valid_codes, cached=False)
+
+        base_url = f"{request.url.scheme}://{request.url.netloc}"
+        return Stream(
+            _batch_stats_lines(short_codes, urls, base_url),
+            media_type="application/x-ndjson",
+        )
+
+    @post("/qr:batch", dto=QRBatchDTO, status_code=HTTP_200_OK)
+    async def get_batch_qr_codes(
+        self, data: QRBatchRequest, request: Request, url_service: URLService, qr_codes: QRCodeService
+    ) -> Stream:
+        """QR codes for many short codes as a streamed ZIP; unknown codes are listed in ``missing.txt``."""
+        short_codes = list(dict.fromkeys(data.short_codes))
+        with span("validation"):
+            valid_codes = [code for code in short_codes if URLValidator.is_valid_short_code(code)]
+
+        with span("db"):
+            urls = url_service.get_urls_by_short_codes(valid_codes)
+
+        base_url = f"{request.url.scheme}://{request.url.netloc}"
+        found = [code for code in short_codes if code in urls and _is_servable(url_service, urls[code])]
+        missing = [code for code in short_codes if code not in found]
+
+        async def entries() -> AsyncIterator[tuple[str, bytes]]:
+            images = qr_codes.render_batch(
+                [(f"{code}.{data.format}", f"{base_url}/{code}") for code in found],
+                data.format,
+                snap_size(data.size),
+                data.error,
+            )
+            async for name, content in images:
+                yield name, content
+            if missing:
+                yield "missing.txt", ("\n".join(missing) + "\n").encode("utf-8")
+
+        return Stream(
+            stream_zip(entries(), compress=data.format == "svg"),
+            media_type="application/zip",
+            headers={"Content-Disposition": 'attachment; filename="qr-codes.zip"'},
+        )
+
+
+def _is_servable(url_service: URLService, url) -> bool:
+    return url.is_active and not url_service.is_url_expired(url)
+
+
+async def _authenticate(request: Request, api_keys: APIKeyService, required: bool) -> Optional[APIKeyIdentity]:
+    """Resolve the caller from ``X-API-Key`` or ``Authorization: Bearer``."""
+    api_key = request.headers.get("x-api-key")
+    if api_key is None:
+        authorization = request.headers.get("authorization", "")
+        if authorization[:7].lower() == "bearer ":
+            api_key = authorization[7:].strip()
+    if not api_key:
+        if required:
+            raise InvalidAPIKeyException(detail="API key required")
+        return None
+    identity = await api_keys.authenticate(api_key)
+    if identity is None:
+        raise InvalidAPIKeyException(detail="Invalid API key")
+    return identity
+
+
+def _parse_if_none_match(header: str) -> set[str]:
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+
+def _batch_stats_lines(short_codes: list[str], urls: dict, base_url: str, chunk_size: int = 100) -> Iterator[bytes]:
+    chunk = []
+    for short_code in short_codes:
+        url = urls.get(short_code)
+        if url is None:
+            line = {"short_code": short_code, "found": False}
+        else:
+            line = {
+                "short_code": short_code,
+                "found": True,
+                "id": url.id,
+                "original_url": url.original_url,
+                "short_url": f"{base_url}/{url.short_code}",
+                "created_at": url.created_at,
+                "click_count": url.click_count,
+                "expires_at": url.expires_at,
+                "is_active": url.is_active,
+            }
+        chunk.append(encode_json(line))
+        if len(chunk) == chunk_size:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
 
 class RedirectController(Controller):
     path = "/"
 
+    @get("/{short_code:str}/qr")
+    async def get_qr_code(
+        self,
+        short_code: str,
+        request: Request,
+        url_service: URLService,
+        qr_codes: QRCodeService,
+        output_format: Literal["png", "svg"] = Parameter(query="format", default="png"),
+        size: int = Parameter(default=256, ge=64, le=2048),
+        error: Literal["l", "m", "q", "h"] = Parameter(default="m"),
+    ) -> Response:
+        with span("validation"):
+            if not URLValidator.is_valid_short_code(short_code):
+                raise URLNotFoundException(detail="Invalid short code format")
+
+        with span("db"):
+            url = await url_service.resolve_url(short_code)
+        if not url or not _is_servable(url_service, url):
+            raise URLNotFoundException(detail="URL not found")
+
+        base_url = f"{request.url.scheme}://{request.url.netloc}"
+        size = snap_size(size)
+        etag = f'"{qr_digest(f"{base_url}/{short_code}", output_format, size, error)}"'
+        headers = {"ETag": etag, "Cache-Control": "public, max-age=86400"}
+        # The ETag is derived from the render inputs, so a match needs no rendering or cache read.
+        if etag in _parse_if_none_match(request.headers.get("if-none-match", "")):
+            return Response(content=b"", status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+
+        _, content = await qr_codes.render(f"{base_url}/{short_code}", output_format, size, error)
+        return Response(content=content, media_type=QR_FORMATS[output_format], headers=headers)
+
     @get("/{short_code:str}")
-    async def redirect_to_original(self, short_code: str, url_service: URLService) -> Response:
-        if not URLValidator.is_valid_short_code(short_code):
-            raise URLNotFoundException(detail="Invalid short code format")
+    async def redirect_to_original(
+        self, short_code: str, request: Request, url_service: URLService, blocklist: Blocklist
+    ) -> Response:
+        with span("validation"):
+            if not URLValidator.is_valid_short_code(short_code):
+                raise URLNotFoundException(detail="Invalid short code format")
             
-        url = url_service.get_url_by_short_code(short_code)
+        with span("db"):
+            url = await url_service.resolve_url(short_code)
         
         if not url:
             raise URLNotFoundException(detail="URL not found")
@@ -92,11 +297,32 @@ class RedirectController(Controller):
         
         if url_service.is_url_expired(url):
             raise ExpiredURLException(detail="URL has expired")
+
+        location = url.original_url
+        status_code = HTTP_301_MOVED_PERMANENTLY
+        headers = {}
+        if url.routing_rules:
+            # The destination depends on the client, so it must not be cached as permanent.
+            router = compile_rules(url.routing_rules)
+            user_agent = request.headers.get("user-agent", "")
+            client_host = request.client.host if request.client else ""
+            location = router.resolve(
+                user_agent=user_agent,
+                accept_language=request.headers.get("accept-language", ""),
+                client_key=f"{client_host}|{user_agent}"
+            ) or url.original_url
+            status_code = HTTP_302_FOUND
+            headers["Cache-Control"] = "private, no-store"
+
+        if blocklist.check_on_redirect and blocklist.check(location):
+            raise BlockedURLException(detail="URL is blocked")
         
-        url_service.increment_click_count(url.id)
+        with span("db"):
+            url_service.increment_click_count(url.id)
         
+        headers["Location"] = location
         return Response(
             content="",
-            status_code=HTTP_301_MOVED_PERMANENTLY,
-            headers={"Location": url.original_url}
+            status_code=status_code,
+            headers=headers
         )
\ No newline at end of file
@@ -1,5 +1,8 @@
 from litestar.exceptions import HTTPException
-from litestar.status_codes import HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND, HTTP_409_CONFLICT, HTTP_500_INTERNAL_SERVER_ERROR
+from litestar.status_codes import (
+    HTTP_400_BAD_REQUEST, HTTP_401_UNAUTHORIZED, HTTP_403_FORBIDDEN, HTTP_404_NOT_FOUND, HTTP_409_CONFLICT,
+    HTTP_429_TOO_MANY_REQUESTS, HTTP_500_INTERNAL_SERVER_ERROR
+)
 
 
 class URLNotFoundException(HTTPException):
@@ -22,6 +25,36 @@ class ExpiredURLException(HTTPException):
     detail = "URL has expired"
 
 
+class BlockedURLException(HTTPException):
+    status_code = HTTP_403_FORBIDDEN
+    detail = "URL is blocked"
+
+
+class InvalidAPIKeyException(HTTPException):
+    status_code = HTTP_401_UNAUTHORIZED
+    detail = "Missing or invalid API key"
+
+
+class InvalidAdminKeyException(HTTPException):
+    status_code = HTTP_401_UNAUTHORIZED
+    detail = "Missing or invalid admin key"
+
+
+class URLOwnershipException(HTTPException):
+    status_code = HTTP_403_FORBIDDEN
+    detail = "URL belongs to another owner"
+
+
+class QuotaExceededException(HTTPException):
+    status_code = HTTP_429_TOO_MANY_REQUESTS
+    detail = "Link quota exceeded"
+
+
+class InvalidCursorException(HTTPException):
+    status_code = HTTP_400_BAD_REQUEST
+    detail = "Invalid cursor"
+
+
 class DatabaseException(HTTPException):
     status_code = HTTP_500_INTERNAL_SERVER_ERROR
     detail = "Database operation failed"
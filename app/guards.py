@@ -0,0 +1,15 @@
+import hmac
+from litestar.connection import ASGIConnection
+from litestar.handlers import BaseRouteHandler
+from app.config.settings import settings
+from app.exceptions import InvalidAdminKeyException
+
+
+def require_admin_key(connection: ASGIConnection, _: BaseRouteHandler) -> None:
+    """Allow the request only if ``X-Admin-Key`` matches ``ADMIN_API_KEY``.
+
+    With no admin key configured, admin routes are closed to everyone.
+    """
+    presented = connection.headers.get("x-admin-key", "")
+    if not settings.admin_api_key or not hmac.compare_digest(presented.encode(), settings.admin_api_key.encode()):
+        raise InvalidAdminKeyException()
@@ -4,21 +4,287 @@ from litestar.exceptions import HTTPException
 from litestar.config.cors import CORSConfig
 from litestar.status_codes import HTTP_500_INTERNAL_SERVER_ERROR
 from litestar.logging import LoggingConfig
+from litestar.middleware import DefineMiddleware
+
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
 
 from app.controllers.url_controller import URLController, RedirectController
+from app.controllers.admin_controller import AdminController
+from app.controllers.event_controller import EventController
+from app.blocklist import Blocklist
+from app.middleware.profiling import ProfilingMiddleware, RequestProfiler, install_sql_tracing
 from app.services.url_service import URLService
+from app.models.url import URLModel
+from app.services.lookup_cache import LookupCache
+from app.services.background_tasks import BackgroundTaskManager
+from app.services.api_key_service import APIKeyService
+from app.services.quota_tracker import QuotaTracker
+from app.services.event_feed import EventFeed
+from app.services.event_dispatcher import EventDispatcher
+from app.services.qr_service import QRCodeService, QRRenderCache
+from app.services.link_health_checker import LinkHealthChecker
+from app.repositories.api_key_repository import APIKeyRepository
+from app.repositories.url_event_repository import URLEventRepository
+from app.repositories.link_health_repository import LinkHealthRepository
 from app.repositories.url_repository import URLRepository
-from app.config.database import create_database_connection, run_migrations
+from app.repositories.url_core_repository import URLCoreRepository
+from app.repositories.sharded_url_repository import ShardedURLRepository
+from app.config.database import create_database_connection, create_shard_connections, run_migrations
 from app.config.settings import settings
 
 
-def provide_url_service() -> URLService:
+lookup_cache: Optional[LookupCache] = None
+if settings.lookup_cache_ttl > 0:
+    lookup_cache = LookupCache(
+        ttl=settings.lookup_cache_ttl,
+        refresh_ahead=settings.lookup_cache_refresh_ahead,
+        max_entries=settings.lookup_cache_max_entries,
+    )
+
+
+profiler = RequestProfiler(
+    sample_rate=settings.profile_sample_rate,
+    slow_request_ms=settings.slow_request_threshold_ms,
+    sample_interval=settings.profile_sample_interval_ms / 1000,
+)
+if profiler.enabled:
+    install_sql_tracing()
+
+blocklist = Blocklist(
+    path=settings.blocklist_path or None,
+    check_on_redirect=settings.blocklist_check_on_redirect,
+)
+
+background_tasks = BackgroundTaskManager(max_workers=settings.background_max_workers)
+
+qr_codes = QRCodeService(
+    QRRenderCache(
+        max_memory_bytes=int(settings.qr_memory_cache_mb * 1024 * 1024),
+        disk_dir=settings.qr_disk_cache_dir or None,
+        max_disk_bytes=int(settings.qr_disk_cache_mb * 1024 * 1024),
+    ),
+    max_workers=settings.qr_render_workers,
+)
+
+quota_tracker = QuotaTracker(default_quota=settings.owner_link_quota)
+
+# API keys live in the main database, or on the first shard when sharding is enabled.
+api_key_service = APIKeyService(
+    APIKeyRepository(
+        create_shard_connections(settings.db_shard_urls[:1])[0]
+        if settings.db_shard_urls
+        else create_database_connection()
+    ),
+    cache=LookupCache(
+        ttl=settings.api_key_cache_ttl,
+        refresh_ahead=0,
+        max_entries=settings.api_key_cache_max_entries,
+    ) if settings.api_key_cache_ttl > 0 else None,
+    required=settings.require_api_key,
+    failure_ttl=settings.api_key_failure_cache_ttl,
+    max_failures=settings.api_key_max_failures,
+)
+
+
+def build_url_repository():
+    repository_class = URLCoreRepository if settings.repository_mode == "core" else URLRepository
+    if settings.db_shard_urls:
+        shard_connections = create_shard_connections(settings.db_shard_urls)
+        return ShardedURLRepository(
+            [repository_class(connection) for connection in shard_connections],
+            slots=settings.db_shard_slots,
+            previous_rings=settings.db_shard_previous_rings,
+        )
     db_connection = create_database_connection()
-    repository = URLRepository(db_connection)
-    return URLService(repository)
+    return repository_class(db_connection)
+
+
+def build_event_repositories() -> list[URLEventRepository]:
+    if settings.db_shard_urls:
+        shard_connections = create_shard_connections(settings.db_shard_urls)
+        return [
+            URLEventRepository(connection, shard_slot=slot)
+            for slot, connection in zip(settings.db_shard_slots, shard_connections)
+        ]
+    return [URLEventRepository(create_database_connection())]
+
+
+# Event repositories use a connection per call, so one set is shared by the feed and the dispatcher.
+event_repositories = build_event_repositories()
+event_feed = EventFeed(event_repositories)
+event_dispatcher: Optional[EventDispatcher] = None
+if settings.event_webhook_urls:
+    event_dispatcher = EventDispatcher(
+        event_repositories,
+        settings.event_webhook_urls,
+        run_blocking=background_tasks.run_blocking,
+        batch_size=settings.event_batch_size,
+        partitions=settings.event_delivery_partitions,
+        max_attempts=settings.event_max_attempts,
+        timeout=settings.event_webhook_timeout,
+        dead_letter_after=settings.event_dead_letter_hours * 3600 if settings.event_dead_letter_hours > 0 else None,
+    )
+
+
+def build_link_health_repositories() -> list[LinkHealthRepository]:
+    if settings.db_shard_urls:
+        shard_connections = create_shard_connections(settings.db_shard_urls)
+        return [
+            LinkHealthRepository(connection, shard_slot=slot)
+            for slot, connection in zip(settings.db_shard_slots, shard_connections)
+        ]
+    return [LinkHealthRepository(create_database_connection())]
+
+
+_lookup_repositories = threading.local()
+
+
+def _load_for_cache(short_code: str) -> Optional[URLModel]:
+    # Cache loads run in executor threads; each thread keeps its own repository
+    # (rebuilt if the factory is swapped, as the integration tests do).
+    if getattr(_lookup_repositories, "factory", None) is not build_url_repository:
+        _lookup_repositories.repository = build_url_repository()
+        _lookup_repositories.factory = build_url_repository
+    repository = _lookup_repositories.repository
+    try:
+        return URLService._detach(repository.get_by_short_code(short_code))
+    finally:
+        repository.close()
+
+
+def provide_url_service() -> URLService:
+    return URLService(
+        build_url_repository(),
+        cache=lookup_cache,
+        click_queue=click_queue,
+        quotas=quota_tracker,
+        lookup_loader=_load_for_cache,
+    )
+
+
+def provide_lookup_cache() -> Optional[LookupCache]:
+    return lookup_cache
+
+
+def provide_background_tasks() -> BackgroundTaskManager:
+    return background_tasks
+
 
+def provide_profiler() -> RequestProfiler:
+    return profiler
 
-async def exception_handler(request: Request, exc: Exception) -> Response:
+
+def provide_blocklist() -> Blocklist:
+    return blocklist
+
+
+def provide_api_key_service() -> APIKeyService:
+    return api_key_service
+
+
+def provide_quota_tracker() -> QuotaTracker:
+    return quota_tracker
+
+
+def provide_qr_codes() -> QRCodeService:
+    return qr_codes
+
+
+def provide_event_feed() -> EventFeed:
+    return event_feed
+
+
+def provide_event_dispatcher() -> Optional[EventDispatcher]:
+    return event_dispatcher
+
+
+def provide_link_health() -> Optional[LinkHealthChecker]:
+    return link_health
+
+
+def _repository_job(operation: Callable[..., Any], **service_options: Any) -> Callable[..., Any]:
+    # Each job gets its own repository; a job never runs concurrently with itself,
+    # so its session is only ever used by one thread at a time.
+    service: Optional[URLService] = None
+
+    def run(*args):
+        nonlocal service
+        if service is None:
+            service = URLService(build_url_repository(), **service_options)
+        try:
+            return operation(service, *args)
+        finally:
+            service.repository.close()
+
+    return run
+
+
+click_queue = background_tasks.add_queue_worker(
+    "click-flush",
+    _repository_job(lambda service, url_ids: service.flush_clicks(url_ids)),
+    maxsize=settings.click_queue_size,
+    batch_size=settings.click_flush_batch_size,
+)
+background_tasks.add_periodic(
+    "expiry-sweep",
+    settings.expiry_sweep_interval,
+    _repository_job(lambda service: service.cleanup_expired_urls()),
+)
+
+
+def _sync_quotas(service: URLService):
+    quota_tracker.sync(service.repository.count_active_by_owner())
+
+
+background_tasks.add_periodic("quota-sync", settings.quota_sync_interval, _repository_job(_sync_quotas))
+
+
+def _purge_events():
+    # Without a dispatcher nothing is ever delivered or dead-lettered, so age is the only criterion.
+    before = datetime.now(timezone.utc) - timedelta(hours=settings.event_retention_hours)
+    for repository in event_repositories:
+        repository.purge(before, delivered_only=event_dispatcher is not None)
+
+
+background_tasks.add_periodic("event-purge", 3600, _purge_events)
+
+link_health: Optional[LinkHealthChecker] = None
+if settings.link_health_enabled:
+    link_health = LinkHealthChecker(
+        build_link_health_repositories(),
+        run_blocking=background_tasks.run_blocking,
+        # Deactivation goes through URLService so it writes the outbox event, drops the
+        # cached redirect and releases the owner's quota like any other.
+        deactivate=_repository_job(
+            lambda service, url_id: service.deactivate_url(url_id), cache=lookup_cache, quotas=quota_tracker
+        ) if settings.link_health_action == "deactivate" else None,
+        links_per_run=settings.link_health_links_per_run,
+        batch_size=settings.link_health_batch_size,
+        concurrency=settings.link_health_concurrency,
+        per_host_connections=settings.link_health_per_host,
+        host_interval=settings.link_health_host_interval,
+        timeout=settings.link_health_timeout,
+        recheck_interval=settings.link_health_recheck_interval,
+        failing_recheck_interval=settings.link_health_failing_recheck_interval,
+        failure_threshold=settings.link_health_failure_threshold,
+        dns_ttl=settings.link_health_dns_ttl,
+    )
+    background_tasks.add_periodic("link-health", settings.link_health_interval, link_health.run_once, blocking=False)
+if event_dispatcher is not None:
+    background_tasks.add_periodic(
+        "event-dispatch", settings.event_dispatch_interval, event_dispatcher.dispatch_once, blocking=False
+    )
+if blocklist.path:
+    background_tasks.add_periodic("blocklist-reload", settings.blocklist_reload_interval, blocklist.reload_if_changed)
+if lookup_cache is not None:
+    background_tasks.add_periodic(
+        "lookup-cache-purge", settings.cache_purge_interval, lookup_cache.purge_expired, blocking=False
+    )
+
+
+def exception_handler(request: Request, exc: Exception) -> Response:
     if isinstance(exc, HTTPException):
         return Response(
             content={"error": exc.detail, "status_code": exc.status_code},
@@ -48,32 +314,67 @@ def create_app() -> Litestar:
         }
     )
 
+    middleware = []
+    if profiler.enabled:
+        middleware.append(DefineMiddleware(ProfilingMiddleware, profiler=profiler))
+
     app = Litestar(
-        route_handlers=[URLController, RedirectController],
-        dependencies={"url_service": Provide(provide_url_service)},
+        route_handlers=[URLController, EventController, RedirectController, AdminController],
+        middleware=middleware,
+        dependencies={
+            "url_service": Provide(provide_url_service),
+            "lookup_cache": Provide(provide_lookup_cache, sync_to_thread=False),
+            "background_tasks": Provide(provide_background_tasks, sync_to_thread=False),
+            "profiler": Provide(provide_profiler, sync_to_thread=False),
+            "blocklist": Provide(provide_blocklist, sync_to_thread=False),
+            "api_keys": Provide(provide_api_key_service, sync_to_thread=False),
+            "quota_tracker": Provide(provide_quota_tracker, sync_to_thread=False),
+            "event_feed": Provide(provide_event_feed, sync_to_thread=False),
+            "qr_codes": Provide(provide_qr_codes, sync_to_thread=False),
+            "event_dispatcher": Provide(provide_event_dispatcher, sync_to_thread=False),
+            "link_health": Provide(provide_link_health, sync_to_thread=False),
+        },
         cors_config=cors_config,
         logging_config=logging_config,
         debug=settings.debug,
         exception_handlers={Exception: exception_handler},
+        on_startup=[lifespan_startup],
+        on_shutdown=[lifespan_shutdown],
     )
     
     return app
 
 
 async def lifespan_startup():
-    db_connection = create_database_connection()
+    if settings.db_shard_urls:
+        db_connections = create_shard_connections(settings.db_shard_urls)
+    else:
+        db_connections = [create_database_connection()]
     try:
-        run_migrations(db_connection)
+        for db_connection in db_connections:
+            run_migrations(db_connection)
         print("Database migrations completed successfully")
     except Exception as e:
         print(f"Error running migrations: {e}")
         raise
     finally:
-        db_connection.close_session()
+        for db_connection in db_connections:
+            db_connection.close_session()
+    if blocklist.path:
+        blocklist.reload()
+    await background_tasks.start()
+    # Seed the quota counters now instead of waiting for the first periodic sync.
+    await background_tasks.run_blocking(_repository_job(_sync_quotas))
 
 
 async def lifespan_shutdown():
     print("Application shutting down...")
+    await background_tasks.stop(deadline=settings.background_shutdown_deadline)
+    if event_dispatcher is not None:
+        await event_dispatcher.close()
+    if link_health is not None:
+        await link_health.close()
+    qr_codes.close()
 
 
 app = create_app()
@@ -0,0 +1,41 @@
+import argparse
+import sys
+
+from app.config.database import create_database_connection, create_shard_connections, run_migrations
+from app.config.settings import settings
+from app.repositories.api_key_repository import APIKeyRepository
+from app.services.api_key_service import APIKeyService
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.manage_api_keys", description="Issue and revoke API keys.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="issue a new key; the key is printed once and cannot be recovered")
+    create.add_argument("--owner", required=True)
+    create.add_argument("--quota", type=int, default=None, help="maximum active links (default: OWNER_LINK_QUOTA)")
+    revoke = commands.add_parser("revoke", help="deactivate a key")
+    revoke.add_argument("key_id")
+    args = parser.parse_args(argv)
+
+    if settings.db_shard_urls:
+        db_connection = create_shard_connections(settings.db_shard_urls[:1])[0]
+    else:
+        db_connection = create_database_connection()
+    run_migrations(db_connection)
+    service = APIKeyService(APIKeyRepository(db_connection))
+
+    if args.command == "create":
+        api_key, model = service.create_key(args.owner, link_quota=args.quota)
+        print(f"key_id: {model.key_id}")
+        print(f"api_key: {api_key}")
+        return 0
+
+    if not service.revoke(args.key_id):
+        print(f"No API key with id {args.key_id}", file=sys.stderr)
+        return 1
+    print(f"Revoked {args.key_id}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
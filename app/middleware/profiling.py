@@ -0,0 +1,269 @@
+import asyncio
+import contextvars
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+
+from litestar.middleware import MiddlewareProtocol
+from litestar.types import ASGIApp, Message, Receive, Scope, Send
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_current_trace: ContextVar[Optional["RequestTrace"]] = ContextVar("request_trace", default=None)
+# Set while a sampled request runs, so executor threads working for it are sampled too.
+_current_sampler: ContextVar[Optional["StackSampler"]] = ContextVar("request_sampler", default=None)
+
+
+@dataclass
+class RequestTrace:
+    method: str
+    path: str
+    started: float = field(default_factory=time.perf_counter)
+    finished: Optional[float] = None
+    response_started: Optional[float] = None
+    spans: list[tuple[str, float, float]] = field(default_factory=list)
+    queries: list[tuple[str, float]] = field(default_factory=list)
+
+    def add_span(self, name: str, started: float, finished: float):
+        self.spans.append((name, started, finished))
+
+    def add_query(self, statement: str, duration: float):
+        self.queries.append((statement, duration))
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.finished or time.perf_counter()) - self.started) * 1000
+
+    def summary(self) -> dict:
+        spans: dict[str, float] = {}
+        for name, started, finished in self.spans:
+            spans[name] = spans.get(name, 0.0) + (finished - started) * 1000
+        if self.response_started is not None:
+            # Everything between the last handler span and the first byte is
+            # DTO conversion and response encoding.
+            handler_end = max((finished for _, _, finished in self.spans), default=self.started)
+            spans["serialization"] = max(self.response_started - handler_end, 0.0) * 1000
+        sql_ms = sum(duration for _, duration in self.queries) * 1000
+        return {
+            "method": self.method,
+            "path": self.path,
+            "duration_ms": round(self.duration_ms, 3),
+            "spans_ms": {name: round(value, 3) for name, value in spans.items()},
+            "sql_ms": round(sql_ms, 3),
+            "queries": [
+                {"statement": statement, "duration_ms": round(duration * 1000, 3)}
+                for statement, duration in self.queries
+            ],
+        }
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Record a timing span on the current request trace; a no-op when not tracing."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_span(name, started, time.perf_counter())
+
+
+async def run_in_executor(func: Callable[..., Any], *args: Any) -> Any:
+    """Run ``func(*args)`` in the default executor as part of the current request.
+
+    ``loop.run_in_executor`` does not carry context variables over, so the
+    call runs in a copy of the caller's context: its SQL is recorded on the
+    request trace, and for a sampled request the worker thread is sampled
+    while it runs.
+    """
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(None, context.run, _sampled_call, func, *args)
+
+
+def _sampled_call(func: Callable[..., Any], *args: Any) -> Any:
+    sampler = _current_sampler.get()
+    if sampler is None:
+        return func(*args)
+    thread_id = threading.get_ident()
+    sampler.start(thread_id)
+    try:
+        return func(*args)
+    finally:
+        sampler.stop(thread_id)
+
+
+class StackSampler:
+    """Statistical profiler sampling one thread's Python stack at a fixed interval.
+
+    Stacks are aggregated in folded format (``outer;inner count``), which
+    flamegraph.pl and speedscope read directly.
+    """
+
+    def __init__(self, interval: float = 0.005, max_stacks: int = 10_000):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._targets: Counter = Counter()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, thread_id: int):
+        with self._lock:
+            self._targets[thread_id] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+            self._wakeup.notify()
+
+    def stop(self, thread_id: int):
+        with self._lock:
+            self._targets[thread_id] -= 1
+            if self._targets[thread_id] <= 0:
+                del self._targets[thread_id]
+
+    def folded(self) -> str:
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while True:
+            with self._lock:
+                while not self._targets:
+                    self._wakeup.wait()
+                targets = list(self._targets)
+            frames = sys._current_frames()
+            for thread_id in targets:
+                frame = frames.get(thread_id)
+                if frame is not None and thread_id != own_id:
+                    self._record(frame)
+            del frames
+            time.sleep(self.interval)
+
+    def _record(self, frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_filename}:{code.co_name}")
+            frame = frame.f_back
+        stack = ";".join(reversed(names))
+        with self._lock:
+            self.samples += 1
+            if stack in self._stacks or len(self._stacks) < self.max_stacks:
+                self._stacks[stack] += 1
+            else:
+                self._stacks["[truncated]"] += 1
+
+
+class RequestProfiler:
+    """Holds the profiling configuration and the data collected by ``ProfilingMiddleware``."""
+
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        slow_request_ms: float = 0.0,
+        sample_interval: float = 0.005,
+        max_stacks: int = 10_000,
+        max_slow_requests: int = 100,
+    ):
+        self.sample_rate = sample_rate
+        self.slow_request_ms = slow_request_ms
+        self.sampler = StackSampler(interval=sample_interval, max_stacks=max_stacks)
+        self.slow_requests: deque = deque(maxlen=max_slow_requests)
+        self.profiled_requests = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.slow_request_ms > 0
+
+    def record(self, trace: RequestTrace):
+        if self.slow_request_ms <= 0 or trace.duration_ms < self.slow_request_ms:
+            return
+        summary = trace.summary()
+        self.slow_requests.append(summary)
+        logger.warning(
+            "Slow request %s %s took %.1fms (spans=%s, sql=%.1fms in %d queries)",
+            trace.method, trace.path, summary["duration_ms"], summary["spans_ms"],
+            summary["sql_ms"], len(trace.queries),
+        )
+
+
+class ProfilingMiddleware(MiddlewareProtocol):
+    def __init__(self, app: ASGIApp, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = self.profiler.sample_rate > 0 and random.random() < self.profiler.sample_rate
+        if not profile and self.profiler.slow_request_ms <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(method=scope.get("method", ""), path=scope.get("path", ""))
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                trace.response_started = time.perf_counter()
+            await send(message)
+
+        token = _current_trace.set(trace)
+        sampler_token = _current_sampler.set(self.profiler.sampler if profile else None)
+        thread_id = threading.get_ident()
+        if profile:
+            self.profiler.profiled_requests += 1
+            self.profiler.sampler.start(thread_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profile:
+                self.profiler.sampler.stop(thread_id)
+            _current_sampler.reset(sampler_token)
+            _current_trace.reset(token)
+            trace.finished = time.perf_counter()
+            self.profiler.record(trace)
+
+
+_sql_tracing_installed = False
+
+
+def install_sql_tracing():
+    """Record every SQL statement issued while a request trace is active."""
+    global _sql_tracing_installed
+    if _sql_tracing_installed:
+        return
+    _sql_tracing_installed = True
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_trace.get() is not None:
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        trace = _current_trace.get()
+        started = conn.info.get("query_started")
+        if trace is not None and started:
+            trace.add_query(statement, time.perf_counter() - started.pop())
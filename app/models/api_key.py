@@ -0,0 +1,38 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from app.models.url import Base
+
+
+class APIKeyModel(Base):
+    __tablename__ = 'api_keys'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    key_id = Column(String(16), unique=True, nullable=False, index=True)
+    key_hash = Column(String(64), nullable=False)
+    salt = Column(String(32), nullable=False)
+    owner = Column(String(64), nullable=False, index=True)
+    link_quota = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.now(timezone.utc))
+    is_active = Column(Boolean, default=True, nullable=False)
+
+    def __init__(
+        self,
+        key_id: str = "",
+        key_hash: str = "",
+        salt: str = "",
+        owner: str = "",
+        link_quota: Optional[int] = None,
+        created_at: Optional[datetime] = None,
+        is_active: bool = True,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.key_id = key_id
+        self.key_hash = key_hash
+        self.salt = salt
+        self.owner = owner
+        self.link_quota = link_quota
+        if created_at:
+            self.created_at = created_at
+        self.is_active = is_active
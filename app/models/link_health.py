@@ -0,0 +1,31 @@
+from typing import NamedTuple, Optional
+from sqlalchemy import Column, Float, Index, Integer, String, DateTime
+from app.models.url import Base
+
+
+class LinkHealthModel(Base):
+    """Outcome of the latest destination probe for a link, one row per link."""
+    __tablename__ = 'link_health'
+
+    url_id = Column(Integer, primary_key=True, autoincrement=False)
+    short_code = Column(String, nullable=False)
+    status_code = Column(Integer, nullable=True)
+    latency_ms = Column(Float, nullable=True)
+    error = Column(String(255), nullable=True)
+    consecutive_failures = Column(Integer, default=0, nullable=False)
+    checked_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    last_ok_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("idx_link_health_failing", "consecutive_failures", postgresql_where=consecutive_failures > 0),
+    )
+
+
+class LinkProbe(NamedTuple):
+    """Result of probing one link's destination."""
+    url_id: int
+    short_code: str
+    status_code: Optional[int]
+    latency_ms: Optional[float]
+    error: Optional[str]
+    broken: bool
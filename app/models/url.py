@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
-from typing import Optional, Self
+from typing import NamedTuple, Optional, Self
 from dateutil.parser import parse
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index, Text
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -17,6 +17,12 @@ class URLModel(Base):
     click_count = Column(Integer, default=0, nullable=False)
     expires_at = Column(DateTime(timezone=True), nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
+    # Columns added after the first release come with a file in migrations/ (002, 003).
+    routing_rules = Column(Text, nullable=True)
+    owner = Column(String(64), nullable=True)
+
+    # Named as in migrations/003_add_api_keys.sql, so new and upgraded databases match.
+    __table_args__ = (Index("idx_urls_owner", "owner"),)
     
     def __init__(
         self,
@@ -26,6 +32,8 @@ class URLModel(Base):
         click_count: int = 0,
         expires_at: Optional[datetime] = None,
         is_active: bool = True,
+        routing_rules: Optional[str] = None,
+        owner: Optional[str] = None,
         **kwargs
     ):
         super().__init__(**kwargs)
@@ -36,6 +44,8 @@ class URLModel(Base):
         self.click_count = click_count
         self.expires_at = expires_at
         self.is_active = is_active
+        self.routing_rules = routing_rules
+        self.owner = owner
 
     def to_dict(self) -> dict:
         return {
@@ -45,7 +55,9 @@ class URLModel(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "click_count": self.click_count,
             "expires_at": self.expires_at.isoformat() if self.expires_at else None,
-            "is_active": self.is_active
+            "is_active": self.is_active,
+            "routing_rules": self.routing_rules,
+            "owner": self.owner
         }
 
     @classmethod
@@ -69,5 +81,33 @@ class URLModel(Base):
             created_at=created_at,
             click_count=data.get("click_count", 0),
             expires_at=expires_at,
-            is_active=data.get("is_active", True)
+            is_active=data.get("is_active", True),
+            routing_rules=data.get("routing_rules"),
+            owner=data.get("owner")
         )
+
+
+class URLRecord(NamedTuple):
+    """Read-only row of the ``urls`` table, used by the Core repository instead of ORM objects."""
+    id: int
+    original_url: str
+    short_code: str
+    created_at: Optional[datetime]
+    click_count: int
+    expires_at: Optional[datetime]
+    is_active: bool
+    routing_rules: Optional[str] = None
+    owner: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "original_url": self.original_url,
+            "short_code": self.short_code,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "click_count": self.click_count,
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+            "is_active": self.is_active,
+            "routing_rules": self.routing_rules,
+            "owner": self.owner
+        }
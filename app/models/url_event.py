@@ -0,0 +1,67 @@
+import json
+from datetime import datetime, timezone
+from typing import Any, Optional
+from sqlalchemy import DDL, BigInteger, Column, Index, Integer, String, DateTime, Text, event
+from app.models.url import Base
+
+EVENT_CREATED = "created"
+EVENT_DEACTIVATED = "deactivated"
+EVENT_EXPIRED = "expired"
+
+
+class URLEventModel(Base):
+    """Outbox row describing a change to a link, written in the same transaction as the change."""
+    __tablename__ = 'url_events'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_type = Column(String(32), nullable=False)
+    url_id = Column(Integer, nullable=False)
+    short_code = Column(String, nullable=False)
+    payload = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    delivered_at = Column(DateTime(timezone=True), nullable=True)
+    # Set when an event was still undelivered after EVENT_DEAD_LETTER_HOURS; see migrations/007.
+    dead_lettered_at = Column(DateTime(timezone=True), nullable=True)
+    # Id of the writing transaction, filled in by PostgreSQL (NULL on SQLite); see migrations/006.
+    txid = Column(BigInteger, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "idx_url_events_undelivered", "id",
+            postgresql_where=delivered_at.is_(None) & dead_lettered_at.is_(None),
+        ),
+        Index("idx_url_events_txid", "txid", "id"),
+    )
+
+
+class URLEventDeliveryModel(Base):
+    """One endpoint that has accepted an event the other endpoints have not all accepted yet."""
+    __tablename__ = 'url_event_deliveries'
+
+    event_id = Column(Integer, primary_key=True)
+    endpoint = Column(String(2048), primary_key=True)
+    delivered_at = Column(DateTime(timezone=True), nullable=False)
+
+
+event.listen(
+    URLEventModel.__table__,
+    "after_create",
+    DDL("ALTER TABLE url_events ALTER COLUMN txid SET DEFAULT pg_current_xact_id()::text::bigint").execute_if(
+        dialect="postgresql"
+    ),
+)
+
+
+def event_values(event_type: str, url_id: int, short_code: str, payload: Optional[dict[str, Any]] = None) -> dict:
+    """Column values for one ``url_events`` insert."""
+    return {
+        "event_type": event_type,
+        "url_id": url_id,
+        "short_code": short_code,
+        "payload": json.dumps(payload, separators=(",", ":"), default=str) if payload else None,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def created_payload(url) -> dict[str, Any]:
+    return {"original_url": url.original_url, "expires_at": url.expires_at, "owner": url.owner}
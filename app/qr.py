@@ -0,0 +1,36 @@
+import bisect
+import hashlib
+import io
+
+import segno
+
+QR_FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+ERROR_LEVELS = ("l", "m", "q", "h")
+QUIET_ZONE = 4
+# Requested sizes are rounded up to one of these, so clients cannot force a fresh render per pixel.
+QR_SIZES = (64, 128, 256, 512, 1024, 2048)
+
+
+def render_qr(data: str, output_format: str = "png", size: int = 256, error: str = "m") -> bytes:
+    """Render ``data`` as a QR code about ``size`` pixels wide (never smaller than one pixel per module)."""
+    qr = segno.make_qr(data, error=error, boost_error=False)
+    modules = qr.symbol_size(scale=1, border=QUIET_ZONE)[0]
+    buffer = io.BytesIO()
+    qr.save(buffer, kind=output_format, scale=max(1, size // modules), border=QUIET_ZONE)
+    return buffer.getvalue()
+
+
+def snap_size(size: int) -> int:
+    """Round ``size`` up to the nearest of ``QR_SIZES`` (the largest for anything bigger)."""
+    return QR_SIZES[min(bisect.bisect_left(QR_SIZES, size), len(QR_SIZES) - 1)]
+
+
+def render_many(items: list[tuple[str, str, int, str]]) -> list[bytes]:
+    """Render a chunk of ``(data, format, size, error)`` tuples; runs in a worker process."""
+    return [render_qr(*item) for item in items]
+
+
+def qr_digest(data: str, output_format: str, size: int, error: str) -> str:
+    """Content address of a rendering; the output is a pure function of these inputs and the segno version."""
+    key = "\0".join((segno.__version__, data, output_format, str(size), error))
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
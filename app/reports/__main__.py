@@ -0,0 +1,46 @@
+import argparse
+import sys
+import time
+
+from sqlalchemy import create_engine
+
+from app.config.settings import settings
+from app.reports.analytics import ReportAccumulator, read_url_batches, write_reports
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.reports",
+        description="Generate link analytics reports from the urls table.",
+    )
+    parser.add_argument("--output-dir", default="reports", help="directory the report files are written to")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv", dest="output_format")
+    parser.add_argument("--top", type=int, default=100, help="number of links in the top links report")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="rows fetched per cursor batch")
+    parser.add_argument(
+        "--database-url",
+        action="append",
+        dest="database_urls",
+        help="database to read (repeat for several shards); defaults to the configured database or shards",
+    )
+    args = parser.parse_args(argv)
+
+    database_urls = args.database_urls or settings.db_shard_urls or [settings.database_url]
+    accumulator = ReportAccumulator(top_k=args.top)
+    started = time.monotonic()
+    for database_url in database_urls:
+        engine = create_engine(database_url)
+        try:
+            accumulator.add_all(read_url_batches(engine, batch_size=args.batch_size))
+        finally:
+            engine.dispose()
+
+    paths = write_reports(accumulator.reports(), args.output_dir, args.output_format)
+    print(f"Aggregated {accumulator.rows} rows in {time.monotonic() - started:.1f}s")
+    for path in paths:
+        print(f"  {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
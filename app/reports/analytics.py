@@ -0,0 +1,229 @@
+import csv
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+from sqlalchemy import extract, func, select
+from sqlalchemy.engine import Engine
+
+from app.models.url import URLModel
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet output is optional
+    pyarrow = None
+
+DAY = 86400.0
+_UNIX_EPOCH_JULIAN_DAY = 2440587.5
+EXPIRY_BUCKETS = ["expired", "<1d", "1-7d", "7-30d", "30-365d", ">=365d"]
+EXPIRY_EDGES = np.array([-np.inf, 0, DAY, 7 * DAY, 30 * DAY, 365 * DAY, np.inf])
+
+Table = dict[str, list]
+
+# Variable-width strings, so a batch with one long URL does not pad every row to its length.
+STRING = np.dtypes.StringDType()
+
+
+@dataclass
+class URLBatch:
+    """Columnar slice of the ``urls`` table."""
+    ids: np.ndarray
+    short_codes: np.ndarray
+    domains: np.ndarray  # StringDType
+    click_counts: np.ndarray
+    created_at: np.ndarray
+    expires_at: np.ndarray
+    is_active: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def read_url_batches(engine: Engine, batch_size: int = 50_000) -> Iterator[URLBatch]:
+    """Stream the ``urls`` table through a server-side cursor in columnar batches.
+
+    Epoch conversions are done by the database. On PostgreSQL so is the
+    domain extraction; elsewhere domains are parsed with NumPy string ufuncs.
+    """
+    urls = URLModel.__table__
+    native = engine.dialect.name == "postgresql"
+    if native:
+        columns = [
+            func.lower(func.substring(urls.c.original_url, r"^[a-zA-Z][a-zA-Z0-9+.-]*://(?:[^@/]*@)?([^/:?#]+)")),
+            extract("epoch", urls.c.created_at),
+            extract("epoch", urls.c.expires_at),
+        ]
+    else:
+        columns = [
+            urls.c.original_url,
+            (func.julianday(urls.c.created_at) - _UNIX_EPOCH_JULIAN_DAY) * DAY,
+            (func.julianday(urls.c.expires_at) - _UNIX_EPOCH_JULIAN_DAY) * DAY,
+        ]
+
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, max_row_buffer=batch_size).execute(
+            select(urls.c.id, urls.c.short_code, urls.c.click_count, urls.c.is_active, *columns)
+        )
+        for rows in result.partitions(batch_size):
+            table = np.array(rows, dtype=object).reshape(len(rows), 7)
+            domains = np.where(np.equal(table[:, 4], None), "", table[:, 4]).astype(STRING)
+            yield URLBatch(
+                ids=table[:, 0].astype(np.int64),
+                short_codes=table[:, 1],
+                domains=domains if native else _hosts(domains),
+                click_counts=np.nan_to_num(table[:, 2].astype(np.float64)).astype(np.int64),
+                created_at=table[:, 5].astype(np.float64),
+                expires_at=table[:, 6].astype(np.float64),
+                is_active=table[:, 3].astype(bool),
+            )
+
+
+class ReportAccumulator:
+    """Aggregates URL batches into the monthly reports with bounded memory.
+
+    State is limited to the current top-K candidates and one entry per
+    distinct domain and creation day, regardless of how many rows are read.
+    """
+
+    def __init__(self, top_k: int = 100, now: Optional[float] = None):
+        self.top_k = top_k
+        self.now = time.time() if now is None else now
+        self.rows = 0
+        self._top_ids = np.empty(0, dtype=np.int64)
+        self._top_codes = np.empty(0, dtype=object)
+        self._top_clicks = np.empty(0, dtype=np.int64)
+        self._domains = np.empty(0, dtype=STRING)
+        self._domain_links = np.empty(0, dtype=np.int64)
+        self._domain_clicks = np.empty(0, dtype=np.int64)
+        self._days = np.empty(0, dtype=np.int64)
+        self._day_counts = np.empty(0, dtype=np.int64)
+        self._expiry_counts = np.zeros(len(EXPIRY_BUCKETS), dtype=np.int64)
+        self._never_expires = 0
+
+    def add(self, batch: URLBatch):
+        if not len(batch):
+            return
+        self.rows += len(batch)
+        self._add_top_links(batch)
+        self._add_domains(batch)
+        self._add_creation_days(batch)
+        self._add_expiry(batch)
+
+    def add_all(self, batches: Iterable[URLBatch]) -> "ReportAccumulator":
+        for batch in batches:
+            self.add(batch)
+        return self
+
+    def top_links(self) -> Table:
+        order = np.lexsort((self._top_ids, -self._top_clicks))
+        return {
+            "short_code": self._top_codes[order].tolist(),
+            "id": self._top_ids[order].tolist(),
+            "click_count": self._top_clicks[order].tolist(),
+        }
+
+    def clicks_by_domain(self) -> Table:
+        order = np.argsort(-self._domain_clicks, kind="stable")
+        return {
+            "domain": self._domains[order].tolist(),
+            "links": self._domain_links[order].tolist(),
+            "clicks": self._domain_clicks[order].tolist(),
+        }
+
+    def creation_rate(self) -> Table:
+        return {
+            "date": [
+                datetime.fromtimestamp(day * DAY, tz=timezone.utc).date().isoformat()
+                for day in self._days.tolist()
+            ],
+            "links_created": self._day_counts.tolist(),
+        }
+
+    def expiry_distribution(self) -> Table:
+        return {
+            "bucket": EXPIRY_BUCKETS + ["never"],
+            "links": self._expiry_counts.tolist() + [self._never_expires],
+        }
+
+    def reports(self) -> dict[str, Table]:
+        return {
+            "top_links": self.top_links(),
+            "clicks_by_domain": self.clicks_by_domain(),
+            "creation_rate": self.creation_rate(),
+            "expiry_distribution": self.expiry_distribution(),
+        }
+
+    def _add_top_links(self, batch: URLBatch):
+        ids = np.concatenate([self._top_ids, batch.ids])
+        codes = np.concatenate([self._top_codes, batch.short_codes])
+        clicks = np.concatenate([self._top_clicks, batch.click_counts])
+        if len(clicks) > self.top_k:
+            # Partial sort: O(n) selection of the K largest, no full ordering.
+            keep = np.argpartition(-clicks, self.top_k - 1)[:self.top_k]
+            ids, codes, clicks = ids[keep], codes[keep], clicks[keep]
+        self._top_ids, self._top_codes, self._top_clicks = ids, codes, clicks
+
+    def _add_domains(self, batch: URLBatch):
+        unique, inverse = np.unique(batch.domains, return_inverse=True)
+        links = np.bincount(inverse, minlength=len(unique))
+        clicks = np.bincount(inverse, weights=batch.click_counts, minlength=len(unique)).astype(np.int64)
+        self._domains, self._domain_links, self._domain_clicks = _merge_counts(
+            (self._domains, self._domain_links, self._domain_clicks), (unique, links, clicks)
+        )
+
+    def _add_creation_days(self, batch: URLBatch):
+        created = batch.created_at[~np.isnan(batch.created_at)]
+        days, counts = np.unique(np.floor(created / DAY).astype(np.int64), return_counts=True)
+        self._days, self._day_counts = _merge_counts((self._days, self._day_counts), (days, counts))
+
+    def _add_expiry(self, batch: URLBatch):
+        never = np.isnan(batch.expires_at)
+        self._never_expires += int(never.sum())
+        remaining = batch.expires_at[~never] - self.now
+        self._expiry_counts += np.histogram(remaining, bins=EXPIRY_EDGES)[0]
+
+
+def write_reports(reports: dict[str, Table], output_dir: str, output_format: str = "csv") -> list[str]:
+    if output_format not in ("csv", "parquet"):
+        raise ValueError(f"Unsupported report format: {output_format}")
+    if output_format == "parquet" and pyarrow is None:
+        raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for name, table in reports.items():
+        path = os.path.join(output_dir, f"{name}.{output_format}")
+        if output_format == "parquet":
+            pyarrow.parquet.write_table(pyarrow.table(table), path)
+        else:
+            with open(path, "w", newline="") as handle:
+                writer = csv.writer(handle)
+                writer.writerow(table.keys())
+                writer.writerows(zip(*table.values()))
+        paths.append(path)
+    return paths
+
+
+def _merge_counts(current: tuple, new: tuple) -> tuple:
+    """Merge two (sorted keys, *values) groupings into one, summing values per key."""
+    keys = np.concatenate([current[0], new[0]])
+    unique, inverse = np.unique(keys, return_inverse=True)
+    merged = [unique]
+    for current_values, new_values in zip(current[1:], new[1:]):
+        values = np.concatenate([current_values, new_values])
+        merged.append(np.bincount(inverse, weights=values, minlength=len(unique)).astype(np.int64))
+    return tuple(merged)
+
+
+def _hosts(urls: np.ndarray) -> np.ndarray:
+    """Lower-cased host of each URL, the same as the PostgreSQL expression above."""
+    _, separator, rest = np.strings.partition(np.strings.lower(urls), np.array("://", dtype=STRING))
+    for delimiter in "/?#":
+        rest = np.strings.partition(rest, np.array(delimiter, dtype=STRING))[0]
+    host = np.strings.rpartition(rest, np.array("@", dtype=STRING))[2]
+    host = np.strings.partition(host, np.array(":", dtype=STRING))[0]
+    return np.where(separator == "", "", host).astype(STRING)
@@ -0,0 +1,47 @@
+from typing import Optional
+from app.models.api_key import APIKeyModel
+
+
+class APIKeyRepository:
+    """Access to the ``api_keys`` table.
+
+    Every call uses its own short-lived session, so a single repository can be
+    shared by all requests.
+    """
+
+    def __init__(self, db_connection):
+        self.db = db_connection
+
+    def create(self, api_key: APIKeyModel) -> APIKeyModel:
+        with self.db.SessionLocal() as session:
+            try:
+                session.add(api_key)
+                session.commit()
+                session.refresh(api_key)
+                session.expunge(api_key)
+                return api_key
+            except Exception as e:
+                session.rollback()
+                raise Exception(f"Failed to create API key: {str(e)}")
+
+    def get_by_key_id(self, key_id: str) -> Optional[APIKeyModel]:
+        with self.db.SessionLocal() as session:
+            api_key = session.query(APIKeyModel).filter(
+                APIKeyModel.key_id == key_id,
+                APIKeyModel.is_active == True
+            ).first()
+            if api_key is not None:
+                session.expunge(api_key)
+            return api_key
+
+    def deactivate(self, key_id: str) -> bool:
+        with self.db.SessionLocal() as session:
+            try:
+                affected_rows = session.query(APIKeyModel).filter(
+                    APIKeyModel.key_id == key_id
+                ).update({APIKeyModel.is_active: False})
+                session.commit()
+                return affected_rows > 0
+            except Exception as e:
+                session.rollback()
+                raise Exception(f"Failed to deactivate API key: {str(e)}")
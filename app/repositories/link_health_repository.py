@@ -0,0 +1,150 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import bindparam, case, func, or_, select, true
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.link_health import LinkHealthModel, LinkProbe
+from app.models.url import URLModel
+from app.repositories.sharded_url_repository import decode_id, encode_id
+
+_health = LinkHealthModel.__table__
+_urls = URLModel.__table__
+
+# Keyset page of active links that are due for a check: never checked, checked
+# before ``stale_before``, or failing and checked before ``failing_before``.
+_LINKS_DUE = (
+    select(_urls.c.id, _urls.c.short_code, _urls.c.original_url)
+    .select_from(_urls.outerjoin(_health, _health.c.url_id == _urls.c.id))
+    .where(
+        _urls.c.id > bindparam("after_id"),
+        _urls.c.is_active == true(),
+        or_(
+            _health.c.checked_at.is_(None),
+            _health.c.checked_at < bindparam("stale_before"),
+            (_health.c.consecutive_failures > 0) & (_health.c.checked_at < bindparam("failing_before")),
+        ),
+    )
+    .order_by(_urls.c.id)
+    .limit(bindparam("limit"))
+)
+_LIST_BROKEN = (
+    select(
+        _health.c.url_id,
+        _health.c.short_code,
+        _urls.c.original_url,
+        _urls.c.is_active,
+        _health.c.status_code,
+        _health.c.error,
+        _health.c.consecutive_failures,
+        _health.c.checked_at,
+        _health.c.last_ok_at,
+    )
+    .select_from(_health.join(_urls, _urls.c.id == _health.c.url_id))
+    .where(_health.c.consecutive_failures >= bindparam("min_failures"))
+    .order_by(_health.c.consecutive_failures.desc(), _health.c.url_id)
+    .limit(bindparam("limit"))
+)
+
+
+def _upsert(insert):
+    # A failing probe is inserted with consecutive_failures=1 and a passing one with 0,
+    # so the conflict branch can tell them apart through ``excluded``.
+    statement = insert(_health)
+    excluded = statement.excluded
+    return statement.on_conflict_do_update(
+        index_elements=[_health.c.url_id],
+        set_={
+            "short_code": excluded.short_code,
+            "status_code": excluded.status_code,
+            "latency_ms": excluded.latency_ms,
+            "error": excluded.error,
+            "checked_at": excluded.checked_at,
+            "consecutive_failures": case(
+                (excluded.consecutive_failures > 0, _health.c.consecutive_failures + 1), else_=0
+            ),
+            "last_ok_at": func.coalesce(excluded.last_ok_at, _health.c.last_ok_at),
+        },
+    ).returning(_health.c.url_id, _health.c.consecutive_failures)
+
+
+_UPSERT_POSTGRESQL = _upsert(postgresql.insert)
+_UPSERT_SQLITE = _upsert(sqlite.insert)
+
+
+class LinkHealthRepository:
+    """Reads links due for a destination check and records probe results for one database.
+
+    For a shard, ``shard_slot`` is set and URL ids are translated to the
+    global ids used by ``ShardedURLRepository``, both in results and in
+    arguments.
+    """
+
+    def __init__(self, db_connection, shard_slot: Optional[int] = None):
+        self.db = db_connection
+        self.shard_slot = shard_slot
+        self._upsert = _UPSERT_SQLITE if db_connection.engine.dialect.name == "sqlite" else _UPSERT_POSTGRESQL
+
+    def links_due(
+        self,
+        after_id: int,
+        limit: int,
+        stale_before: datetime,
+        failing_before: datetime,
+    ) -> list[tuple[int, str, str]]:
+        """Next page of ``(url_id, short_code, original_url)`` after ``after_id``, in id order."""
+        with self.db.engine.connect() as connection:
+            rows = connection.execute(_LINKS_DUE, {
+                "after_id": self._local_id(after_id),
+                "limit": limit,
+                "stale_before": stale_before,
+                "failing_before": failing_before,
+            }).all()
+        return [(self._global_id(row.id), row.short_code, row.original_url) for row in rows]
+
+    def record(self, probes: list[LinkProbe]) -> dict[int, int]:
+        """Store probe results; returns the consecutive failure count of each broken link."""
+        if not probes:
+            return {}
+        now = datetime.now(timezone.utc)
+        with self.db.engine.begin() as connection:
+            rows = connection.execute(self._upsert, [
+                {
+                    "url_id": self._local_id(probe.url_id),
+                    "short_code": probe.short_code,
+                    "status_code": probe.status_code,
+                    "latency_ms": probe.latency_ms,
+                    "error": probe.error[:255] if probe.error else None,
+                    "checked_at": now,
+                    "consecutive_failures": 1 if probe.broken else 0,
+                    "last_ok_at": None if probe.broken else now,
+                }
+                for probe in probes
+            ]).all()
+        return {self._global_id(row.url_id): row.consecutive_failures for row in rows if row.consecutive_failures}
+
+    def list_broken(self, min_failures: int, limit: int) -> list[dict]:
+        with self.db.engine.connect() as connection:
+            rows = connection.execute(_LIST_BROKEN, {"min_failures": max(min_failures, 1), "limit": limit}).all()
+        return [
+            {
+                "url_id": self._global_id(row.url_id),
+                "short_code": row.short_code,
+                "original_url": row.original_url,
+                "is_active": row.is_active,
+                "status_code": row.status_code,
+                "error": row.error,
+                "consecutive_failures": row.consecutive_failures,
+                "checked_at": row.checked_at.isoformat() if row.checked_at else None,
+                "last_ok_at": row.last_ok_at.isoformat() if row.last_ok_at else None,
+            }
+            for row in rows
+        ]
+
+    def _local_id(self, url_id: int) -> int:
+        if self.shard_slot is None or url_id <= 0:
+            return url_id
+        return decode_id(url_id)[1]
+
+    def _global_id(self, local_id: int) -> int:
+        if self.shard_slot is None:
+            return local_id
+        return encode_id(self.shard_slot, local_id)
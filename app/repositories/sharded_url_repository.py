@@ -0,0 +1,220 @@
+import bisect
+import hashlib
+import itertools
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Sequence, TypeVar
+from app.models.url import URLModel, URLRecord
+from app.repositories.url_repository import URLRepository
+
+T = TypeVar("T")
+
+# Upper bound on the number of shards. Row ids handed out by the sharded
+# repository are ``local_id * SHARD_SLOTS + slot`` so the owning shard can be
+# recovered from an id without a directory lookup.
+SHARD_SLOTS = 1024
+
+# Repositories are built per request, so the round-robin write cursor is
+# shared by the whole process rather than kept on each instance.
+_write_cursor = itertools.count()
+_write_lock = threading.Lock()
+
+
+def stable_hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def encode_id(slot: int, local_id: int) -> int:
+    return local_id * SHARD_SLOTS + slot
+
+
+def decode_id(global_id: int) -> tuple[int, int]:
+    return global_id % SHARD_SLOTS, global_id // SHARD_SLOTS
+
+
+class ConsistentHashRing:
+    """Maps keys to shard slots so that adding a shard only moves ~1/N of the keys."""
+
+    def __init__(self, slots: Sequence[int] = (), virtual_nodes: int = 128):
+        self.virtual_nodes = virtual_nodes
+        self._points: list[int] = []
+        self._owners: list[int] = []
+        for slot in slots:
+            self.add(slot)
+
+    def add(self, slot: int):
+        for replica in range(self.virtual_nodes):
+            point = stable_hash(f"shard-{slot}#{replica}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, slot)
+
+    def remove(self, slot: int):
+        keep = [(point, owner) for point, owner in zip(self._points, self._owners) if owner != slot]
+        self._points = [point for point, _ in keep]
+        self._owners = [owner for _, owner in keep]
+
+    def get(self, key: str) -> int:
+        if not self._points:
+            raise ValueError("Hash ring has no shards")
+        index = bisect.bisect(self._points, stable_hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+class ShardedURLRepository:
+    """Routes URL operations to one of several ``URLRepository`` shards.
+
+    Short codes are placed with consistent hashing over the shards' slot ids;
+    ids returned to callers embed the slot (see ``encode_id``). Models
+    returned from this repository are detached copies carrying the global id.
+
+    Rows are never moved. Each time shards are added, the slots of the ring
+    before the change are prepended to ``previous_rings`` (newest first), and
+    short code lookups that miss on the current owner try the code's owner in
+    each earlier ring in turn.
+    """
+
+    def __init__(
+        self,
+        shards: Sequence[URLRepository],
+        virtual_nodes: int = 128,
+        slots: Optional[Sequence[int]] = None,
+        previous_rings: Sequence[Sequence[int]] = ()
+    ):
+        if not shards:
+            raise ValueError("At least one shard is required")
+        self.shards = list(shards)
+        self.slots = list(slots) if slots is not None else list(range(len(self.shards)))
+        if len(self.slots) != len(self.shards) or len(set(self.slots)) != len(self.slots):
+            raise ValueError("Each shard needs its own slot")
+        if any(not 0 <= slot < SHARD_SLOTS for slot in self.slots):
+            raise ValueError(f"Shard slots must be between 0 and {SHARD_SLOTS - 1}")
+        if any(not set(previous) <= set(self.slots) for previous in previous_rings):
+            raise ValueError("Previous shard slots must still be configured")
+        self._by_slot = dict(zip(self.slots, self.shards))
+        self.ring = ConsistentHashRing(self.slots, virtual_nodes=virtual_nodes)
+        self.previous_rings = [
+            ConsistentHashRing(previous, virtual_nodes=virtual_nodes) for previous in previous_rings if previous
+        ]
+
+    def shard_for_code(self, short_code: str) -> int:
+        return self.ring.get(short_code)
+
+    def next_write_shard(self) -> int:
+        with _write_lock:
+            return self.slots[next(_write_cursor) % len(self.slots)]
+
+    def create(self, url: URLModel) -> URLModel:
+        slot = self.shard_for_code(url.short_code)
+        return self._globalize(self._by_slot[slot].create(url), slot)
+
+    def get_by_short_code(self, short_code: str) -> Optional[URLModel]:
+        slot = self.shard_for_code(short_code)
+        url = self._by_slot[slot].get_by_short_code(short_code)
+        tried = {slot}
+        for ring in self.previous_rings:
+            if url is not None:
+                break
+            previous = ring.get(short_code)
+            if previous not in tried:
+                tried.add(previous)
+                slot, url = previous, self._by_slot[previous].get_by_short_code(short_code)
+        return self._globalize(url, slot)
+
+    def get_by_short_codes(self, short_codes: list[str]) -> list[URLModel]:
+        owners = {short_code: self.shard_for_code(short_code) for short_code in short_codes}
+        urls = self._gather_codes(owners)
+        found = {url.short_code for url in urls}
+        tried = {short_code: {slot} for short_code, slot in owners.items()}
+        for ring in self.previous_rings:
+            fallback = {}
+            for short_code in owners:
+                if short_code in found:
+                    continue
+                previous = ring.get(short_code)
+                if previous not in tried[short_code]:
+                    tried[short_code].add(previous)
+                    fallback[short_code] = previous
+            if fallback:
+                recovered = self._gather_codes(fallback)
+                urls.extend(recovered)
+                found.update(url.short_code for url in recovered)
+        return urls
+
+    def get_by_id(self, url_id: int) -> Optional[URLModel]:
+        slot, local_id = self._locate(url_id)
+        if slot is None:
+            return None
+        return self._globalize(self._by_slot[slot].get_by_id(local_id), slot)
+
+    def increment_click_count(self, url_id: int) -> Optional[URLModel]:
+        slot, local_id = self._locate(url_id)
+        if slot is None:
+            return None
+        return self._globalize(self._by_slot[slot].increment_click_count(local_id), slot)
+
+    def increment_click_counts(self, counts: dict[int, int]) -> int:
+        counts_by_shard: dict[URLRepository, dict[int, int]] = {}
+        for url_id, increment in counts.items():
+            slot, local_id = self._locate(url_id)
+            if slot is not None:
+                counts_by_shard.setdefault(self._by_slot[slot], {})[local_id] = increment
+        return sum(self.scatter_gather(
+            lambda shard: shard.increment_click_counts(counts_by_shard[shard]) if shard in counts_by_shard else 0
+        ))
+
+    def deactivate_url(self, url_id: int) -> bool:
+        slot, local_id = self._locate(url_id)
+        if slot is None:
+            return False
+        return self._by_slot[slot].deactivate_url(local_id)
+
+    def cleanup_expired_urls(self) -> int:
+        return sum(self.scatter_gather(lambda shard: shard.cleanup_expired_urls()))
+
+    def count_active_by_owner(self) -> dict[str, int]:
+        totals: Counter = Counter()
+        for counts in self.scatter_gather(lambda shard: shard.count_active_by_owner()):
+            totals.update(counts)
+        return dict(totals)
+
+    def scatter_gather(self, operation: Callable[[URLRepository], T]) -> list[T]:
+        """Run ``operation`` against every shard concurrently, results in shard order."""
+        if len(self.shards) == 1:
+            return [operation(self.shards[0])]
+        with ThreadPoolExecutor(max_workers=len(self.shards)) as executor:
+            return list(executor.map(operation, self.shards))
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
+
+    def _gather_codes(self, owners: dict[str, int]) -> list[URLModel]:
+        codes_by_shard: dict[URLRepository, list[str]] = {}
+        for short_code, slot in owners.items():
+            codes_by_shard.setdefault(self._by_slot[slot], []).append(short_code)
+        results = self.scatter_gather(
+            lambda shard: shard.get_by_short_codes(codes_by_shard[shard]) if shard in codes_by_shard else []
+        )
+        return [
+            self._globalize(url, slot)
+            for slot, urls in zip(self.slots, results)
+            for url in urls
+        ]
+
+    def _locate(self, url_id: int) -> tuple[Optional[int], int]:
+        slot, local_id = decode_id(url_id)
+        if slot not in self._by_slot:
+            return None, local_id
+        return slot, local_id
+
+    @staticmethod
+    def _globalize(url: Optional[URLModel], slot: int) -> Optional[URLModel]:
+        if not url:
+            return None
+        if isinstance(url, URLRecord):
+            return url._replace(id=encode_id(slot, url.id))
+        data = url.to_dict()
+        data["id"] = encode_id(slot, url.id)
+        return URLModel.from_dict(data)
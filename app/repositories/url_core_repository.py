@@ -0,0 +1,172 @@
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import String, any_, bindparam, func, insert, select, true, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from app.models.url import URLModel, URLRecord
+from app.models.url_event import (
+    EVENT_CREATED, EVENT_DEACTIVATED, EVENT_EXPIRED, URLEventModel, created_payload, event_values
+)
+
+_urls = URLModel.__table__
+_events = URLEventModel.__table__
+_COLUMNS = (
+    _urls.c.id,
+    _urls.c.original_url,
+    _urls.c.short_code,
+    _urls.c.created_at,
+    _urls.c.click_count,
+    _urls.c.expires_at,
+    _urls.c.is_active,
+    _urls.c.routing_rules,
+    _urls.c.owner,
+)
+
+# Built once at import: SQLAlchemy caches the compiled form of each statement
+# per dialect, so executing them skips query construction and compilation.
+_SELECT_BY_SHORT_CODE = select(*_COLUMNS).where(
+    _urls.c.short_code == bindparam("short_code"), _urls.c.is_active == true()
+)
+# PostgreSQL binds the whole batch as one array; other dialects expand an IN list.
+_SELECT_BY_SHORT_CODES_ANY = select(*_COLUMNS).where(
+    _urls.c.short_code == any_(bindparam("short_codes", type_=ARRAY(String))), _urls.c.is_active == true()
+)
+_SELECT_BY_SHORT_CODES_IN = select(*_COLUMNS).where(
+    _urls.c.short_code.in_(bindparam("short_codes", expanding=True)), _urls.c.is_active == true()
+)
+_SELECT_BY_ID = select(*_COLUMNS).where(_urls.c.id == bindparam("url_id"))
+_INSERT = insert(_urls).returning(*_COLUMNS)
+_INCREMENT_CLICK_COUNT = (
+    update(_urls)
+    .where(_urls.c.id == bindparam("url_id"))
+    .values(click_count=_urls.c.click_count + 1)
+    .returning(*_COLUMNS)
+)
+_ADD_CLICKS = (
+    update(_urls)
+    .where(_urls.c.id == bindparam("url_id"))
+    .values(click_count=_urls.c.click_count + bindparam("increment"))
+)
+_DEACTIVATE = (
+    update(_urls)
+    .where(_urls.c.id == bindparam("url_id"), _urls.c.is_active == true())
+    .values(is_active=False)
+    .returning(_urls.c.short_code)
+)
+_CLEANUP_EXPIRED = (
+    update(_urls)
+    .where(_urls.c.expires_at < bindparam("now"), _urls.c.is_active == true())
+    .values(is_active=False)
+    .returning(_urls.c.id, _urls.c.short_code)
+)
+_INSERT_EVENT = insert(_events)
+_COUNT_ACTIVE_BY_OWNER = (
+    select(_urls.c.owner, func.count(_urls.c.id))
+    .where(_urls.c.owner.isnot(None), _urls.c.is_active == true())
+    .group_by(_urls.c.owner)
+)
+
+
+class URLCoreRepository:
+    """``URLRepository`` counterpart built on SQLAlchemy Core.
+
+    Uses pre-built statements, returns ``URLRecord`` tuples instead of ORM
+    objects and runs reads as single autocommitted statements, so every call
+    is one round-trip with no identity map or refresh. Writes that emit an
+    outbox event run the change and the event insert in one transaction.
+    """
+
+    def __init__(self, db_connection):
+        self.db = db_connection
+        self.engine = db_connection.engine.execution_options(isolation_level="AUTOCOMMIT")
+        if self.engine.dialect.name == "postgresql":
+            self._select_by_short_codes = _SELECT_BY_SHORT_CODES_ANY
+        else:
+            self._select_by_short_codes = _SELECT_BY_SHORT_CODES_IN
+
+    def create(self, url: URLModel) -> URLRecord:
+        try:
+            with self.db.engine.begin() as connection:
+                row = connection.execute(_INSERT, {
+                    "original_url": url.original_url,
+                    "short_code": url.short_code,
+                    "created_at": url.created_at,
+                    "click_count": url.click_count or 0,
+                    "expires_at": url.expires_at,
+                    "is_active": url.is_active,
+                    "routing_rules": url.routing_rules,
+                    "owner": url.owner,
+                }).one()
+                record = URLRecord(*row)
+                connection.execute(
+                    _INSERT_EVENT, event_values(EVENT_CREATED, record.id, record.short_code, created_payload(record))
+                )
+            return record
+        except Exception as e:
+            raise Exception(f"Failed to create URL: {str(e)}")
+
+    def get_by_short_code(self, short_code: str) -> Optional[URLRecord]:
+        with self.engine.connect() as connection:
+            row = connection.execute(_SELECT_BY_SHORT_CODE, {"short_code": short_code}).first()
+        return URLRecord(*row) if row else None
+
+    def get_by_short_codes(self, short_codes: list[str]) -> list[URLRecord]:
+        if not short_codes:
+            return []
+        with self.engine.connect() as connection:
+            rows = connection.execute(self._select_by_short_codes, {"short_codes": list(short_codes)}).all()
+        return [URLRecord(*row) for row in rows]
+
+    def get_by_id(self, url_id: int) -> Optional[URLRecord]:
+        with self.engine.connect() as connection:
+            row = connection.execute(_SELECT_BY_ID, {"url_id": url_id}).first()
+        return URLRecord(*row) if row else None
+
+    def increment_click_count(self, url_id: int) -> Optional[URLRecord]:
+        try:
+            with self.engine.connect() as connection:
+                row = connection.execute(_INCREMENT_CLICK_COUNT, {"url_id": url_id}).first()
+            return URLRecord(*row) if row else None
+        except Exception as e:
+            raise Exception(f"Failed to increment click count: {str(e)}")
+
+    def increment_click_counts(self, counts: dict[int, int]) -> int:
+        if not counts:
+            return 0
+        try:
+            with self.db.engine.begin() as connection:
+                return connection.execute(_ADD_CLICKS, [
+                    {"url_id": url_id, "increment": increment} for url_id, increment in counts.items()
+                ]).rowcount
+        except Exception as e:
+            raise Exception(f"Failed to increment click counts: {str(e)}")
+
+    def deactivate_url(self, url_id: int) -> bool:
+        try:
+            with self.db.engine.begin() as connection:
+                row = connection.execute(_DEACTIVATE, {"url_id": url_id}).first()
+                if row is None:
+                    # Already inactive links still count as deactivated, without a new event.
+                    return connection.execute(_SELECT_BY_ID, {"url_id": url_id}).first() is not None
+                connection.execute(_INSERT_EVENT, event_values(EVENT_DEACTIVATED, url_id, row.short_code))
+                return True
+        except Exception as e:
+            raise Exception(f"Failed to deactivate URL: {str(e)}")
+
+    def cleanup_expired_urls(self) -> int:
+        try:
+            with self.db.engine.begin() as connection:
+                expired = connection.execute(_CLEANUP_EXPIRED, {"now": datetime.utcnow()}).all()
+                if expired:
+                    connection.execute(_INSERT_EVENT, [
+                        event_values(EVENT_EXPIRED, url_id, short_code) for url_id, short_code in expired
+                    ])
+            return len(expired)
+        except Exception as e:
+            raise Exception(f"Failed to cleanup expired URLs: {str(e)}")
+
+    def count_active_by_owner(self) -> dict[str, int]:
+        with self.engine.connect() as connection:
+            return {owner: count for owner, count in connection.execute(_COUNT_ACTIVE_BY_OWNER)}
+
+    def close(self):
+        pass
@@ -0,0 +1,224 @@
+import json
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import bindparam, delete, exists, func, insert, literal_column, or_, select, text, tuple_, update
+from app.models.url_event import URLEventDeliveryModel, URLEventModel
+from app.repositories.sharded_url_repository import decode_id, encode_id
+
+_events = URLEventModel.__table__
+_deliveries = URLEventDeliveryModel.__table__
+_COLUMNS = (
+    _events.c.id,
+    _events.c.event_type,
+    _events.c.url_id,
+    _events.c.short_code,
+    _events.c.payload,
+    _events.c.created_at,
+)
+
+# Ids are handed out on insert but become visible on commit, so on PostgreSQL
+# a reader paging by id alone can move past an event whose transaction commits
+# late. There events are paged by (txid, id) and only returned once their
+# transaction is older than every transaction still running: anything that
+# commits later has a larger txid and sorts after the cursor. SQLite runs one
+# writer at a time, so its ids already commit in order.
+_LIST_AFTER = (
+    select(*_COLUMNS, _events.c.txid)
+    .where(_events.c.id > bindparam("after_id"))
+    .order_by(_events.c.id)
+    .limit(bindparam("limit"))
+)
+_LIST_AFTER_POSTGRESQL = (
+    select(*_COLUMNS, _events.c.txid)
+    .where(
+        tuple_(_events.c.txid, _events.c.id) > tuple_(bindparam("after_txid"), bindparam("after_id")),
+        _events.c.txid < literal_column("pg_snapshot_xmin(pg_current_snapshot())::text::bigint"),
+    )
+    .order_by(_events.c.txid, _events.c.id)
+    .limit(bindparam("limit"))
+)
+_UNDELIVERED = (_events.c.delivered_at.is_(None), _events.c.dead_lettered_at.is_(None))
+_PENDING = (
+    select(*_COLUMNS)
+    .where(*_UNDELIVERED)
+    .order_by(_events.c.id)
+    .limit(bindparam("limit"))
+)
+_PENDING_FOR_ENDPOINT = (
+    select(*_COLUMNS)
+    .where(
+        *_UNDELIVERED,
+        ~exists().where(
+            _deliveries.c.event_id == _events.c.id, _deliveries.c.endpoint == bindparam("endpoint")
+        ),
+    )
+    .order_by(_events.c.id)
+    .limit(bindparam("limit"))
+)
+_MARK_DELIVERED = (
+    update(_events)
+    .where(_events.c.id.in_(bindparam("event_ids", expanding=True)))
+    .values(delivered_at=bindparam("delivered_at"))
+)
+_RECORD_DELIVERY = insert(_deliveries)
+# An event is delivered once every configured endpoint has a delivery row for it.
+_MARK_DELIVERED_TO_ALL = (
+    update(_events)
+    .where(
+        _events.c.id.in_(bindparam("event_ids", expanding=True)),
+        select(func.count())
+        .where(
+            _deliveries.c.event_id == _events.c.id,
+            _deliveries.c.endpoint.in_(bindparam("endpoints", expanding=True)),
+        )
+        .scalar_subquery() == bindparam("endpoint_count"),
+    )
+    .values(delivered_at=bindparam("delivered_at"))
+)
+_CLEAR_DELIVERIES = delete(_deliveries).where(
+    _deliveries.c.event_id.in_(
+        select(_events.c.id).where(
+            _events.c.id.in_(bindparam("event_ids", expanding=True)), _events.c.delivered_at.isnot(None)
+        )
+    )
+)
+_DEAD_LETTER = (
+    update(_events)
+    .where(*_UNDELIVERED, _events.c.created_at < bindparam("before"))
+    .values(dead_lettered_at=bindparam("dead_lettered_at"))
+)
+_PURGE_DELIVERED = delete(_events).where(
+    _events.c.created_at < bindparam("before"),
+    or_(_events.c.delivered_at.isnot(None), _events.c.dead_lettered_at.isnot(None)),
+)
+_PURGE_ALL = delete(_events).where(_events.c.created_at < bindparam("before"))
+_PURGE_DELIVERIES = delete(_deliveries).where(~exists().where(_events.c.id == _deliveries.c.event_id))
+
+# Only one dispatcher at a time delivers a database's outbox, so that events for
+# one short code are never posted by two app instances at once.
+_DISPATCH_LOCK_ID = 7_301_948_212
+
+
+class URLEventRepository:
+    """Reads the ``url_events`` outbox of one database.
+
+    Events are returned as JSON-ready dicts. For a shard, ``shard_slot`` is
+    set and event and URL ids are translated to the global ids used by
+    ``ShardedURLRepository``, both in results and in arguments.
+    """
+
+    def __init__(self, db_connection, shard_slot: Optional[int] = None):
+        self.db = db_connection
+        self.shard_slot = shard_slot
+        self._lock_connection = None
+        self._list_after = _LIST_AFTER_POSTGRESQL if db_connection.engine.dialect.name == "postgresql" else _LIST_AFTER
+
+    def list_after(self, after_id: int, limit: int, after_txid: int = 0) -> list[dict]:
+        """Events after the ``(after_txid, after_id)`` position, each with its ``txid`` (0 on SQLite)."""
+        with self.db.engine.connect() as connection:
+            rows = connection.execute(self._list_after, {
+                "after_id": self._local_id(after_id), "after_txid": after_txid, "limit": limit
+            }).all()
+        return [{**self._to_dict(row), "txid": row.txid or 0} for row in rows]
+
+    def pending(self, limit: int, endpoint: Optional[str] = None) -> list[dict]:
+        """Oldest undelivered events, or with ``endpoint`` those that endpoint has not accepted yet."""
+        with self.db.engine.connect() as connection:
+            if endpoint is None:
+                rows = connection.execute(_PENDING, {"limit": limit}).all()
+            else:
+                rows = connection.execute(_PENDING_FOR_ENDPOINT, {"limit": limit, "endpoint": endpoint}).all()
+        return [self._to_dict(row) for row in rows]
+
+    def record_deliveries(self, endpoint: str, event_ids: list[int], endpoints: list[str]) -> int:
+        """Record that ``endpoint`` accepted ``event_ids``; returns how many are now delivered to all ``endpoints``."""
+        if not event_ids:
+            return 0
+        local_ids = [self._local_id(event_id) for event_id in event_ids]
+        now = datetime.now(timezone.utc)
+        with self.db.engine.begin() as connection:
+            connection.execute(_RECORD_DELIVERY, [
+                {"event_id": event_id, "endpoint": endpoint, "delivered_at": now} for event_id in local_ids
+            ])
+            delivered = connection.execute(_MARK_DELIVERED_TO_ALL, {
+                "event_ids": local_ids,
+                "endpoints": endpoints,
+                "endpoint_count": len(set(endpoints)),
+                "delivered_at": now,
+            }).rowcount
+            if delivered:
+                connection.execute(_CLEAR_DELIVERIES, {"event_ids": local_ids})
+        return delivered
+
+    def dead_letter(self, before: datetime) -> int:
+        """Stop retrying events created before ``before`` that are still undelivered."""
+        with self.db.engine.begin() as connection:
+            return connection.execute(_DEAD_LETTER, {
+                "before": before, "dead_lettered_at": datetime.now(timezone.utc)
+            }).rowcount
+
+    def try_lock_dispatch(self) -> bool:
+        """Take this database's dispatcher lock, held until ``unlock_dispatch``.
+
+        On PostgreSQL this is a session advisory lock, released by the server
+        if the holder goes away. Other databases serve one process and always
+        grant it.
+        """
+        if self.db.engine.dialect.name != "postgresql":
+            return True
+        connection = self.db.engine.connect()
+        locked = connection.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": _DISPATCH_LOCK_ID}).scalar()
+        # The lock belongs to the session, so the transaction need not stay open.
+        connection.commit()
+        if locked:
+            self._lock_connection = connection
+            return True
+        connection.close()
+        return False
+
+    def unlock_dispatch(self):
+        if self._lock_connection is None:
+            return
+        try:
+            self._lock_connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": _DISPATCH_LOCK_ID})
+            self._lock_connection.commit()
+        finally:
+            self._lock_connection.close()
+            self._lock_connection = None
+
+    def mark_delivered(self, event_ids: list[int]) -> int:
+        if not event_ids:
+            return 0
+        with self.db.engine.begin() as connection:
+            return connection.execute(_MARK_DELIVERED, {
+                "event_ids": [self._local_id(event_id) for event_id in event_ids],
+                "delivered_at": datetime.now(timezone.utc),
+            }).rowcount
+
+    def purge(self, before: datetime, delivered_only: bool = True) -> int:
+        """Delete events created before ``before``; with ``delivered_only``, only delivered or dead-lettered ones."""
+        with self.db.engine.begin() as connection:
+            statement = _PURGE_DELIVERED if delivered_only else _PURGE_ALL
+            purged = connection.execute(statement, {"before": before}).rowcount
+            connection.execute(_PURGE_DELIVERIES)
+            return purged
+
+    def _local_id(self, event_id: int) -> int:
+        if self.shard_slot is None or event_id <= 0:
+            return event_id
+        return decode_id(event_id)[1]
+
+    def _global_id(self, local_id: int) -> int:
+        if self.shard_slot is None:
+            return local_id
+        return encode_id(self.shard_slot, local_id)
+
+    def _to_dict(self, row) -> dict:
+        return {
+            "id": self._global_id(row.id),
+            "event_type": row.event_type,
+            "url_id": self._global_id(row.url_id),
+            "short_code": row.short_code,
+            "payload": json.loads(row.payload) if row.payload else {},
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+        }
@@ -1,8 +1,12 @@
 from typing import Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import String, any_, bindparam, func, insert, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from app.models.url import URLModel
+from app.models.url_event import (
+    EVENT_CREATED, EVENT_DEACTIVATED, EVENT_EXPIRED, URLEventModel, created_payload, event_values
+)
 
 
 class URLRepository:
@@ -13,6 +17,10 @@ class URLRepository:
         session = self.db.get_session()
         try:
             session.add(url)
+            session.flush()
+            session.execute(insert(URLEventModel), [
+                event_values(EVENT_CREATED, url.id, url.short_code, created_payload(url))
+            ])
             session.commit()
             session.refresh(url)
             return url
@@ -27,6 +35,17 @@ class URLRepository:
             URLModel.is_active == True
         ).first()
 
+    def get_by_short_codes(self, short_codes: list[str]) -> list[URLModel]:
+        if not short_codes:
+            return []
+        session = self.db.get_session()
+        if session.bind is not None and session.bind.dialect.name == "postgresql":
+            # A single array parameter keeps the statement text identical for any batch size.
+            condition = URLModel.short_code == any_(bindparam("short_codes", list(short_codes), type_=ARRAY(String)))
+        else:
+            condition = URLModel.short_code.in_(short_codes)
+        return session.query(URLModel).filter(condition, URLModel.is_active == True).all()
+
     def get_by_id(self, url_id: int) -> Optional[URLModel]:
         session = self.db.get_session()
         return session.query(URLModel).filter(URLModel.id == url_id).first()
@@ -44,11 +63,33 @@ class URLRepository:
             session.rollback()
             raise Exception(f"Failed to increment click count: {str(e)}")
 
+    def increment_click_counts(self, counts: dict[int, int]) -> int:
+        session = self.db.get_session()
+        try:
+            # One UPDATE per distinct increment instead of one per URL.
+            ids_by_increment: dict[int, list[int]] = {}
+            for url_id, increment in counts.items():
+                ids_by_increment.setdefault(increment, []).append(url_id)
+            affected_rows = 0
+            for increment, url_ids in ids_by_increment.items():
+                affected_rows += session.query(URLModel).filter(
+                    URLModel.id.in_(url_ids)
+                ).update({URLModel.click_count: URLModel.click_count + increment}, synchronize_session=False)
+            session.commit()
+            return affected_rows
+        except Exception as e:
+            session.rollback()
+            raise Exception(f"Failed to increment click counts: {str(e)}")
+
     def deactivate_url(self, url_id: int) -> bool:
         session = self.db.get_session()
         try:
             url = session.query(URLModel).filter(URLModel.id == url_id).first()
             if url:
+                if url.is_active:
+                    session.execute(insert(URLEventModel), [
+                        event_values(EVENT_DEACTIVATED, url.id, url.short_code)
+                    ])
                 url.is_active = False
                 session.commit()
                 return True
@@ -60,12 +101,30 @@ class URLRepository:
     def cleanup_expired_urls(self) -> int:
         session = self.db.get_session()
         try:
-            affected_rows = session.query(URLModel).filter(
-                URLModel.expires_at < datetime.utcnow(),
-                URLModel.is_active == True
-            ).update({URLModel.is_active: False})
+            expired = session.execute(
+                update(URLModel)
+                .where(URLModel.expires_at < datetime.utcnow(), URLModel.is_active == True)
+                .values(is_active=False)
+                .returning(URLModel.id, URLModel.short_code)
+                .execution_options(synchronize_session=False)
+            ).all()
+            if expired:
+                session.execute(insert(URLEventModel), [
+                    event_values(EVENT_EXPIRED, url_id, short_code) for url_id, short_code in expired
+                ])
             session.commit()
-            return affected_rows
+            return len(expired)
         except Exception as e:
             session.rollback()
-            raise Exception(f"Failed to cleanup expired URLs: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Failed to cleanup expired URLs: {str(e)}")
+
+    def count_active_by_owner(self) -> dict[str, int]:
+        session = self.db.get_session()
+        rows = session.query(URLModel.owner, func.count(URLModel.id)).filter(
+            URLModel.owner.isnot(None),
+            URLModel.is_active == True
+        ).group_by(URLModel.owner).all()
+        return {owner: count for owner, count in rows}
+
+    def close(self):
+        self.db.close_session()
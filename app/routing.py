@@ -0,0 +1,141 @@
+import bisect
+import json
+import re
+import time
+import zlib
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+
+DEVICE_CLASSES = ("bot", "tablet", "mobile", "desktop")
+ANY_LANGUAGE = "*"
+SPLIT_BUCKETS = 100
+
+_BOT_PATTERN = re.compile(r"bot|crawl|spider|slurp|facebookexternalhit|preview|curl|wget", re.IGNORECASE)
+_TABLET_PATTERN = re.compile(r"ipad|tablet|kindle|silk|playbook|android(?!.*mobile)", re.IGNORECASE)
+_MOBILE_PATTERN = re.compile(r"mobi|iphone|ipod|android|blackberry|opera mini|iemobile", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def classify_device(user_agent: str) -> str:
+    if not user_agent or _BOT_PATTERN.search(user_agent):
+        return "bot"
+    if _TABLET_PATTERN.search(user_agent):
+        return "tablet"
+    if _MOBILE_PATTERN.search(user_agent):
+        return "mobile"
+    return "desktop"
+
+
+def primary_language(accept_language: str) -> str:
+    """Primary subtag of the client's first language preference, e.g. ``de`` for ``de-DE,en;q=0.8``."""
+    first = accept_language.split(",", 1)[0].split(";", 1)[0].strip()
+    return first.split("-", 1)[0].lower() or ANY_LANGUAGE
+
+
+class _Candidate:
+    __slots__ = ("start", "end", "targets")
+
+    def __init__(self, start: Optional[float], end: Optional[float], targets: tuple[str, ...]):
+        self.start = start
+        self.end = end
+        self.targets = targets
+
+
+class CompiledRouter:
+    """Decision table built from a link's routing rules.
+
+    Every (device class, language) pair is mapped ahead of time to the
+    rules that can apply to it, in priority order, cut off after the first
+    rule without a time window. Weighted splits are expanded into a
+    ``SPLIT_BUCKETS``-entry table, so a request resolves with two dict
+    lookups, usually one time-window check and one index.
+    """
+
+    def __init__(self, rules: list[dict]):
+        languages = {ANY_LANGUAGE}
+        for rule in rules:
+            languages.update(_languages(rule) or ())
+
+        self._table: dict[tuple[str, str], tuple[_Candidate, ...]] = {}
+        for device in DEVICE_CLASSES:
+            for language in languages:
+                candidates = []
+                for rule in rules:
+                    devices = rule.get("devices")
+                    rule_languages = _languages(rule)
+                    if devices and device not in devices:
+                        continue
+                    if rule_languages and language not in rule_languages:
+                        continue
+                    candidate = _Candidate(
+                        _timestamp(rule.get("start_at")),
+                        _timestamp(rule.get("end_at")),
+                        _split_table(rule["targets"]),
+                    )
+                    candidates.append(candidate)
+                    if candidate.start is None and candidate.end is None:
+                        break
+                self._table[(device, language)] = tuple(candidates)
+
+    def resolve(
+        self,
+        user_agent: str = "",
+        accept_language: str = "",
+        client_key: str = "",
+        now: Optional[float] = None,
+    ) -> Optional[str]:
+        device = classify_device(user_agent)
+        candidates = self._table.get((device, primary_language(accept_language)))
+        if candidates is None:
+            candidates = self._table[(device, ANY_LANGUAGE)]
+        if not candidates:
+            return None
+
+        if now is None:
+            now = time.time()
+        for candidate in candidates:
+            if candidate.start is not None and now < candidate.start:
+                continue
+            if candidate.end is not None and now >= candidate.end:
+                continue
+            # Sticky split: the same client always lands in the same bucket.
+            bucket = zlib.crc32(client_key.encode("utf-8")) % SPLIT_BUCKETS
+            return candidate.targets[bucket]
+        return None
+
+
+@lru_cache(maxsize=10_000)
+def compile_rules(routing_rules: str) -> CompiledRouter:
+    """Compile a link's JSON routing rules; cached by the rules text."""
+    return CompiledRouter(json.loads(routing_rules))
+
+
+def _languages(rule: dict) -> Optional[set[str]]:
+    languages = rule.get("languages")
+    if not languages:
+        return None
+    return {language.split("-", 1)[0].lower() for language in languages}
+
+
+def _split_table(targets: list[dict]) -> tuple[str, ...]:
+    urls = [target["url"] for target in targets]
+    cumulative = []
+    total = 0
+    for target in targets:
+        total += target.get("weight", 1)
+        cumulative.append(total)
+    return tuple(
+        urls[bisect.bisect_right(cumulative, bucket * total / SPLIT_BUCKETS)]
+        for bucket in range(SPLIT_BUCKETS)
+    )
+
+
+def _timestamp(value) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
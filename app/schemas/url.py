@@ -1,13 +1,53 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Literal, Optional
 from litestar.contrib.pydantic import PydanticDTO
-from pydantic import BaseModel, HttpUrl, Field
+from pydantic import BaseModel, HttpUrl, Field, field_validator
+
+
+class RoutingTarget(BaseModel):
+    url: str
+    weight: int = Field(1, ge=1, le=10000)
+
+
+class RoutingRule(BaseModel):
+    devices: Optional[list[Literal["mobile", "tablet", "desktop", "bot"]]] = None
+    languages: Optional[list[str]] = None
+    start_at: Optional[datetime] = None
+    end_at: Optional[datetime] = None
+    targets: list[RoutingTarget] = Field(..., min_length=1, max_length=20)
 
 
 class CreateURLRequest(BaseModel):
     original_url: str
     custom_code: Optional[str] = Field(None, min_length=3, max_length=20, pattern="^[a-zA-Z0-9_-]+$")
     expires_at: Optional[datetime] = None
+    # Kept as plain dicts so the DTO does not have to rebuild nested models;
+    # each rule is still validated against RoutingRule.
+    routing_rules: Optional[list[dict[str, Any]]] = Field(None, max_length=50)
+
+    @field_validator("routing_rules")
+    @classmethod
+    def validate_routing_rules(cls, value: Optional[list[dict[str, Any]]]) -> Optional[list[dict[str, Any]]]:
+        if value is None:
+            return None
+        return [RoutingRule.model_validate(rule).model_dump(mode="json", exclude_none=True) for rule in value]
+
+
+BATCH_STATS_MAX_CODES = 5000
+
+
+class BatchStatsRequest(BaseModel):
+    short_codes: list[str] = Field(..., min_length=1, max_length=BATCH_STATS_MAX_CODES)
+
+
+QR_BATCH_MAX_CODES = 10000
+
+
+class QRBatchRequest(BaseModel):
+    short_codes: list[str] = Field(..., min_length=1, max_length=QR_BATCH_MAX_CODES)
+    format: Literal["png", "svg"] = "png"
+    size: int = Field(256, ge=64, le=2048)
+    error: Literal["l", "m", "q", "h"] = "m"
 
 
 class URLResponse(BaseModel):
@@ -33,5 +73,7 @@ class URLStatsResponse(BaseModel):
 
 
 CreateURLDTO = PydanticDTO[CreateURLRequest]
+BatchStatsDTO = PydanticDTO[BatchStatsRequest]
+QRBatchDTO = PydanticDTO[QRBatchRequest]
 URLResponseDTO = PydanticDTO[URLResponse]
 URLStatsDTO = PydanticDTO[URLStatsResponse]
\ No newline at end of file
@@ -0,0 +1,143 @@
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, NamedTuple, Optional
+from app.middleware.profiling import run_in_executor
+from app.models.api_key import APIKeyModel
+from app.repositories.api_key_repository import APIKeyRepository
+from app.services.lookup_cache import LookupCache
+
+KEY_PREFIX = "usk"
+
+# scrypt cost parameters: roughly 50ms and 16MB per hash, paid once per key per cache TTL.
+_SCRYPT_N = 2 ** 14
+_SCRYPT_R = 8
+_SCRYPT_P = 1
+
+
+class APIKeyIdentity(NamedTuple):
+    key_id: str
+    owner: str
+    link_quota: Optional[int]
+
+
+def hash_secret(secret: str, salt: str) -> str:
+    return hashlib.scrypt(
+        secret.encode("utf-8"), salt=bytes.fromhex(salt), n=_SCRYPT_N, r=_SCRYPT_R, p=_SCRYPT_P, dklen=32
+    ).hex()
+
+
+def parse_api_key(api_key: str) -> Optional[tuple[str, str]]:
+    """Split ``usk_<key_id>_<secret>`` into ``(key_id, secret)``; ``None`` if malformed."""
+    prefix, _, rest = api_key.partition("_")
+    key_id, _, secret = rest.partition("_")
+    if prefix != KEY_PREFIX or not key_id or not secret or len(key_id) > 16:
+        return None
+    return key_id, secret
+
+
+class APIKeyService:
+    """Issues and verifies API keys.
+
+    Only a salted scrypt hash of each key's secret is stored. Successful
+    verifications are cached under the SHA-256 of the presented key, so the
+    expensive hash and the database lookup run once per key per cache TTL
+    rather than on every request. Verification runs off the event loop.
+
+    Failures are bounded too: a rejected key is remembered for
+    ``failure_ttl`` seconds, and after ``max_failures`` wrong secrets for one
+    key id within ``failure_window`` seconds, further uncached attempts for
+    that key id are refused without hashing until the window ends.
+    """
+
+    def __init__(
+        self,
+        repository: APIKeyRepository,
+        cache: Optional[LookupCache] = None,
+        required: bool = False,
+        failure_ttl: float = 10.0,
+        max_failures: int = 20,
+        failure_window: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.repository = repository
+        self.cache = cache
+        self.required = required
+        self.rejected = LookupCache(ttl=failure_ttl, refresh_ahead=0, clock=clock) if failure_ttl > 0 else None
+        self.max_failures = max_failures
+        self.failure_window = failure_window
+        self.throttled = 0
+        self._clock = clock
+        self._failures: dict[str, tuple[float, int]] = {}
+        self._failures_lock = threading.Lock()
+
+    def create_key(self, owner: str, link_quota: Optional[int] = None) -> tuple[str, APIKeyModel]:
+        """Create a key for ``owner``; the plain key is only ever returned here."""
+        key_id = secrets.token_hex(6)
+        secret = secrets.token_urlsafe(32)
+        salt = secrets.token_hex(16)
+        api_key = self.repository.create(APIKeyModel(
+            key_id=key_id,
+            key_hash=hash_secret(secret, salt),
+            salt=salt,
+            owner=owner,
+            link_quota=link_quota,
+            created_at=datetime.now(timezone.utc),
+        ))
+        return f"{KEY_PREFIX}_{key_id}_{secret}", api_key
+
+    async def authenticate(self, api_key: str) -> Optional[APIKeyIdentity]:
+        parsed = parse_api_key(api_key)
+        if parsed is None:
+            return None
+        digest = hashlib.sha256(api_key.encode("utf-8")).digest()
+        if self.rejected is not None and self.rejected.get(digest):
+            return None
+        if self.cache is None:
+            identity = await run_in_executor(self._verify, *parsed)
+        else:
+            identity = await self.cache.get_or_load(digest, lambda _: self._verify(*parsed))
+        if identity is None and self.rejected is not None:
+            self.rejected.set(digest, True)
+        return identity
+
+    def revoke(self, key_id: str) -> bool:
+        revoked = self.repository.deactivate(key_id)
+        # The cache is keyed by key digests, so the revoked key cannot be singled out.
+        if revoked and self.cache is not None:
+            self.cache.clear()
+        return revoked
+
+    def _verify(self, key_id: str, secret: str) -> Optional[APIKeyIdentity]:
+        stored = self.repository.get_by_key_id(key_id)
+        if stored is None:
+            return None
+        if self._failure_limited(key_id):
+            return None
+        if not hmac.compare_digest(hash_secret(secret, stored.salt), stored.key_hash):
+            self._record_failure(key_id)
+            return None
+        return APIKeyIdentity(key_id=stored.key_id, owner=stored.owner, link_quota=stored.link_quota)
+
+    def _failure_limited(self, key_id: str) -> bool:
+        with self._failures_lock:
+            started, count = self._failures.get(key_id, (0.0, 0))
+            if self._clock() - started >= self.failure_window:
+                self._failures.pop(key_id, None)
+                return False
+            if count < self.max_failures:
+                return False
+            self.throttled += 1
+            return True
+
+    def _record_failure(self, key_id: str):
+        # Only key ids that exist get here, so the table is bounded by the number of keys.
+        with self._failures_lock:
+            now = self._clock()
+            started, count = self._failures.get(key_id, (now, 0))
+            if now - started >= self.failure_window:
+                started, count = now, 0
+            self._failures[key_id] = (started, count + 1)
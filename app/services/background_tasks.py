@@ -0,0 +1,316 @@
+import asyncio
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JobStats:
+    runs: int = 0
+    failures: int = 0
+    restarts: int = 0
+    last_error: Optional[str] = None
+
+
+class JobQueue:
+    """Bounded queue feeding a queue-driven background job.
+
+    ``submit`` never blocks: when the queue is full (or the manager is not
+    running) it returns ``False`` so the caller can fall back or shed load.
+    Items of a batch whose handler failed are kept in ``_retry`` and handled
+    again before new items.
+    """
+
+    def __init__(self, name: str, maxsize: int):
+        self.name = name
+        self.maxsize = maxsize
+        self.accepted = 0
+        self.rejected = 0
+        self.dropped = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._retry: list = []
+        # The batch the worker is handling; left set if the worker is cancelled mid-batch.
+        self._running: list = []
+
+    def submit(self, item: Any) -> bool:
+        if self._queue is None or self._loop is None or self._loop.is_closed():
+            self.rejected += 1
+            return False
+        if _running_loop() is self._loop:
+            return self._put(item)
+        # Called from a worker thread: hand the item to the loop and wait for the verdict.
+        future = asyncio.run_coroutine_threadsafe(self._put_async(item), self._loop)
+        try:
+            return future.result(timeout=1.0)
+        except FutureTimeoutError:
+            future.cancel()
+            self.rejected += 1
+            return False
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _bind(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+
+    def _unbind(self):
+        self._loop = None
+        self._queue = None
+
+    def _take(self, limit: int) -> list:
+        items = []
+        while len(items) < limit and not self._queue.empty():
+            items.append(self._queue.get_nowait())
+        return items
+
+    def _put(self, item: Any) -> bool:
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self.accepted += 1
+        return True
+
+    async def _put_async(self, item: Any) -> bool:
+        return self._put(item)
+
+
+@dataclass
+class _Job:
+    name: str
+    run: Callable[[], Awaitable[None]]
+    stats: JobStats = field(default_factory=JobStats)
+    # Blocking work keeps running in its thread when the job is cancelled.
+    in_flight: Optional[Future] = None
+
+
+class BackgroundTaskManager:
+    """Supervised asyncio jobs started and stopped with the application lifespan.
+
+    Blocking callables are run in a bounded thread pool so they never stall
+    the event loop. Jobs that crash are restarted with exponential backoff.
+    """
+
+    def __init__(self, max_workers: int = 4, restart_backoff: float = 1.0, max_backoff: float = 60.0):
+        self.max_workers = max_workers
+        self.restart_backoff = restart_backoff
+        self.max_backoff = max_backoff
+        self._jobs: list[_Job] = []
+        self._queues: list[JobQueue] = []
+        self._flushers: list[Callable[[float], Awaitable[None]]] = []
+        self._tasks: list[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def add_periodic(
+        self,
+        name: str,
+        interval: float,
+        func: Callable[[], Any],
+        blocking: bool = True,
+    ):
+        async def run():
+            while not await self._sleep(interval):
+                await self._call(job, func, blocking)
+
+        job = _Job(name=name, run=run)
+        self._jobs.append(job)
+
+    def add_queue_worker(
+        self,
+        name: str,
+        handler: Callable[[list], Any],
+        maxsize: int = 1000,
+        batch_size: int = 100,
+        blocking: bool = True,
+    ) -> JobQueue:
+        queue = JobQueue(name, maxsize)
+
+        async def run():
+            backoff = self.restart_backoff
+            while True:
+                if queue._retry:
+                    # Back off before retrying a failed batch; on stop it is left for the drain.
+                    if await self._sleep(backoff):
+                        break
+                    batch, queue._retry = queue._retry, []
+                else:
+                    getter = asyncio.ensure_future(queue._queue.get())
+                    stopper = asyncio.ensure_future(self._stopping.wait())
+                    await asyncio.wait({getter, stopper}, return_when=asyncio.FIRST_COMPLETED)
+                    stopper.cancel()
+                    if not getter.done():
+                        getter.cancel()
+                        break
+                    batch = [getter.result()] + queue._take(batch_size - 1)
+                if await handle(batch):
+                    backoff = self.restart_backoff
+                else:
+                    queue._retry = batch
+                    backoff = min(backoff * 2, self.max_backoff)
+            # Drain whatever is left, one attempt per batch; stop() enforces the
+            # deadline by cancelling us and writes what is still pending.
+            pending, queue._retry = queue._retry, []
+            while pending or not queue._queue.empty():
+                batch = pending or queue._take(batch_size)
+                pending = []
+                if not await handle(batch):
+                    queue._retry.extend(batch)
+
+        async def handle(batch: list) -> bool:
+            queue._running = batch
+            handled = await self._call(job, lambda: handler(batch), blocking)
+            queue._running = []
+            return handled
+
+        async def flush_remaining(deadline: float):
+            # The handler never runs concurrently with itself, so a batch the
+            # deadline cut off in a worker thread has to finish first.
+            in_flight = job.in_flight
+            if in_flight is not None and not in_flight.done():
+                await asyncio.wait([asyncio.wrap_future(in_flight)], timeout=deadline)
+            interrupted, queue._running = queue._running, []
+            batch = queue._retry + queue._take(queue.qsize())
+            queue._retry = []
+            if in_flight is not None and not in_flight.done():
+                # The running batch may still land; the rest cannot be written safely.
+                queue.dropped += len(batch)
+                logger.error(
+                    "Background job %s is still running after %.1fs; dropped %d items on shutdown",
+                    name, deadline, len(batch),
+                )
+                return
+            if interrupted and (in_flight is None or in_flight.cancelled() or in_flight.exception() is not None):
+                batch = interrupted + batch
+            if not batch:
+                return
+            try:
+                handled = await asyncio.wait_for(self._call(job, lambda: handler(batch), blocking), deadline)
+            except asyncio.TimeoutError:
+                handled = False
+            if not handled:
+                queue.dropped += len(batch)
+                logger.error("Background job %s dropped %d items on shutdown", name, len(batch))
+
+        job = _Job(name=name, run=run)
+        self._jobs.append(job)
+        self._queues.append(queue)
+        self._flushers.append(flush_remaining)
+        return queue
+
+    async def run_blocking(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._executor is None:
+            raise RuntimeError("Background task manager is not running")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def start(self):
+        if self.running:
+            return
+        loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="background")
+        for queue in self._queues:
+            queue._bind(loop)
+        self._tasks = [asyncio.create_task(self._supervise(job), name=job.name) for job in self._jobs]
+
+    async def stop(self, deadline: float = 10.0):
+        if not self.running:
+            return
+        self._stopping.set()
+        done, pending = await asyncio.wait(self._tasks, timeout=deadline)
+        for task in pending:
+            logger.warning("Background job %s did not finish within %.1fs, cancelling", task.get_name(), deadline)
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+        # Items cut off by the deadline, or whose last attempt failed, get one more
+        # attempt once any batch still running in a worker thread has finished.
+        for flush_remaining in self._flushers:
+            await flush_remaining(deadline)
+        for queue in self._queues:
+            queue._unbind()
+        self._tasks = []
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    def stats(self) -> dict:
+        jobs = {
+            job.name: {
+                "runs": job.stats.runs,
+                "failures": job.stats.failures,
+                "restarts": job.stats.restarts,
+                "last_error": job.stats.last_error,
+            }
+            for job in self._jobs
+        }
+        for queue in self._queues:
+            jobs[queue.name].update(
+                queued=queue.qsize() + len(queue._retry),
+                accepted=queue.accepted,
+                rejected=queue.rejected,
+                dropped=queue.dropped,
+            )
+        return {"running": self.running, "jobs": jobs}
+
+    async def _supervise(self, job: _Job):
+        backoff = self.restart_backoff
+        while True:
+            try:
+                await job.run()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.stats.restarts += 1
+                job.stats.last_error = repr(e)
+                logger.exception("Background job %s crashed, restarting in %.1fs", job.name, backoff)
+                if await self._sleep(backoff):
+                    return
+                backoff = min(backoff * 2, self.max_backoff)
+
+    async def _call(self, job: _Job, func: Callable[[], Any], blocking: bool) -> bool:
+        """Run one unit of work; return ``False`` if it failed."""
+        try:
+            if blocking:
+                if self._executor is None:
+                    raise RuntimeError("Background task manager is not running")
+                job.in_flight = self._executor.submit(func)
+                result = await asyncio.wrap_future(job.in_flight)
+            else:
+                result = func()
+            if asyncio.iscoroutine(result):
+                await result
+            job.stats.runs += 1
+            return True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.stats.failures += 1
+            job.stats.last_error = repr(e)
+            logger.exception("Background job %s failed", job.name)
+            return False
+
+    async def _sleep(self, seconds: float) -> bool:
+        """Sleep up to ``seconds``; return ``True`` if the manager is stopping."""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
@@ -0,0 +1,121 @@
+import argparse
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class DestinationStub:
+    """Local HTTP server standing in for link destinations, for tests and load runs.
+
+    The path selects the answer:
+
+    * ``/status/<code>`` answers ``<code>``.
+    * ``/no-head/<code>`` answers ``405`` to ``HEAD`` and ``<code>`` to ``GET``.
+    * ``/slow/<ms>`` answers ``200`` after ``<ms>`` milliseconds.
+    * ``/redirect?to=<url>`` answers ``302`` to ``<url>``.
+    * anything else answers ``200``.
+
+    Connections are kept alive, and every request is logged with its method,
+    path and arrival time so tests can check pooling and politeness.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.requests: list[tuple[str, str, float]] = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def start(self) -> "DestinationStub":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_HEAD(self):
+                self._answer(send_body=False)
+
+            def do_GET(self):
+                self._answer(send_body=True)
+
+            def _answer(self, send_body: bool):
+                with stub._lock:
+                    stub.requests.append((self.command, self.path, time.monotonic()))
+                url = urlsplit(self.path)
+                parts = url.path.strip("/").split("/")
+                status = 200
+                location = None
+                try:
+                    if parts[0] == "status":
+                        status = int(parts[1])
+                    elif parts[0] == "no-head":
+                        status = 405 if self.command == "HEAD" else int(parts[1])
+                    elif parts[0] == "slow":
+                        time.sleep(int(parts[1]) / 1000)
+                    elif parts[0] == "redirect":
+                        status, location = 302, parse_qs(url.query)["to"][0]
+                except (IndexError, KeyError, ValueError):
+                    status = 400
+                body = b"ok\n"
+                self.send_response(status)
+                self.send_header("Content-Type", "text/plain")
+                self.send_header("Content-Length", str(len(body)))
+                if location is not None:
+                    self.send_header("Location", location)
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.services.destination_stub",
+        description="Serve stub link destinations for exercising the link health checker.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    args = parser.parse_args(argv)
+
+    stub = DestinationStub(args.host, args.port)
+    print(f"Listening on {stub.base_url}")
+    stub.start()
+    try:
+        while True:
+            threading.Event().wait(10.0)
+            print(f"{len(stub.requests)} requests over {stub.connections} connections")
+    except KeyboardInterrupt:
+        stub.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
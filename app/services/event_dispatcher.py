@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional
+import httpx
+from app.repositories.url_event_repository import URLEventRepository
+
+logger = logging.getLogger(__name__)
+
+
+class EventDispatcher:
+    """Delivers outbox events to webhook endpoints in batches.
+
+    Each endpoint is served independently: a run reads the oldest events that
+    endpoint has not accepted yet and splits them into ``partitions`` lanes by
+    short code. Lanes are posted concurrently over one pooled keep-alive
+    client, while each lane posts its batches in order and stops at the first
+    batch that still fails after retries. Events for one short code therefore
+    always arrive in order. Events that were not delivered are picked up
+    again on the next run, so delivery is at-least-once and receivers should
+    deduplicate by event ``id``. Events still undelivered ``dead_letter_after``
+    seconds after they were written are dead-lettered and no longer retried.
+
+    A run skips a database whose dispatcher lock another instance holds.
+    """
+
+    def __init__(
+        self,
+        repositories: list[URLEventRepository],
+        endpoints: list[str],
+        run_blocking: Callable[..., Awaitable[Any]],
+        batch_size: int = 100,
+        read_size: int = 1000,
+        partitions: int = 8,
+        max_attempts: int = 3,
+        retry_backoff: float = 0.5,
+        timeout: float = 5.0,
+        dead_letter_after: Optional[float] = 86400.0,
+    ):
+        self.repositories = repositories
+        self.endpoints = list(dict.fromkeys(endpoints))
+        self.run_blocking = run_blocking
+        self.batch_size = batch_size
+        self.read_size = read_size
+        self.partitions = partitions
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+        self.dead_letter_after = dead_letter_after
+        self.delivered = 0
+        self.batches = 0
+        self.failed_attempts = 0
+        self.dead_lettered = 0
+        self.lock_busy = 0
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def dispatch_once(self) -> int:
+        delivered = 0
+        for repository in self.repositories:
+            if not await self.run_blocking(repository.try_lock_dispatch):
+                # Another instance is delivering this database's events.
+                self.lock_busy += 1
+                continue
+            try:
+                delivered += await self._dispatch_repository(repository)
+            finally:
+                await self.run_blocking(repository.unlock_dispatch)
+        self.delivered += delivered
+        return delivered
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        return {
+            "endpoints": len(self.endpoints),
+            "delivered": self.delivered,
+            "batches": self.batches,
+            "failed_attempts": self.failed_attempts,
+            "dead_lettered": self.dead_lettered,
+            "lock_busy": self.lock_busy,
+        }
+
+    async def _dispatch_repository(self, repository: URLEventRepository) -> int:
+        if self.dead_letter_after is not None:
+            before = datetime.now(timezone.utc) - timedelta(seconds=self.dead_letter_after)
+            dead_lettered = await self.run_blocking(repository.dead_letter, before)
+            if dead_lettered:
+                self.dead_lettered += dead_lettered
+                logger.error("Dead-lettered %d events not delivered to every endpoint in time", dead_lettered)
+        accepted = await asyncio.gather(*(self._deliver_endpoint(repository, endpoint) for endpoint in self.endpoints))
+        delivered = 0
+        # Recorded one endpoint at a time, so each write sees the previous ones
+        # when it checks whether an event has reached every endpoint.
+        for endpoint, event_ids in zip(self.endpoints, accepted):
+            delivered += await self.run_blocking(repository.record_deliveries, endpoint, event_ids, self.endpoints)
+        return delivered
+
+    async def _deliver_endpoint(self, repository: URLEventRepository, endpoint: str) -> list[int]:
+        events = await self.run_blocking(repository.pending, self.read_size, endpoint)
+        lanes: list[list[dict]] = [[] for _ in range(self.partitions)]
+        for event in events:
+            lanes[zlib.crc32(event["short_code"].encode("utf-8")) % self.partitions].append(event)
+        results = await asyncio.gather(*(self._deliver_lane(endpoint, lane) for lane in lanes if lane))
+        return [event_id for lane_ids in results for event_id in lane_ids]
+
+    async def _deliver_lane(self, endpoint: str, events: list[dict]) -> list[int]:
+        delivered = []
+        for start in range(0, len(events), self.batch_size):
+            batch = events[start:start + self.batch_size]
+            body = json.dumps({"events": batch}, separators=(",", ":")).encode("utf-8")
+            if not await self._post(endpoint, body):
+                break
+            self.batches += 1
+            delivered.extend(event["id"] for event in batch)
+        return delivered
+
+    async def _post(self, endpoint: str, body: bytes) -> bool:
+        client = self._get_client()
+        backoff = self.retry_backoff
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                response = await client.post(endpoint, content=body, headers={"Content-Type": "application/json"})
+                if response.is_success:
+                    return True
+                error = f"HTTP {response.status_code}"
+            except httpx.HTTPError as e:
+                error = repr(e)
+            self.failed_attempts += 1
+            logger.warning("Event delivery to %s failed (attempt %d/%d): %s", endpoint, attempt, self.max_attempts, error)
+            if attempt < self.max_attempts:
+                await asyncio.sleep(backoff)
+                backoff *= 2
+        return False
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.partitions * len(self.endpoints),
+                    max_keepalive_connections=self.partitions * len(self.endpoints),
+                ),
+            )
+        return self._client
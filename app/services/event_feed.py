@@ -0,0 +1,51 @@
+import heapq
+from typing import Optional
+from app.repositories.url_event_repository import URLEventRepository
+
+
+class EventFeed:
+    """Cursor-paginated change feed over the ``url_events`` outbox of every database.
+
+    The cursor holds the last position seen per database (comma-separated,
+    one per shard), so paging never rescans the ``urls`` table. A position is
+    the event id, prefixed with ``<txid>:`` on PostgreSQL, where events are
+    ordered by writing transaction so that late commits are not skipped
+    (see ``URLEventRepository``).
+    """
+
+    def __init__(self, repositories: list[URLEventRepository]):
+        self.repositories = repositories
+
+    def read(self, cursor: Optional[str] = None, limit: int = 100) -> tuple[list[dict], str]:
+        positions = self.parse_cursor(cursor)
+        batches = [
+            [
+                (event["created_at"] or "", index, event)
+                for event in repository.list_after(event_id, limit, after_txid=txid)
+            ]
+            for index, (repository, (txid, event_id)) in enumerate(zip(self.repositories, positions))
+        ]
+        events = []
+        for _, index, event in heapq.merge(*batches, key=lambda item: (item[0], item[1])):
+            if len(events) == limit:
+                break
+            positions[index] = (event.pop("txid"), event["id"])
+            events.append(event)
+        return events, ",".join(
+            f"{txid}:{event_id}" if txid else str(event_id) for txid, event_id in positions
+        )
+
+    def parse_cursor(self, cursor: Optional[str]) -> list[tuple[int, int]]:
+        """Return one ``(txid, event_id)`` position per repository."""
+        if not cursor:
+            return [(0, 0)] * len(self.repositories)
+        try:
+            positions = [
+                (int(txid), int(event_id)) if separator else (0, int(txid))
+                for txid, separator, event_id in (part.partition(":") for part in cursor.split(","))
+            ]
+        except ValueError:
+            raise ValueError("Invalid cursor")
+        if len(positions) != len(self.repositories) or any(min(position) < 0 for position in positions):
+            raise ValueError("Invalid cursor")
+        return positions
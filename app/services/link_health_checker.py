@@ -0,0 +1,483 @@
+import asyncio
+import ipaddress
+import logging
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import urlsplit
+import httpcore
+import httpx
+from app.models.link_health import LinkProbe
+from app.repositories.link_health_repository import LinkHealthRepository
+
+logger = logging.getLogger(__name__)
+
+_MAX_DRAIN_BYTES = 64 * 1024
+
+
+def is_broken_status(status_code: int) -> bool:
+    """Only answers that say the destination is gone count as broken.
+
+    ``401``/``403``/``429`` and other client errors mean the destination
+    exists but does not want to talk to a crawler.
+    """
+    return status_code in (404, 410) or status_code >= 500
+
+
+def is_public_address(address: str) -> bool:
+    """``False`` for loopback, private, link-local, reserved, multicast and unspecified addresses."""
+    ip = ipaddress.ip_address(address)
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+class CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """httpcore network backend that caches DNS answers for ``ttl`` seconds.
+
+    Only the TCP connect goes to the resolved address; TLS still uses the
+    host name for SNI and certificate checks. Failed lookups are cached for
+    ``negative_ttl`` so a dead domain with many links costs one lookup.
+
+    Links are user input, so connections to addresses that are not public
+    are refused (see ``is_public_address``). The check runs on the address
+    actually connected to, for every connection including redirect hops,
+    so DNS answers cannot point a probe at internal services.
+    ``allow_private_addresses`` lifts it and is meant for tests only.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        negative_ttl: float = 60.0,
+        backend: Optional[httpcore.AsyncNetworkBackend] = None,
+        allow_private_addresses: bool = False,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.allow_private_addresses = allow_private_addresses
+        self.refused = 0
+        self.lookups = 0
+        self.hits = 0
+        self._backend = backend or httpcore.AnyIOBackend()
+        self._cache: dict[tuple[str, int], tuple[float, list[str]]] = {}
+        self._pending: dict[tuple[str, int], asyncio.Future] = {}
+
+    async def resolve(self, host: str, port: int) -> list[str]:
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+        key = (host, port)
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached is not None and now < cached[0]:
+            self.hits += 1
+            return cached[1]
+        pending = self._pending.get(key)
+        if pending is not None:
+            # Another probe is already resolving this host; share its answer.
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        self.lookups += 1
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            addresses = list(dict.fromkeys(info[4][0] for info in infos))
+            expires_at = now + self.ttl
+        except (socket.gaierror, UnicodeError):
+            addresses = []
+            expires_at = now + self.negative_ttl
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._pending.pop(key, None)
+        self._cache[key] = (expires_at, addresses)
+        future.set_result(addresses)
+        return addresses
+
+    def purge_expired(self) -> int:
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._cache.items() if expires_at <= now]
+        for key in expired:
+            del self._cache[key]
+        return len(expired)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._cache), "lookups": self.lookups, "hits": self.hits, "refused": self.refused}
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        addresses = await self.resolve(host, port)
+        if not addresses:
+            raise httpcore.ConnectError(f"Could not resolve host {host}")
+        if not self.allow_private_addresses:
+            addresses = [address for address in addresses if is_public_address(address)]
+            if not addresses:
+                self.refused += 1
+                raise httpcore.ConnectError(f"Refusing to connect to non-public address of {host}")
+        error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        raise error
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float):
+        await self._backend.sleep(seconds)
+
+
+# Most specific first: the first match wins.
+_HTTPCORE_ERRORS: tuple[tuple[type[Exception], type[httpx.HTTPError]], ...] = (
+    (httpcore.ConnectTimeout, httpx.ConnectTimeout),
+    (httpcore.ReadTimeout, httpx.ReadTimeout),
+    (httpcore.WriteTimeout, httpx.WriteTimeout),
+    (httpcore.PoolTimeout, httpx.PoolTimeout),
+    (httpcore.TimeoutException, httpx.TimeoutException),
+    (httpcore.ConnectError, httpx.ConnectError),
+    (httpcore.ReadError, httpx.ReadError),
+    (httpcore.WriteError, httpx.WriteError),
+    (httpcore.NetworkError, httpx.NetworkError),
+    (httpcore.UnsupportedProtocol, httpx.UnsupportedProtocol),
+    (httpcore.LocalProtocolError, httpx.LocalProtocolError),
+    (httpcore.RemoteProtocolError, httpx.RemoteProtocolError),
+    (httpcore.ProtocolError, httpx.ProtocolError),
+)
+
+_CORE_ERRORS = tuple(core_error for core_error, _ in _HTTPCORE_ERRORS)
+
+
+def _httpx_error(error: Exception, request: httpx.Request) -> Exception:
+    for core_error, httpx_error in _HTTPCORE_ERRORS:
+        if isinstance(error, core_error):
+            return httpx_error(str(error), request=request)
+    return error
+
+
+class _PoolStream(httpx.AsyncByteStream):
+    def __init__(self, stream, request: httpx.Request):
+        self._stream = stream
+        self._request = request
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._stream:
+                yield chunk
+        except _CORE_ERRORS as e:
+            raise _httpx_error(e, self._request) from e
+
+    async def aclose(self):
+        await self._stream.aclose()
+
+
+class PoolTransport(httpx.AsyncBaseTransport):
+    """httpx transport over a caller-built ``httpcore.AsyncConnectionPool``.
+
+    ``httpx.AsyncHTTPTransport`` does not accept a network backend, so the
+    checker builds its own pool with the DNS-caching backend and sends
+    requests through it here.
+    """
+
+    def __init__(self, pool: httpcore.AsyncConnectionPool):
+        self.pool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        try:
+            response = await self.pool.handle_async_request(core_request)
+        except _CORE_ERRORS as e:
+            raise _httpx_error(e, request) from e
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_PoolStream(response.stream, request),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        await self.pool.aclose()
+
+
+class HostThrottle:
+    """Politeness limits per destination host.
+
+    At most ``max_connections`` probes run against one host at a time, and
+    probe starts for a host are spaced at least ``interval`` seconds apart.
+    A probe that would have to wait longer than ``max_wait`` for its turn is
+    refused instead, so one popular host cannot tie up the crawler.
+    """
+
+    def __init__(self, max_connections: int = 2, interval: float = 1.0, max_wait: float = 30.0):
+        self.max_connections = max_connections
+        self.interval = interval
+        self.max_wait = max_wait
+        self._next_start: dict[str, float] = {}
+        self._slots: dict[str, list] = {}
+
+    async def acquire(self, host: str) -> bool:
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self._next_start.get(host, now))
+        if start - now > self.max_wait:
+            return False
+        self._next_start[host] = start + self.interval
+        slot = self._slots.get(host)
+        if slot is None:
+            slot = self._slots[host] = [asyncio.Semaphore(self.max_connections), 0]
+        slot[1] += 1
+        try:
+            if start > now:
+                await asyncio.sleep(start - now)
+            await slot[0].acquire()
+        except BaseException:
+            self._leave(host, slot)
+            raise
+        return True
+
+    def release(self, host: str):
+        slot = self._slots[host]
+        slot[0].release()
+        self._leave(host, slot)
+
+    def purge_idle(self) -> int:
+        now = asyncio.get_running_loop().time()
+        idle = [host for host, start in self._next_start.items() if start <= now and host not in self._slots]
+        for host in idle:
+            del self._next_start[host]
+        return len(idle)
+
+    def _leave(self, host: str, slot: list):
+        slot[1] -= 1
+        if slot[1] == 0:
+            del self._slots[host]
+
+
+class LinkHealthChecker:
+    """Crawls active links and records whether their destinations still answer.
+
+    Each run walks every repository in keyset pages of links that are due
+    for a check, carrying on from where the previous run stopped, and probes
+    up to ``concurrency`` destinations at a time over one pooled keep-alive
+    client with cached DNS. A destination gets ``HEAD`` first and ``GET`` if
+    ``HEAD`` is refused. Results are written per ``batch_size`` probes; links
+    that fail ``failure_threshold`` checks in a row are reported as broken
+    and, when ``deactivate`` is given, deactivated.
+    """
+
+    def __init__(
+        self,
+        repositories: list[LinkHealthRepository],
+        run_blocking: Callable[..., Awaitable[Any]],
+        deactivate: Optional[Callable[[int], Any]] = None,
+        links_per_run: int = 20_000,
+        batch_size: int = 500,
+        concurrency: int = 200,
+        per_host_connections: int = 2,
+        host_interval: float = 1.0,
+        timeout: float = 10.0,
+        recheck_interval: float = 86_400.0,
+        failing_recheck_interval: float = 3_600.0,
+        failure_threshold: int = 3,
+        dns_ttl: float = 300.0,
+        user_agent: str = "url-shortener-link-checker/1.0",
+        allow_private_addresses: bool = False,
+    ):
+        self.repositories = repositories
+        self.run_blocking = run_blocking
+        self.deactivate = deactivate
+        self.links_per_run = links_per_run
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.recheck_interval = recheck_interval
+        self.failing_recheck_interval = failing_recheck_interval
+        self.failure_threshold = failure_threshold
+        self.user_agent = user_agent
+        self.throttle = HostThrottle(per_host_connections, host_interval, max_wait=timeout)
+        self.network = CachingNetworkBackend(ttl=dns_ttl, allow_private_addresses=allow_private_addresses)
+        self.checked = 0
+        self.broken = 0
+        self.deferred = 0
+        self.deactivated = 0
+        self.last_run_seconds: Optional[float] = None
+        self._cursors = [0] * len(repositories)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def run_once(self) -> int:
+        started = time.monotonic()
+        budget = self.links_per_run
+        checked = 0
+        for index, repository in enumerate(self.repositories):
+            if budget <= 0:
+                break
+            count = await self._check_repository(index, repository, budget)
+            budget -= count
+            checked += count
+        self.throttle.purge_idle()
+        self.network.purge_expired()
+        self.last_run_seconds = time.monotonic() - started
+        return checked
+
+    async def probe(self, url: str) -> tuple[Optional[int], Optional[float], Optional[str]]:
+        """Return ``(status_code, latency_ms, error)`` for one destination."""
+        client = self._get_client()
+        started = time.perf_counter()
+        try:
+            response = await client.head(url)
+            if response.status_code >= 400:
+                # Plenty of servers refuse HEAD; only a GET answer is conclusive.
+                started = time.perf_counter()
+                async with client.stream("GET", url) as response:
+                    if _content_length(response) <= _MAX_DRAIN_BYTES:
+                        # A fully read response leaves its connection reusable.
+                        await response.aread()
+            return response.status_code, (time.perf_counter() - started) * 1000, None
+        except httpx.TimeoutException:
+            return None, None, "timeout"
+        except Exception as e:
+            # Anything a destination can trigger (bad IDNA labels, odd URLs) is a failed
+            # check for that link alone; cancellation is not an Exception and still propagates.
+            return None, None, f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def broken_links(self, limit: int = 100) -> list[dict]:
+        links = []
+        for repository in self.repositories:
+            links.extend(repository.list_broken(self.failure_threshold, limit))
+        links.sort(key=lambda link: (-link["consecutive_failures"], link["url_id"]))
+        return links[:limit]
+
+    def stats(self) -> dict:
+        return {
+            "action": "deactivate" if self.deactivate is not None else "flag",
+            "checked": self.checked,
+            "broken": self.broken,
+            "deferred": self.deferred,
+            "deactivated": self.deactivated,
+            "last_run_seconds": self.last_run_seconds,
+            "dns_cache": self.network.stats(),
+        }
+
+    async def _check_repository(self, index: int, repository: LinkHealthRepository, budget: int) -> int:
+        now = datetime.now(timezone.utc)
+        stale_before = now - timedelta(seconds=self.recheck_interval)
+        failing_before = now - timedelta(seconds=self.failing_recheck_interval)
+        probes: list[LinkProbe] = []
+        in_flight: set[asyncio.Future] = set()
+        read = 0
+        try:
+            while read < budget:
+                links = await self.run_blocking(
+                    repository.links_due,
+                    self._cursors[index],
+                    min(self.batch_size, budget - read),
+                    stale_before,
+                    failing_before,
+                )
+                if not links:
+                    # Reached the end of the table; the next run starts over.
+                    self._cursors[index] = 0
+                    break
+                self._cursors[index] = links[-1][0]
+                read += len(links)
+                for link in links:
+                    if len(in_flight) >= self.concurrency:
+                        done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                        probes.extend(_completed(done))
+                        if len(probes) >= self.batch_size:
+                            await self._record(repository, probes)
+                            probes = []
+                    in_flight.add(asyncio.ensure_future(self._check(*link)))
+            if in_flight:
+                done, in_flight = await asyncio.wait(in_flight)
+                probes.extend(_completed(done))
+            await self._record(repository, probes)
+        finally:
+            for task in in_flight:
+                task.cancel()
+        return read
+
+    async def _check(self, url_id: int, short_code: str, original_url: str) -> Optional[LinkProbe]:
+        try:
+            host = urlsplit(original_url).hostname
+        except ValueError:
+            host = None
+        if not host:
+            return LinkProbe(url_id, short_code, None, None, "invalid URL", True)
+        if not await self.throttle.acquire(host):
+            # Left unrecorded, so the link is still due and gets picked up by a later run.
+            self.deferred += 1
+            return None
+        try:
+            status_code, latency_ms, error = await self.probe(original_url)
+        finally:
+            self.throttle.release(host)
+        broken = error is not None or is_broken_status(status_code)
+        return LinkProbe(url_id, short_code, status_code, latency_ms, error, broken)
+
+    async def _record(self, repository: LinkHealthRepository, probes: list[LinkProbe]):
+        if not probes:
+            return
+        failures = await self.run_blocking(repository.record, probes)
+        self.checked += len(probes)
+        self.broken += len(failures)
+        if self.deactivate is None:
+            return
+        for url_id, count in failures.items():
+            if count >= self.failure_threshold and await self.run_blocking(self.deactivate, url_id):
+                self.deactivated += 1
+                logger.info("Deactivated link %d after %d failed destination checks", url_id, count)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            transport = PoolTransport(
+                httpcore.AsyncConnectionPool(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency,
+                    keepalive_expiry=30.0,
+                    network_backend=self.network,
+                )
+            )
+            self._client = httpx.AsyncClient(
+                transport=transport,
+                timeout=self.timeout,
+                follow_redirects=True,
+                max_redirects=5,
+                headers={"User-Agent": self.user_agent},
+            )
+        return self._client
+
+
+def _completed(tasks: set[asyncio.Future]) -> list[LinkProbe]:
+    # Deferred links come back as None and are not recorded.
+    return [probe for probe in (task.result() for task in tasks) if probe is not None]
+
+
+def _content_length(response: httpx.Response) -> int:
+    try:
+        return int(response.headers["Content-Length"])
+    except (KeyError, ValueError):
+        return _MAX_DRAIN_BYTES + 1
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+from app.middleware.profiling import run_in_executor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    refresh_at: float
+    expires_at: float
+
+
+class LookupCache:
+    """TTL cache with single-flight loading for the event loop.
+
+    Loaders are blocking calls (database reads) and run in the loop's
+    default executor. Concurrent misses for the same key await one shared
+    load instead of each hitting the database. An entry inside the
+    refresh-ahead window is returned as it is, and a single background task
+    reloads it (stale-while-revalidate). ``None`` results are not cached.
+
+    ``get_or_load`` must be awaited on the event loop. The other methods are
+    thread-safe, so jobs running in worker threads can update or invalidate
+    entries directly.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 30.0,
+        refresh_ahead: float = 5.0,
+        max_entries: int = 100_000,
+        wait_timeout: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        self.ttl = ttl
+        self.refresh_ahead = min(max(refresh_ahead, 0.0), ttl)
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "stale_served": 0,
+            "refreshes": 0,
+            "load_errors": 0,
+            "evictions": 0,
+        }
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[Hashable], Any]) -> Any:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            load = self._inflight.get(key)
+            if load is not None and load.get_loop() is not asyncio.get_running_loop():
+                # Left behind by a loop that has since stopped (e.g. between test clients).
+                load = None
+            if entry is not None and now < entry.expires_at:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                if now >= entry.refresh_at:
+                    if load is None:
+                        self._counters["refreshes"] += 1
+                        self._start_load(key, loader)
+                    else:
+                        self._counters["stale_served"] += 1
+                return entry.value
+            if load is not None:
+                self._counters["coalesced"] += 1
+            else:
+                self._counters["misses"] += 1
+                load = self._start_load(key, loader)
+
+        try:
+            # Shielded so a caller that gives up does not cancel the load for everybody else.
+            return await asyncio.wait_for(asyncio.shield(load), self.wait_timeout)
+        except asyncio.TimeoutError:
+            # The shared load is stuck; do not pile up behind it.
+            return await run_in_executor(loader, key)
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value if it has not expired, without loading."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now >= entry.expires_at:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry.value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._store(key, value, self._clock())
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._inflight.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._inflight.clear()
+
+    def purge_expired(self) -> int:
+        now = self._clock()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+            for key in expired:
+                del self._entries[key]
+        return len(expired)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["size"] = len(self._entries)
+            stats["in_flight"] = len(self._inflight)
+        return stats
+
+    def _start_load(self, key: Hashable, loader: Callable[[Hashable], Any]) -> asyncio.Task:
+        load = asyncio.get_running_loop().create_task(self._load(key, loader))
+        load.add_done_callback(_retrieve_error)
+        self._inflight[key] = load
+        return load
+
+    async def _load(self, key: Hashable, loader: Callable[[Hashable], Any]) -> Any:
+        try:
+            value = await run_in_executor(loader, key)
+        except Exception as e:
+            # A failed refresh leaves the current entry in place until it expires.
+            with self._lock:
+                self._counters["load_errors"] += 1
+                self._forget(key)
+                refreshing = key in self._entries
+            if refreshing:
+                logger.warning("Refreshing cached entry %r failed: %r", key, e)
+            raise
+        with self._lock:
+            # Invalidated while loading: hand the value to the waiters, but do not cache it.
+            if self._forget(key):
+                if value is None:
+                    self._entries.pop(key, None)
+                else:
+                    self._store(key, value, self._clock())
+        return value
+
+    def _forget(self, key: Hashable) -> bool:
+        # Only drop our own load; ``invalidate`` or ``clear`` may have let a newer one start.
+        if self._inflight.get(key) is asyncio.current_task():
+            del self._inflight[key]
+            return True
+        return False
+
+    def _store(self, key: Hashable, value: Any, now: float):
+        self._entries[key] = _Entry(
+            value=value,
+            refresh_at=now + self.ttl - self.refresh_ahead,
+            expires_at=now + self.ttl,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+
+def _retrieve_error(load: asyncio.Task):
+    # Nobody awaits a background refresh; mark its error as retrieved (it is logged in ``_load``).
+    if not load.cancelled():
+        load.exception()
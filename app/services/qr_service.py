@@ -0,0 +1,241 @@
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Optional
+from app.middleware.profiling import run_in_executor
+from app.qr import qr_digest, render_many, render_qr
+
+
+class QRRenderCache:
+    """Size-bounded, content-addressed store for rendered QR codes.
+
+    A memory LRU sits in front of an optional directory of files named by
+    digest. Disk hits are promoted to memory; each tier evicts its least
+    recently used entries once it is over its byte budget.
+    """
+
+    def __init__(self, max_memory_bytes: int, disk_dir: Optional[str] = None, max_disk_bytes: int = 0):
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._scan_disk()
+
+    def get_from_memory(self, digest: str) -> Optional[bytes]:
+        """Look in the memory tier only; never touches the disk, so it is safe on the event loop."""
+        with self._lock:
+            content = self._memory.get(digest)
+            if content is not None:
+                self._memory.move_to_end(digest)
+                self._counters["memory_hits"] += 1
+            return content
+
+    def get(self, digest: str) -> Optional[bytes]:
+        content = self.get_from_memory(digest)
+        if content is not None:
+            return content
+        with self._lock:
+            on_disk = digest in self._disk
+            if on_disk:
+                self._disk.move_to_end(digest)
+        if on_disk:
+            try:
+                with open(self._path(digest), "rb") as handle:
+                    content = handle.read()
+            except FileNotFoundError:
+                content = None
+            if content is not None:
+                with self._lock:
+                    self._counters["disk_hits"] += 1
+                    self._remember(digest, content)
+                return content
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def get_many(self, digests: list[str]) -> list[Optional[bytes]]:
+        return [self.get(digest) for digest in digests]
+
+    def put(self, digest: str, content: bytes):
+        with self._lock:
+            self._remember(digest, content)
+            store_on_disk = bool(self.disk_dir) and digest not in self._disk and len(content) <= self.max_disk_bytes
+        if store_on_disk:
+            self._write_disk(digest, content)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counters,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def _remember(self, digest: str, content: bytes):
+        if len(content) > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(digest, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[digest] = content
+        self._memory_bytes += len(content)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.disk_dir, digest[:2], digest)
+
+    def _write_disk(self, digest: str, content: bytes):
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so readers never see a partial file.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(content)
+        os.replace(tmp_path, path)
+        with self._lock:
+            if digest not in self._disk:
+                self._disk[digest] = len(content)
+                self._disk_bytes += len(content)
+            evicted = []
+            while self._disk_bytes > self.max_disk_bytes:
+                old_digest, old_size = self._disk.popitem(last=False)
+                self._disk_bytes -= old_size
+                evicted.append(old_digest)
+        for old_digest in evicted:
+            try:
+                os.remove(self._path(old_digest))
+            except FileNotFoundError:
+                pass
+
+    def _scan_disk(self):
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if len(name) == 64:
+                    stat = os.stat(os.path.join(root, name))
+                    entries.append((stat.st_mtime, name, stat.st_size))
+        for _, digest, size in sorted(entries):
+            self._disk[digest] = size
+            self._disk_bytes += size
+
+
+class QRCodeService:
+    """Renders QR codes through the render cache.
+
+    Only memory hits are served on the event loop. Disk-cache reads and
+    writes run in executor threads, and misses render in a process pool,
+    batches in chunks, so the event loop is never blocked on CPU or disk.
+    """
+
+    def __init__(self, cache: QRRenderCache, max_workers: int = 2, chunk_size: int = 64):
+        self.cache = cache
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.renders = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    async def render(self, data: str, output_format: str, size: int, error: str) -> tuple[str, bytes]:
+        digest = qr_digest(data, output_format, size, error)
+        content = self.cache.get_from_memory(digest)
+        if content is None:
+            content = await run_in_executor(self.cache.get, digest)
+        if content is None:
+            loop = asyncio.get_running_loop()
+            content = await loop.run_in_executor(self._get_pool(), render_qr, data, output_format, size, error)
+            self.renders += 1
+            await run_in_executor(self.cache.put, digest, content)
+        return digest, content
+
+    async def render_batch(
+        self, items: list[tuple[str, str]], output_format: str, size: int, error: str
+    ) -> AsyncIterator[tuple[str, bytes]]:
+        """Yield ``(name, image)`` for each ``(name, data)`` item, in order."""
+        loop = asyncio.get_running_loop()
+        digests = [qr_digest(data, output_format, size, error) for _, data in items]
+        cached = await run_in_executor(self.cache.get_many, digests)
+        misses = [index for index, content in enumerate(cached) if content is None]
+
+        # Submit every chunk up front so the pool stays busy while earlier results stream out.
+        futures = []
+        for start in range(0, len(misses), self.chunk_size):
+            chunk = misses[start:start + self.chunk_size]
+            jobs = [(items[index][1], output_format, size, error) for index in chunk]
+            futures.append((chunk, loop.run_in_executor(self._get_pool(), render_many, jobs)))
+
+        pending = iter(futures)
+        rendered: dict[int, bytes] = {}
+        for index, (name, _) in enumerate(items):
+            if cached[index] is None and index not in rendered:
+                chunk, future = next(pending)
+                for chunk_index, content in zip(chunk, await future):
+                    rendered[chunk_index] = content
+                self.renders += len(chunk)
+                await run_in_executor(self._put_many, [(digests[i], rendered[i]) for i in chunk])
+            yield name, cached[index] if cached[index] is not None else rendered.pop(index)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        return {"renders": self.renders, **self.cache.stats()}
+
+    def _put_many(self, renders: list[tuple[str, bytes]]):
+        for digest, content in renders:
+            self.cache.put(digest, content)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # Forking a process that already runs threads can copy a lock in a held state.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+
+class _ZipBuffer:
+    """Write-only sink for ``ZipFile``; being unseekable makes it stream entries with data descriptors."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def stream_zip(entries: AsyncIterator[tuple[str, bytes]], compress: bool = False) -> AsyncIterator[bytes]:
+    buffer = _ZipBuffer()
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(buffer, mode="w", compression=compression) as archive:
+        async for name, content in entries:
+            archive.writestr(name, content)
+            yield buffer.take()
+    yield buffer.take()
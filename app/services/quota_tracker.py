@@ -0,0 +1,62 @@
+import threading
+from typing import Optional
+
+
+class QuotaExceededError(Exception):
+    pass
+
+
+class QuotaTracker:
+    """In-memory count of active links per owner, used to enforce link quotas.
+
+    Checks never touch the database. Between syncs the counters only see
+    this process's creations and deactivations; ``sync`` replaces them with
+    the totals from the database, which also picks up expirations and other
+    instances' writes.
+    """
+
+    def __init__(self, default_quota: int = 0):
+        self.default_quota = default_quota
+        self._lock = threading.Lock()
+        self._counts: dict[str, int] = {}
+        self.rejected = 0
+        self.syncs = 0
+
+    def acquire(self, owner: str, quota: Optional[int] = None):
+        """Count one more link for ``owner``; raise ``QuotaExceededError`` if over quota.
+
+        ``quota`` of ``None`` falls back to the default quota; 0 means unlimited.
+        """
+        limit = self.default_quota if quota is None else quota
+        with self._lock:
+            used = self._counts.get(owner, 0)
+            if limit and used >= limit:
+                self.rejected += 1
+                raise QuotaExceededError(f"Link quota of {limit} reached for owner '{owner}'")
+            self._counts[owner] = used + 1
+
+    def release(self, owner: str):
+        with self._lock:
+            used = self._counts.get(owner, 0)
+            if used > 1:
+                self._counts[owner] = used - 1
+            else:
+                self._counts.pop(owner, None)
+
+    def usage(self, owner: str) -> int:
+        with self._lock:
+            return self._counts.get(owner, 0)
+
+    def sync(self, counts: dict[str, int]):
+        with self._lock:
+            self._counts = dict(counts)
+            self.syncs += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "owners": len(self._counts),
+                "default_quota": self.default_quota,
+                "rejected": self.rejected,
+                "syncs": self.syncs,
+            }
@@ -1,32 +1,66 @@
 import secrets
 import string
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Callable, Optional
+from app.middleware.profiling import run_in_executor
 from app.models.url import URLModel
 from app.repositories.url_repository import URLRepository
+from app.repositories.sharded_url_repository import ShardedURLRepository
+from app.services.lookup_cache import LookupCache
+from app.services.background_tasks import JobQueue
+from app.services.quota_tracker import QuotaTracker
 
 
 class URLService:
-    def __init__(self, repository: URLRepository):
+    def __init__(
+        self,
+        repository: URLRepository,
+        cache: Optional[LookupCache] = None,
+        click_queue: Optional[JobQueue] = None,
+        quotas: Optional[QuotaTracker] = None,
+        lookup_loader: Optional[Callable[[str], Optional[URLModel]]] = None
+    ):
         self.repository = repository
+        self.cache = cache
+        self.click_queue = click_queue
+        self.quotas = quotas
+        # Cached lookups load in executor threads and may outlive the request, so they
+        # should not share its repository; ``lookup_loader`` must be safe to call from any thread.
+        self.lookup_loader = lookup_loader or self._load_url
 
     def generate_short_code(self, length: int = 6) -> str:
-        characters = string.ascii_letters + string.digits
         max_attempts = 10
 
         for _ in range(max_attempts):
-            short_code = ''.join(secrets.choice(characters) for _ in range(length))
+            short_code = self._random_code(length)
             existing_url = self.repository.get_by_short_code(short_code)
             if not existing_url:
                 return short_code
 
         raise Exception("Failed to generate unique short code after maximum attempts")
 
+    def _random_code(self, length: int) -> str:
+        characters = string.ascii_letters + string.digits
+        if not isinstance(self.repository, ShardedURLRepository):
+            return ''.join(secrets.choice(characters) for _ in range(length))
+
+        # Spread writes evenly: pick the next shard in turn and draw codes until
+        # one hashes onto it. Takes about one draw per shard and no queries.
+        target = self.repository.next_write_shard()
+        for _ in range(len(self.repository.shards) * 16):
+            short_code = ''.join(secrets.choice(characters) for _ in range(length))
+            if self.repository.shard_for_code(short_code) == target:
+                return short_code
+        return short_code
+
     def create_url(
         self,
         original_url: str,
         custom_code: Optional[str] = None,
-        expires_at: Optional[datetime] = None
+        expires_at: Optional[datetime] = None,
+        routing_rules: Optional[str] = None,
+        owner: Optional[str] = None,
+        link_quota: Optional[int] = None
     ) -> URLModel:
         if custom_code:
             existing_url = self.repository.get_by_short_code(custom_code)
@@ -41,27 +75,102 @@ class URLService:
             short_code=short_code,
             created_at=datetime.now(timezone.utc),
             expires_at=expires_at,
-            is_active=True
+            is_active=True,
+            routing_rules=routing_rules,
+            owner=owner
         )
 
-        return self.repository.create(url)
+        if owner is None or self.quotas is None:
+            return self.repository.create(url)
+
+        self.quotas.acquire(owner, link_quota)
+        try:
+            return self.repository.create(url)
+        except Exception:
+            self.quotas.release(owner)
+            raise
 
     def get_url_by_short_code(self, short_code: str) -> Optional[URLModel]:
+        """Read the link from the repository, bypassing the lookup cache (e.g. for fresh stats)."""
         return self.repository.get_by_short_code(short_code)
 
+    async def resolve_url(self, short_code: str) -> Optional[URLModel]:
+        """Cached lookup for redirects; the database read runs off the event loop."""
+        if self.cache is None:
+            return await run_in_executor(self._load_url, short_code)
+        return await self.cache.get_or_load(short_code, self.lookup_loader)
+
+    def get_urls_by_short_codes(self, short_codes: list[str], cached: bool = True) -> dict[str, URLModel]:
+        """Resolve many short codes at once; codes that are not found are left out.
+
+        With ``cached``, cached entries are served directly and the rest are
+        fetched with a single repository query, then cached. Without it, every
+        code is read from the repository.
+        """
+        use_cache = cached and self.cache is not None
+        found: dict[str, URLModel] = {}
+        missing = []
+        for short_code in dict.fromkeys(short_codes):
+            url = self.cache.get(short_code) if use_cache else None
+            if url is not None:
+                found[short_code] = url
+            else:
+                missing.append(short_code)
+
+        if missing:
+            for url in self.repository.get_by_short_codes(missing):
+                url = self._detach(url)
+                found[url.short_code] = url
+                if use_cache:
+                    self.cache.set(url.short_code, url)
+        return found
+
+    def _load_url(self, short_code: str) -> Optional[URLModel]:
+        return self._detach(self.repository.get_by_short_code(short_code))
+
+    @staticmethod
+    def _detach(url: Optional[URLModel]) -> Optional[URLModel]:
+        if not isinstance(url, URLModel):
+            return url
+        # Cache a detached copy so it is not tied to this request's session.
+        return URLModel.from_dict(url.to_dict())
+
     def get_url_by_id(self, url_id: int) -> Optional[URLModel]:
         return self.repository.get_by_id(url_id)
 
     def increment_click_count(self, url_id: int) -> Optional[URLModel]:
+        # Clicks are flushed in batches by a background job when it is running;
+        # if its queue is full or stopped, fall back to updating inline.
+        if self.click_queue is not None and self.click_queue.submit(url_id):
+            return None
         return self.repository.increment_click_count(url_id)
 
+    def flush_clicks(self, url_ids: list[int]) -> int:
+        counts: dict[int, int] = {}
+        for url_id in url_ids:
+            counts[url_id] = counts.get(url_id, 0) + 1
+        return self.repository.increment_click_counts(counts)
+
     def is_url_expired(self, url: URLModel) -> bool:
         if not url.expires_at:
             return False
         return datetime.now(timezone.utc) > url.expires_at
 
     def deactivate_url(self, url_id: int) -> bool:
-        return self.repository.deactivate_url(url_id)
+        url = None
+        if self.cache is not None or self.quotas is not None:
+            url = self.repository.get_by_id(url_id)
+        # Read before deactivating: the ORM repository updates this same instance.
+        short_code = url.short_code if url else None
+        releases_quota = bool(url and url.is_active and url.owner and self.quotas is not None)
+        deactivated = self.repository.deactivate_url(url_id)
+        # Invalidate only once the deactivation has committed, so a concurrent
+        # lookup cannot re-cache the still-active row in between.
+        if short_code and self.cache is not None:
+            self.cache.invalidate(short_code)
+        if deactivated and releases_quota:
+            self.quotas.release(url.owner)
+        return deactivated
 
     def cleanup_expired_urls(self) -> int:
         return self.repository.cleanup_expired_urls()
\ No newline at end of file
@@ -0,0 +1,87 @@
+import argparse
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class WebhookReceiver:
+    """Local HTTP endpoint that collects event batches, for tests and manual runs.
+
+    ``fail_first`` makes the first N requests answer ``503`` to exercise retries.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, fail_first: int = 0):
+        self.batches: list[list[dict]] = []
+        self.requests = 0
+        self.fail_first = fail_first
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/events"
+
+    @property
+    def events(self) -> list[dict]:
+        with self._lock:
+            return [event for batch in self.batches for event in batch]
+
+    def start(self) -> "WebhookReceiver":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with receiver._lock:
+                    receiver.requests += 1
+                    failing = receiver.requests <= receiver.fail_first
+                    if not failing:
+                        receiver.batches.append(json.loads(body)["events"])
+                self.send_response(503 if failing else 204)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.services.webhook_receiver",
+        description="Print link events delivered by the event dispatcher.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    args = parser.parse_args(argv)
+
+    receiver = WebhookReceiver(args.host, args.port)
+    print(f"Listening on {receiver.url}")
+    printed = 0
+    receiver.start()
+    try:
+        while True:
+            threading.Event().wait(1.0)
+            events = receiver.events
+            for event in events[printed:]:
+                print(json.dumps(event))
+            printed = len(events)
+    except KeyboardInterrupt:
+        receiver.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
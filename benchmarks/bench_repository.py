@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Compare the ORM and Core repositories on the same database.
+
+Usage:
+    python benchmarks/bench_repository.py [--database-url URL] [--rows N] [--lookups N]
+
+Defaults to a throwaway SQLite file. Point ``--database-url`` at a scratch
+PostgreSQL database to measure with network round-trips; the ``urls`` table
+there is dropped and recreated.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config.database import DatabaseConfig, DatabaseConnection  # noqa: E402
+from app.models.url import Base, URLModel  # noqa: E402
+from app.repositories.url_core_repository import URLCoreRepository  # noqa: E402
+from app.repositories.url_repository import URLRepository  # noqa: E402
+
+
+def timed(label: str, operations: int, func) -> float:
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<28} {operations / elapsed:>10.0f} ops/s  {elapsed / operations * 1e6:>8.1f} us/op")
+    return elapsed
+
+
+def run(repository_name: str, repository, codes: list[str], lookups: int, prefix: str) -> dict:
+    print(repository_name)
+    results = {}
+
+    def create():
+        for index in range(len(codes) // 10):
+            repository.create(URLModel(
+                original_url=f"https://example.com/{prefix}/{index}",
+                short_code=f"{prefix}{index}",
+                created_at=datetime.now(timezone.utc),
+            ))
+
+    results["create"] = timed("create", len(codes) // 10, create)
+
+    sample = [random.choice(codes) for _ in range(lookups)]
+
+    def lookup():
+        for code in sample:
+            repository.get_by_short_code(code)
+
+    results["get_by_short_code"] = timed("get_by_short_code", lookups, lookup)
+
+    ids = [repository.get_by_short_code(code).id for code in sample[:lookups // 10]]
+
+    def increment():
+        for url_id in ids:
+            repository.increment_click_count(url_id)
+
+    results["increment_click_count"] = timed("increment_click_count", len(ids), increment)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    args = parser.parse_args()
+
+    tmpdir = None
+    database_url = args.database_url
+    if not database_url:
+        tmpdir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+
+    db = DatabaseConnection(DatabaseConfig(database_url))
+    Base.metadata.drop_all(db.engine)
+    Base.metadata.create_all(db.engine)
+
+    seed = URLCoreRepository(db)
+    codes = [f"seed{index}" for index in range(args.rows)]
+    for code in codes:
+        seed.create(URLModel(
+            original_url=f"https://example.com/{code}", short_code=code, created_at=datetime.now(timezone.utc)
+        ))
+
+    print(f"{args.rows} rows, {args.lookups} lookups on {db.engine.dialect.name}\n")
+    orm = run("ORM (URLRepository)", URLRepository(db), codes, args.lookups, "orm")
+    db.close_session()
+    core = run("Core (URLCoreRepository)", URLCoreRepository(db), codes, args.lookups, "core")
+
+    print("\nspeedup (ORM time / Core time)")
+    for operation in orm:
+        print(f"  {operation:<28} {orm[operation] / core[operation]:>6.2f}x")
+
+    db.engine.dispose()
+    if tmpdir:
+        tmpdir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+ALTER TABLE urls ADD COLUMN IF NOT EXISTS routing_rules TEXT;
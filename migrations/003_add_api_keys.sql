@@ -0,0 +1,16 @@
+ALTER TABLE urls ADD COLUMN IF NOT EXISTS owner VARCHAR(64);
+
+CREATE INDEX IF NOT EXISTS idx_urls_owner ON urls(owner);
+
+CREATE TABLE IF NOT EXISTS api_keys (
+    id SERIAL PRIMARY KEY,
+    key_id VARCHAR(16) UNIQUE NOT NULL,
+    key_hash VARCHAR(64) NOT NULL,
+    salt VARCHAR(32) NOT NULL,
+    owner VARCHAR(64) NOT NULL,
+    link_quota INTEGER,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    is_active BOOLEAN DEFAULT TRUE
+);
+
+CREATE INDEX IF NOT EXISTS idx_api_keys_owner ON api_keys(owner);
@@ -0,0 +1,13 @@
+CREATE TABLE IF NOT EXISTS url_events (
+    id SERIAL PRIMARY KEY,
+    event_type VARCHAR(32) NOT NULL,
+    url_id INTEGER NOT NULL,
+    short_code VARCHAR(20) NOT NULL,
+    payload TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    delivered_at TIMESTAMP WITH TIME ZONE
+);
+
+-- The dispatcher only ever scans undelivered events.
+CREATE INDEX IF NOT EXISTS idx_url_events_undelivered ON url_events(id) WHERE delivered_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_url_events_created_at ON url_events(created_at);
@@ -0,0 +1,14 @@
+CREATE TABLE IF NOT EXISTS link_health (
+    url_id INTEGER PRIMARY KEY,
+    short_code VARCHAR(20) NOT NULL,
+    status_code INTEGER,
+    latency_ms DOUBLE PRECISION,
+    error VARCHAR(255),
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    checked_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    last_ok_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS idx_link_health_checked_at ON link_health(checked_at);
+-- Listing broken links only touches failing rows.
+CREATE INDEX IF NOT EXISTS idx_link_health_failing ON link_health(consecutive_failures) WHERE consecutive_failures > 0;
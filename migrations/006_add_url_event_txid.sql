@@ -0,0 +1,6 @@
+-- Stamp each event with the id of the transaction that wrote it (PostgreSQL 13+).
+-- The change feed pages by (txid, id) so that events committed late are not skipped.
+ALTER TABLE url_events ADD COLUMN IF NOT EXISTS txid BIGINT;
+ALTER TABLE url_events ALTER COLUMN txid SET DEFAULT pg_current_xact_id()::text::bigint;
+UPDATE url_events SET txid = 0 WHERE txid IS NULL;
+CREATE INDEX IF NOT EXISTS idx_url_events_txid ON url_events(txid, id);
@@ -0,0 +1,14 @@
+-- Webhook delivery is tracked per endpoint, so one failing endpoint does not hold back the others.
+-- Rows exist only while an event is delivered to some endpoints but not all of them.
+CREATE TABLE IF NOT EXISTS url_event_deliveries (
+    event_id INTEGER NOT NULL,
+    endpoint VARCHAR(2048) NOT NULL,
+    delivered_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    PRIMARY KEY (event_id, endpoint)
+);
+
+-- Events not delivered to every endpoint within EVENT_DEAD_LETTER_HOURS stop being retried.
+ALTER TABLE url_events ADD COLUMN IF NOT EXISTS dead_lettered_at TIMESTAMP WITH TIME ZONE;
+
+DROP INDEX IF EXISTS idx_url_events_undelivered;
+CREATE INDEX idx_url_events_undelivered ON url_events(id) WHERE delivered_at IS NULL AND dead_lettered_at IS NULL;
@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import patch
+from litestar.testing import TestClient
+from app.config.settings import settings
+from app.main import create_app
+
+ADMIN_KEY = "test-admin-key"
+
+
+class TestAdminEndpoints(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(settings, "admin_api_key", ADMIN_KEY)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.app = create_app()
+        self.client = TestClient(app=self.app)
+        self.client.headers["X-Admin-Key"] = ADMIN_KEY
+
+    def test_rejects_missing_or_wrong_admin_key(self):
+        for headers in ({"X-Admin-Key": ""}, {"X-Admin-Key": "wrong"}):
+            response = self.client.get("/api/v1/admin/background-tasks", headers=headers)
+
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(response.json()["error"], "Missing or invalid admin key")
+
+    def test_admin_endpoints_are_closed_without_a_configured_key(self):
+        with patch.object(settings, "admin_api_key", ""):
+            response = self.client.get("/api/v1/admin/lookup-cache", headers={"X-Admin-Key": ""})
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_lookup_cache_stats(self):
+        response = self.client.get("/api/v1/admin/lookup-cache")
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data["enabled"])
+        self.assertIn("coalesced", data)
+
+    def test_background_task_stats(self):
+        response = self.client.get("/api/v1/admin/background-tasks")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("click-flush", response.json()["jobs"])
+
+    def test_profile_stacks_download(self):
+        response = self.client.get("/api/v1/admin/profile/stacks")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+
+    def test_slow_requests(self):
+        response = self.client.get("/api/v1/admin/profile/slow-requests")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["slow_requests"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+from datetime import datetime, timezone
+from app.models.url import URLModel
+from app.repositories.api_key_repository import APIKeyRepository
+from app.services.api_key_service import APIKeyService
+from tests.sqlite import SQLiteTestCase
+
+
+class TestAPIKeyEndpoints(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.api_keys = APIKeyService(APIKeyRepository(self.db))
+        self.acme_key, _ = self.api_keys.create_key("acme")
+        self.globex_key, _ = self.api_keys.create_key("globex")
+        self.client = self.start_app_client(short_codes=(), api_key_service=self.api_keys)
+        self.repository.create(URLModel(
+            original_url="https://example.com",
+            short_code="abc123",
+            created_at=datetime.now(timezone.utc),
+            owner="acme"
+        ))
+
+    def test_owner_can_delete(self):
+        response = self.client.delete(
+            "/api/v1/urls/abc123", headers={"Authorization": f"Bearer {self.acme_key}"}
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertIsNone(self.repository.get_by_short_code("abc123"))
+
+
+if __name__ == '__main__':
+    unittest.main()
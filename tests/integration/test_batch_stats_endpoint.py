@@ -0,0 +1,27 @@
+import json
+import unittest
+from tests.sqlite import SQLiteTestCase
+
+
+class TestBatchStatsEndpoint(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = self.start_app_client()
+
+    def test_streams_one_line_per_code(self):
+        response = self.client.post(
+            "/api/v1/urls/stats:batch",
+            json={"short_codes": ["def456", "missing", "bad code", "abc123", "def456"]}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([line["short_code"] for line in lines], ["def456", "missing", "bad code", "abc123"])
+        self.assertEqual([line["found"] for line in lines], [True, False, False, True])
+        self.assertEqual(lines[0]["original_url"], "https://example.com/def456")
+        self.assertTrue(lines[3]["short_url"].endswith("/abc123"))
+
+
+if __name__ == '__main__':
+    unittest.main()
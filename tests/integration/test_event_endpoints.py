@@ -0,0 +1,55 @@
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from litestar.testing import TestClient
+from app.config.settings import settings
+from app.main import create_app
+from app.models.url import URLModel
+from app.repositories.url_event_repository import URLEventRepository
+from app.repositories.url_repository import URLRepository
+from app.services.event_feed import EventFeed
+from tests.sqlite import SQLiteTestCase
+
+
+class TestEventEndpoints(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        repository = URLRepository(self.db)
+        for i in range(3):
+            repository.create(URLModel(
+                original_url="https://example.com",
+                short_code=f"code{i}",
+                created_at=datetime.now(timezone.utc)
+            ))
+
+        patcher = patch("app.main.event_feed", EventFeed([URLEventRepository(self.db)]))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.object(settings, "admin_api_key", "test-admin-key")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = TestClient(app=create_app())
+        self.client.headers["X-Admin-Key"] = "test-admin-key"
+
+    def test_change_feed_pages_with_cursor(self):
+        first = self.client.get("/api/v1/events", params={"limit": 2}).json()
+        second = self.client.get("/api/v1/events", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+
+        self.assertEqual([event["short_code"] for event in first["events"]], ["code0", "code1"])
+        self.assertEqual([event["short_code"] for event in second["events"]], ["code2"])
+        self.assertEqual(second["events"][0]["event_type"], "created")
+
+    def test_change_feed_requires_admin_key(self):
+        response = self.client.get("/api/v1/events", headers={"X-Admin-Key": ""})
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_event_delivery_stats_when_disabled(self):
+        response = self.client.get("/api/v1/admin/event-delivery")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()["enabled"])
+
+
+if __name__ == '__main__':
+    unittest.main()
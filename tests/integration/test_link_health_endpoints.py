@@ -0,0 +1,84 @@
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from litestar.testing import TestClient
+from app.config.settings import settings
+from app.main import _repository_job, create_app
+from app.models.link_health import LinkProbe
+from app.models.url import URLModel
+from app.repositories.link_health_repository import LinkHealthRepository
+from app.repositories.url_repository import URLRepository
+from app.services.link_health_checker import LinkHealthChecker
+from app.services.lookup_cache import LookupCache
+from app.services.quota_tracker import QuotaTracker
+from tests.sqlite import SQLiteTestCase
+
+
+async def _run_inline(func, *args):
+    return func(*args)
+
+
+class TestLinkHealthEndpoints(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.health = LinkHealthRepository(self.db)
+        patcher = patch.object(settings, "admin_api_key", "test-admin-key")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = TestClient(app=create_app())
+        self.client.headers["X-Admin-Key"] = "test-admin-key"
+
+    def test_stats_when_disabled(self):
+        with patch("app.main.link_health", None):
+            response = self.client.get("/api/v1/admin/link-health")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()["enabled"])
+
+    def test_lists_links_at_failure_threshold(self):
+        repository = URLRepository(self.db)
+        for short_code, failures in [("gone", 3), ("flaky", 1)]:
+            url = repository.create(URLModel(
+                original_url=f"https://example.com/{short_code}",
+                short_code=short_code,
+                created_at=datetime.now(timezone.utc)
+            ))
+            for _ in range(failures):
+                self.health.record([LinkProbe(url.id, short_code, 404, 3.0, None, True)])
+        checker = LinkHealthChecker([self.health], _run_inline, failure_threshold=3)
+
+        with patch("app.main.link_health", checker):
+            response = self.client.get("/api/v1/admin/link-health/broken", params={"limit": 10})
+
+        self.assertEqual(response.status_code, 200)
+        links = response.json()["links"]
+        self.assertEqual([link["short_code"] for link in links], ["gone"])
+        self.assertEqual(links[0]["original_url"], "https://example.com/gone")
+        self.assertEqual(links[0]["consecutive_failures"], 3)
+
+    def test_deactivation_job_drops_cached_redirect_and_releases_quota(self):
+        repository = URLRepository(self.db)
+        url = repository.create(URLModel(
+            original_url="https://example.com/gone",
+            short_code="gone",
+            owner="acme",
+            created_at=datetime.now(timezone.utc)
+        ))
+        cache = LookupCache(ttl=30)
+        cache.set("gone", url)
+        quotas = QuotaTracker(default_quota=10)
+        quotas.sync({"acme": 1})
+
+        with patch("app.main.build_url_repository", lambda: URLRepository(self.db)):
+            deactivate = _repository_job(
+                lambda service, url_id: service.deactivate_url(url_id), cache=cache, quotas=quotas
+            )
+            self.assertTrue(deactivate(url.id))
+
+        self.assertIsNone(cache.get("gone"))
+        self.assertEqual(quotas.usage("acme"), 0)
+        self.assertFalse(repository.get_by_id(url.id).is_active)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import io
+import unittest
+import zipfile
+from app.services.qr_service import QRCodeService, QRRenderCache
+from tests.sqlite import SQLiteTestCase
+
+
+class TestQREndpoints(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.qr_codes = QRCodeService(QRRenderCache(max_memory_bytes=1024 * 1024), max_workers=1)
+        self.addCleanup(self.qr_codes.close)
+        self.client = self.start_app_client(qr_codes=self.qr_codes)
+
+    def test_png_with_strong_etag(self):
+        response = self.client.get("/abc123/qr")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "image/png")
+        self.assertTrue(response.content.startswith(b"\x89PNG"))
+        self.assertRegex(response.headers["etag"], r'^"[0-9a-f]{64}"$')
+
+    def test_matching_etag_returns_304_without_rendering(self):
+        etag = self.client.get("/abc123/qr", params={"format": "svg", "size": 128}).headers["etag"]
+
+        response = self.client.get(
+            "/abc123/qr", params={"format": "svg", "size": 128}, headers={"If-None-Match": etag}
+        )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.qr_codes.renders, 1)
+
+    def test_sizes_are_rounded_up_to_fixed_steps(self):
+        etags = {self.client.get("/abc123/qr", params={"size": size}).headers["etag"] for size in (129, 200, 256)}
+
+        self.assertEqual(len(etags), 1)
+        self.assertEqual(self.qr_codes.renders, 1)
+
+    def test_repeat_request_is_served_from_cache(self):
+        first = self.client.get("/abc123/qr", params={"error": "h"})
+        second = self.client.get("/abc123/qr", params={"error": "h"})
+
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(self.qr_codes.renders, 1)
+        self.assertEqual(self.qr_codes.cache.stats()["memory_hits"], 1)
+
+    def test_batch_streams_zip(self):
+        response = self.client.post(
+            "/api/v1/urls/qr:batch", json={"short_codes": ["def456", "missing", "abc123"], "format": "svg"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/zip")
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            self.assertEqual(archive.namelist(), ["def456.svg", "abc123.svg", "missing.txt"])
+            self.assertIn(b"<svg", archive.read("abc123.svg"))
+            self.assertEqual(archive.read("missing.txt"), b"missing\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -74,6 +74,7 @@ class TestURLEndpoints(unittest.TestCase):
         mock_url.short_code = "abc123"
         mock_url.is_active = True
         mock_url.expires_at = None
+        mock_url.routing_rules = None
         
         mock_service.get_url_by_short_code.return_value = mock_url
         mock_service.is_url_expired.return_value = False
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from app.config.database import DatabaseConfig, DatabaseConnection
+from app.models.url import URLModel
+from app.repositories.url_repository import URLRepository
+
+
+class SQLiteDatabase:
+    """Test mixin: a fresh SQLite file with every table created, instead of PostgreSQL.
+
+    ``self.tmpdir`` is removed after the test, so further database files can go there too.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.db = DatabaseConnection(DatabaseConfig(f"sqlite:///{os.path.join(self.tmpdir.name, 'urls.db')}"))
+        self.db.create_tables()
+        self.addCleanup(self._close_database)
+
+    def start_app_client(self, short_codes=("abc123", "def456"), **patches):
+        """Seed ``short_codes`` and return a TestClient for an app served from this database.
+
+        Any further keyword replaces the ``app.main`` attribute of that name for the test.
+        """
+        # Imported here so tests that only need the database do not build the app module.
+        from litestar.testing import TestClient
+        from app.main import create_app, lookup_cache
+
+        self.repository = URLRepository(self.db)
+        for code in short_codes:
+            self.repository.create(URLModel(
+                original_url=f"https://example.com/{code}",
+                short_code=code,
+                created_at=datetime.now(timezone.utc)
+            ))
+        if lookup_cache is not None:
+            lookup_cache.clear()
+
+        patches.setdefault("build_url_repository", lambda: self.repository)
+        for target, value in patches.items():
+            patcher = patch(f"app.main.{target}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return TestClient(app=create_app())
+
+    def _close_database(self):
+        self.db.close_session()
+        self.db.engine.dispose()
+
+
+class SQLiteTestCase(SQLiteDatabase, unittest.TestCase):
+    pass
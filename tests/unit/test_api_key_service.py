@@ -0,0 +1,99 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+from app.repositories.api_key_repository import APIKeyRepository
+from app.services.api_key_service import APIKeyService, hash_secret, parse_api_key
+from app.services.lookup_cache import LookupCache
+from tests.sqlite import SQLiteTestCase
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAPIKeyService(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repository = APIKeyRepository(self.db)
+        self.service = APIKeyService(self.repository, cache=LookupCache(ttl=60, refresh_ahead=0))
+
+    def authenticate(self, api_key: str):
+        return asyncio.run(self.service.authenticate(api_key))
+
+    def test_created_key_authenticates_as_owner(self):
+        api_key, model = self.service.create_key("acme", link_quota=10)
+
+        identity = self.authenticate(api_key)
+
+        self.assertEqual(identity.owner, "acme")
+        self.assertEqual(identity.key_id, model.key_id)
+        self.assertEqual(identity.link_quota, 10)
+        self.assertNotIn(api_key.rsplit("_", 1)[1], model.key_hash)
+
+    def test_wrong_secret_is_rejected(self):
+        api_key, _ = self.service.create_key("acme")
+        tampered = api_key[:-1] + ("A" if api_key[-1] != "A" else "B")
+
+        self.assertIsNone(self.authenticate(tampered))
+
+    def test_rejected_key_is_not_hashed_again_within_failure_ttl(self):
+        api_key, _ = self.service.create_key("acme")
+        tampered = api_key[:-1] + ("A" if api_key[-1] != "A" else "B")
+
+        with patch("app.services.api_key_service.hash_secret", wraps=hash_secret) as hashed:
+            for _ in range(3):
+                self.assertIsNone(self.authenticate(tampered))
+
+        self.assertEqual(hashed.call_count, 1)
+
+    def test_wrong_secrets_are_throttled_per_key_id(self):
+        clock = FakeClock()
+        self.service = APIKeyService(self.repository, max_failures=3, failure_window=60, clock=clock)
+        api_key, _ = self.service.create_key("acme")
+        key_id = parse_api_key(api_key)[0]
+
+        with patch("app.services.api_key_service.hash_secret", wraps=hash_secret) as hashed:
+            for attempt in range(5):
+                self.assertIsNone(self.authenticate(f"usk_{key_id}_wrong{attempt}"))
+            self.assertIsNone(self.authenticate(api_key))
+
+        self.assertEqual(hashed.call_count, 3)
+        self.assertEqual(self.service.throttled, 3)
+        clock.now = 61
+        self.assertEqual(self.authenticate(api_key).owner, "acme")
+
+    def test_malformed_key_is_rejected_without_lookup(self):
+        with patch.object(self.repository, "get_by_key_id") as get_by_key_id:
+            self.assertIsNone(self.authenticate("not-a-key"))
+            self.assertIsNone(self.authenticate("usk_only"))
+
+        get_by_key_id.assert_not_called()
+
+    def test_verification_is_cached(self):
+        api_key, _ = self.service.create_key("acme")
+
+        with patch("app.services.api_key_service.hash_secret", wraps=hash_secret) as hashed:
+            for _ in range(5):
+                self.assertEqual(self.authenticate(api_key).owner, "acme")
+
+        self.assertEqual(hashed.call_count, 1)
+
+    def test_revoked_key_stops_authenticating(self):
+        api_key, model = self.service.create_key("acme")
+        self.authenticate(api_key)
+
+        self.assertTrue(self.service.revoke(model.key_id))
+
+        self.assertIsNone(self.authenticate(api_key))
+
+    def test_parse_api_key(self):
+        self.assertEqual(parse_api_key("usk_abc_secret_with_underscores"), ("abc", "secret_with_underscores"))
+        self.assertIsNone(parse_api_key("xyz_abc_secret"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+import asyncio
+import threading
+import time
+import unittest
+from app.services.background_tasks import BackgroundTaskManager
+
+
+class TestBackgroundTaskManager(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.manager = BackgroundTaskManager(max_workers=2, restart_backoff=0.01)
+
+    async def asyncTearDown(self):
+        await self.manager.stop(deadline=1)
+
+    async def test_periodic_job_runs_blocking_work_off_the_event_loop(self):
+        threads = []
+        self.manager.add_periodic("tick", 0.01, lambda: threads.append(threading.current_thread().name))
+
+        await self.manager.start()
+        await asyncio.sleep(0.1)
+        await self.manager.stop(deadline=1)
+
+        self.assertGreater(len(threads), 1)
+        self.assertTrue(all(name.startswith("background") for name in threads))
+        self.assertFalse(self.manager.running)
+
+    async def test_periodic_job_failures_are_counted_and_job_keeps_running(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            raise RuntimeError("boom")
+
+        self.manager.add_periodic("flaky", 0.01, flaky, blocking=False)
+
+        await self.manager.start()
+        await asyncio.sleep(0.1)
+
+        stats = self.manager.stats()["jobs"]["flaky"]
+        self.assertGreater(stats["failures"], 1)
+        self.assertEqual(stats["last_error"], "RuntimeError('boom')")
+
+    async def test_queue_worker_processes_items_in_batches(self):
+        batches = []
+        queue = self.manager.add_queue_worker("clicks", batches.append, batch_size=10)
+
+        await self.manager.start()
+        for item in range(25):
+            self.assertTrue(queue.submit(item))
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(sorted(sum(batches, [])), list(range(25)))
+        self.assertTrue(all(len(batch) <= 10 for batch in batches))
+
+    async def test_queue_rejects_items_when_full_or_not_running(self):
+        queue = self.manager.add_queue_worker("clicks", lambda batch: time.sleep(0.2), maxsize=2)
+
+        self.assertFalse(queue.submit(1))
+
+        await self.manager.start()
+        results = [queue.submit(item) for item in range(5)]
+
+        self.assertEqual(results, [True, True, False, False, False])
+        self.assertEqual(queue.rejected, 4)
+
+    async def test_queue_accepts_items_from_worker_threads(self):
+        batches = []
+        queue = self.manager.add_queue_worker("clicks", batches.append, blocking=False)
+
+        await self.manager.start()
+        accepted = await self.manager.run_blocking(queue.submit, "from-thread")
+        await asyncio.sleep(0.05)
+
+        self.assertTrue(accepted)
+        self.assertEqual(batches, [["from-thread"]])
+
+    async def test_stop_drains_queued_items(self):
+        batches = []
+        queue = self.manager.add_queue_worker("clicks", batches.append, batch_size=100)
+
+        await self.manager.start()
+        for item in range(50):
+            queue.submit(item)
+        await self.manager.stop(deadline=1)
+
+        self.assertEqual(sorted(sum(batches, [])), list(range(50)))
+
+    async def test_failed_batch_is_retried(self):
+        batches = []
+
+        def flaky(batch):
+            batches.append(list(batch))
+            if len(batches) == 1:
+                raise RuntimeError("database down")
+
+        queue = self.manager.add_queue_worker("clicks", flaky, batch_size=10)
+
+        await self.manager.start()
+        for item in range(3):
+            queue.submit(item)
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(batches[:2], [[0, 1, 2], [0, 1, 2]])
+        stats = self.manager.stats()["jobs"]["clicks"]
+        self.assertEqual((stats["failures"], stats["queued"], stats["dropped"]), (1, 0, 0))
+
+    async def test_stop_hands_items_cut_off_by_deadline_to_a_final_write(self):
+        handled = []
+        active = []
+        overlapped = []
+        started = threading.Event()
+
+        def slow_first(batch):
+            active.append(batch)
+            overlapped.append(len(active) > 1)
+            if 0 in batch:
+                started.set()
+                time.sleep(0.1)
+            handled.extend(batch)
+            active.remove(batch)
+
+        queue = self.manager.add_queue_worker("clicks", slow_first, batch_size=1)
+
+        await self.manager.start()
+        for item in range(3):
+            queue.submit(item)
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 1)
+        await self.manager.stop(deadline=0.05)
+
+        self.assertEqual(handled, [0, 1, 2])
+        self.assertFalse(any(overlapped))
+        self.assertEqual(queue.dropped, 0)
+
+    async def test_items_are_dropped_when_the_running_batch_outlasts_the_deadline(self):
+        handled = []
+        started = threading.Event()
+
+        def stuck_first(batch):
+            if 0 in batch:
+                started.set()
+                time.sleep(0.3)
+            handled.extend(batch)
+
+        queue = self.manager.add_queue_worker("clicks", stuck_first, batch_size=1)
+
+        await self.manager.start()
+        for item in range(3):
+            queue.submit(item)
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 1)
+        with self.assertLogs("app.services.background_tasks", level="ERROR"):
+            await self.manager.stop(deadline=0.05)
+
+        self.assertEqual(handled, [])
+        self.assertEqual(queue.dropped, 2)
+        await asyncio.sleep(0.4)
+        self.assertEqual(handled, [0])
+
+    async def test_items_still_failing_on_shutdown_are_counted_as_dropped(self):
+        def failing(batch):
+            raise RuntimeError("database down")
+
+        queue = self.manager.add_queue_worker("clicks", failing)
+
+        await self.manager.start()
+        queue.submit(1)
+        await asyncio.sleep(0.02)
+        with self.assertLogs("app.services.background_tasks", level="ERROR"):
+            await self.manager.stop(deadline=1)
+
+        self.assertEqual(queue.dropped, 1)
+
+    async def test_stop_cancels_jobs_after_deadline(self):
+        async def hang():
+            await asyncio.sleep(10)
+
+        queue = self.manager.add_queue_worker("slow", lambda batch: hang(), blocking=False)
+
+        await self.manager.start()
+        queue.submit(1)
+        await asyncio.sleep(0.01)
+        started = time.monotonic()
+        await self.manager.stop(deadline=0.05)
+
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertFalse(self.manager.running)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,260 @@
+import asyncio
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+import httpcore
+from app.models.link_health import LinkProbe
+from app.models.url import URLModel
+from app.repositories.link_health_repository import LinkHealthRepository
+from app.repositories.url_event_repository import URLEventRepository
+from app.repositories.url_repository import URLRepository
+from app.services.destination_stub import DestinationStub
+from app.services.link_health_checker import (
+    CachingNetworkBackend, HostThrottle, LinkHealthChecker, is_public_address
+)
+from app.services.url_service import URLService
+from tests.sqlite import SQLiteTestCase
+
+
+async def _run_inline(func, *args):
+    return func(*args)
+
+
+class LinkHealthTestCase(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repository = URLRepository(self.db)
+        self.health = LinkHealthRepository(self.db)
+
+    def create(self, short_code: str, original_url: str = "https://example.com") -> URLModel:
+        return self.repository.create(URLModel(
+            original_url=original_url,
+            short_code=short_code,
+            created_at=datetime.now(timezone.utc)
+        ))
+
+
+class TestLinkHealthRepository(LinkHealthTestCase):
+    def links_due(self, after_id=0, limit=100, recheck=timedelta(days=1), failing_recheck=timedelta(hours=1)):
+        now = datetime.now(timezone.utc)
+        return self.health.links_due(after_id, limit, now - recheck, now - failing_recheck)
+
+    def test_links_due_pages_by_id_over_active_links(self):
+        urls = [self.create(f"code{i}") for i in range(5)]
+        self.repository.deactivate_url(urls[2].id)
+
+        first = self.links_due(limit=2)
+        second = self.links_due(after_id=first[-1][0], limit=2)
+
+        self.assertEqual([short_code for _, short_code, _ in first], ["code0", "code1"])
+        self.assertEqual([short_code for _, short_code, _ in second], ["code3", "code4"])
+        self.assertEqual(self.links_due(after_id=second[-1][0]), [])
+
+    def test_recently_checked_links_are_not_due_until_recheck_interval(self):
+        healthy = self.create("healthy")
+        failing = self.create("failing")
+        self.health.record([
+            LinkProbe(healthy.id, "healthy", 200, 12.0, None, False),
+            LinkProbe(failing.id, "failing", 404, 8.0, None, True),
+        ])
+
+        self.assertEqual(self.links_due(), [])
+        self.assertEqual([code for _, code, _ in self.links_due(failing_recheck=timedelta(0))], ["failing"])
+        self.assertEqual(len(self.links_due(recheck=timedelta(0), failing_recheck=timedelta(0))), 2)
+
+    def test_record_counts_consecutive_failures_and_resets_on_success(self):
+        url = self.create("abc123")
+        broken = LinkProbe(url.id, "abc123", 503, 5.0, None, True)
+
+        self.assertEqual(self.health.record([broken]), {url.id: 1})
+        self.assertEqual(self.health.record([broken]), {url.id: 2})
+        self.assertEqual(self.health.list_broken(2, 10)[0]["consecutive_failures"], 2)
+
+        self.assertEqual(self.health.record([LinkProbe(url.id, "abc123", 200, 5.0, None, False)]), {})
+        self.assertEqual(self.health.list_broken(1, 10), [])
+        self.assertEqual(self.health.record([broken]), {url.id: 1})
+
+
+class TestHostThrottle(unittest.TestCase):
+    def test_spaces_probe_starts_per_host_and_refuses_long_waits(self):
+        throttle = HostThrottle(max_connections=4, interval=0.05, max_wait=0.12)
+        starts = {}
+
+        async def probe(name, host):
+            if not await throttle.acquire(host):
+                return
+            starts[name] = time.monotonic()
+            throttle.release(host)
+
+        async def run():
+            await asyncio.gather(*(probe(f"a{i}", "a.example") for i in range(4)), probe("b", "b.example"))
+
+        asyncio.run(run())
+
+        self.assertEqual(sorted(starts), ["a0", "a1", "a2", "b"])
+        self.assertGreaterEqual(starts["a1"] - starts["a0"], 0.04)
+        self.assertGreaterEqual(starts["a2"] - starts["a1"], 0.04)
+        self.assertLess(starts["b"] - starts["a0"], 0.04)
+
+
+class TestCachingNetworkBackend(unittest.TestCase):
+    def test_caches_lookups_and_skips_ip_literals(self):
+        backend = CachingNetworkBackend(ttl=60)
+
+        async def run():
+            results = await asyncio.gather(*(backend.resolve("localhost", 80) for _ in range(5)))
+            return results, await backend.resolve("127.0.0.1", 80)
+
+        results, literal = asyncio.run(run())
+
+        self.assertTrue(results[0])
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertEqual(literal, ["127.0.0.1"])
+        self.assertEqual(backend.stats(), {"entries": 1, "lookups": 1, "hits": 4, "refused": 0})
+
+    def test_refuses_non_public_addresses_unless_allowed(self):
+        backend = CachingNetworkBackend()
+
+        async def connect(host):
+            with self.assertRaisesRegex(httpcore.ConnectError, "non-public"):
+                await backend.connect_tcp(host, 80, timeout=1)
+
+        for host in ("127.0.0.1", "169.254.169.254", "10.1.2.3", "localhost", "::ffff:127.0.0.1"):
+            asyncio.run(connect(host))
+
+        self.assertEqual(backend.stats()["refused"], 5)
+        self.assertFalse(is_public_address("224.0.0.1"))
+        self.assertTrue(is_public_address("93.184.216.34"))
+
+
+class TestLinkHealthChecker(LinkHealthTestCase):
+    def setUp(self):
+        super().setUp()
+        self.stub = DestinationStub().start()
+        self.addCleanup(self.stub.stop)
+
+    def checker(self, **kwargs) -> LinkHealthChecker:
+        # The stub listens on loopback, which the checker refuses unless told otherwise.
+        options = {"host_interval": 0, "failing_recheck_interval": 0, "timeout": 2, "allow_private_addresses": True}
+        options.update(kwargs)
+        return LinkHealthChecker([LinkHealthRepository(self.db)], _run_inline, **options)
+
+    def run_checker(self, checker: LinkHealthChecker, runs: int = 1) -> list[int]:
+        async def run():
+            try:
+                return [await checker.run_once() for _ in range(runs)]
+            finally:
+                await checker.close()
+
+        return asyncio.run(run())
+
+    def test_records_status_and_flags_broken_destinations(self):
+        for short_code, path in [("ok", "ok"), ("gone", "status/404"), ("down", "status/503"),
+                                 ("private", "status/403"), ("nohead", "no-head/200")]:
+            self.create(short_code, self.stub.url(path))
+        checker = self.checker(failure_threshold=1)
+
+        self.assertEqual(self.run_checker(checker), [5])
+
+        broken = {link["short_code"]: link for link in checker.broken_links()}
+        self.assertEqual(sorted(broken), ["down", "gone"])
+        self.assertEqual(broken["gone"]["status_code"], 404)
+        self.assertTrue(broken["gone"]["is_active"])
+        self.assertEqual(checker.stats()["checked"], 5)
+        methods = [(method, path) for method, path, _ in self.stub.requests]
+        self.assertIn(("GET", "/no-head/200"), methods)
+        self.assertNotIn(("GET", "/ok"), methods)
+        # Five links on one host, at most two connections at a time, all kept alive.
+        self.assertLessEqual(self.stub.connections, 2)
+
+    def test_unreachable_destination_is_broken(self):
+        self.create("closed", "http://127.0.0.1:1/")
+        checker = self.checker(failure_threshold=1)
+
+        self.run_checker(checker)
+
+        [link] = checker.broken_links()
+        self.assertIsNone(link["status_code"])
+        self.assertIn("ConnectError", link["error"])
+
+    def test_unencodable_host_is_recorded_without_failing_the_run(self):
+        for i in range(3):
+            self.create(f"ok{i}", self.stub.url(f"ok/{i}"))
+        self.create("idna", "http://xn--a.com/")
+        checker = self.checker(failure_threshold=1)
+
+        self.assertEqual(self.run_checker(checker), [4])
+
+        [link] = checker.broken_links()
+        self.assertEqual(link["short_code"], "idna")
+        self.assertIsNotNone(link["error"])
+        self.assertEqual(checker.stats()["checked"], 4)
+
+    def test_slow_destination_times_out(self):
+        self.create("slow", self.stub.url("slow/1000"))
+        checker = self.checker(failure_threshold=1, timeout=0.2)
+
+        self.run_checker(checker)
+
+        [link] = checker.broken_links()
+        self.assertEqual(link["error"], "timeout")
+
+    def test_does_not_probe_private_destinations(self):
+        self.create("loopback", self.stub.url("ok"))
+        self.create("metadata", "http://169.254.169.254/latest/meta-data/")
+        checker = self.checker(failure_threshold=1, allow_private_addresses=False)
+
+        self.run_checker(checker)
+
+        self.assertEqual(self.stub.requests, [])
+        errors = {link["short_code"]: link["error"] for link in checker.broken_links()}
+        self.assertEqual(sorted(errors), ["loopback", "metadata"])
+        self.assertTrue(all("non-public" in error for error in errors.values()))
+
+    def test_redirects_to_private_destinations_are_refused(self):
+        internal = f"http://127.0.0.2:{self.stub.base_url.rsplit(':', 1)[1]}/ok"
+        self.create("redirect", self.stub.url(f"redirect?to={internal}"))
+        checker = self.checker(failure_threshold=1, allow_private_addresses=False)
+
+        # Treat the stub's own address as public, so only the redirect target is refused.
+        with patch("app.services.link_health_checker.is_public_address", lambda address: address == "127.0.0.1"):
+            self.run_checker(checker)
+
+        self.assertEqual([method for method, _, _ in self.stub.requests], ["HEAD"])
+        [link] = checker.broken_links()
+        self.assertIn("non-public", link["error"])
+
+    def test_deactivates_links_that_stay_broken(self):
+        gone = self.create("gone", self.stub.url("status/410"))
+        self.create("ok", self.stub.url("ok"))
+        service = URLService(URLRepository(self.db))
+        checker = self.checker(failure_threshold=2, deactivate=service.deactivate_url)
+
+        self.assertEqual(self.run_checker(checker, runs=3), [2, 1, 0])
+
+        self.assertFalse(URLRepository(self.db).get_by_id(gone.id).is_active)
+        self.assertEqual(checker.stats()["deactivated"], 1)
+        events = URLEventRepository(self.db).list_after(0, 100)
+        self.assertEqual(events[-1]["event_type"], "deactivated")
+        self.assertEqual(events[-1]["short_code"], "gone")
+
+    def test_politeness_defers_links_beyond_the_host_wait_budget(self):
+        for i in range(4):
+            self.create(f"code{i}", self.stub.url(f"ok/{i}"))
+        checker = self.checker(host_interval=0.1, timeout=0.15)
+
+        self.assertEqual(self.run_checker(checker), [4])
+
+        starts = sorted(started for _, _, started in self.stub.requests)
+        self.assertEqual(len(starts), 2)
+        # Measured on arrival, so the first request also carries the connection setup.
+        self.assertGreaterEqual(starts[1] - starts[0], 0.05)
+        self.assertEqual(checker.stats()["deferred"], 2)
+        # Deferred links were not recorded, so they are still due.
+        now = datetime.now(timezone.utc)
+        self.assertEqual(len(LinkHealthRepository(self.db).links_due(0, 10, now - timedelta(days=1), now)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
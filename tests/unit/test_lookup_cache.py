@@ -0,0 +1,190 @@
+import asyncio
+import threading
+import unittest
+from app.services.lookup_cache import LookupCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLookupCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = LookupCache(ttl=30, refresh_ahead=5, clock=self.clock)
+
+    def lookup(self, key, loader):
+        return asyncio.run(self.cache.get_or_load(key, loader))
+
+    def test_caches_loaded_value(self):
+        loader_calls = []
+
+        def loader(key):
+            loader_calls.append(key)
+            return f"value-{key}"
+
+        self.assertEqual(self.lookup("abc123", loader), "value-abc123")
+        self.assertEqual(self.lookup("abc123", loader), "value-abc123")
+
+        self.assertEqual(loader_calls, ["abc123"])
+        stats = self.cache.stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_loads_off_the_event_loop(self):
+        loader_threads = []
+
+        def loader(key):
+            loader_threads.append(threading.current_thread())
+            return "value"
+
+        self.lookup("abc123", loader)
+
+        self.assertIsNot(loader_threads[0], threading.current_thread())
+
+    def test_does_not_cache_none(self):
+        loader_calls = []
+
+        def loader(key):
+            loader_calls.append(key)
+            return None
+
+        self.assertIsNone(self.lookup("missing", loader))
+        self.assertIsNone(self.lookup("missing", loader))
+
+        self.assertEqual(len(loader_calls), 2)
+
+    def test_reloads_after_expiry(self):
+        values = iter(["first", "second"])
+        self.lookup("abc123", lambda key: next(values))
+
+        self.clock.now = 31
+        result = self.lookup("abc123", lambda key: next(values))
+
+        self.assertEqual(result, "second")
+
+    def test_concurrent_misses_share_one_load(self):
+        release = threading.Event()
+        loader_calls = []
+
+        def loader(key):
+            loader_calls.append(key)
+            release.wait(5)
+            return "value"
+
+        async def run():
+            lookups = [asyncio.ensure_future(self.cache.get_or_load("abc123", loader)) for _ in range(10)]
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(*lookups)
+
+        results = asyncio.run(run())
+
+        self.assertEqual(loader_calls, ["abc123"])
+        self.assertEqual(results, ["value"] * 10)
+        self.assertEqual(self.cache.stats()["coalesced"], 9)
+
+    def test_concurrent_waiters_receive_loader_error(self):
+        release = threading.Event()
+
+        def loader(key):
+            release.wait(5)
+            raise RuntimeError("database down")
+
+        async def run():
+            lookups = [asyncio.ensure_future(self.cache.get_or_load("abc123", loader)) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(*lookups, return_exceptions=True)
+
+        errors = asyncio.run(run())
+
+        self.assertEqual([str(error) for error in errors], ["database down"] * 3)
+        self.assertEqual(self.cache.stats()["coalesced"], 2)
+
+    def test_refresh_ahead_serves_stale_value_while_revalidating_in_background(self):
+        self.lookup("abc123", lambda key: "old")
+        self.clock.now = 26
+        release = threading.Event()
+
+        def slow_loader(key):
+            release.wait(5)
+            return "new"
+
+        async def run():
+            first = await self.cache.get_or_load("abc123", slow_loader)
+            second = await self.cache.get_or_load("abc123", lambda key: self.fail("should not load"))
+            release.set()
+            while self.cache.stats()["in_flight"]:
+                await asyncio.sleep(0.01)
+            return first, second
+
+        self.assertEqual(asyncio.run(run()), ("old", "old"))
+
+        self.assertEqual(self.lookup("abc123", lambda key: "unused"), "new")
+        stats = self.cache.stats()
+        self.assertEqual(stats["refreshes"], 1)
+        self.assertEqual(stats["stale_served"], 1)
+
+    def test_failed_refresh_keeps_serving_cached_value(self):
+        self.lookup("abc123", lambda key: "old")
+        self.clock.now = 26
+
+        def failing_loader(key):
+            raise RuntimeError("database down")
+
+        async def run():
+            value = await self.cache.get_or_load("abc123", failing_loader)
+            while self.cache.stats()["in_flight"]:
+                await asyncio.sleep(0.01)
+            return value
+
+        with self.assertLogs("app.services.lookup_cache", level="WARNING"):
+            self.assertEqual(asyncio.run(run()), "old")
+        self.assertEqual(self.lookup("abc123", failing_loader), "old")
+        self.assertEqual(self.cache.stats()["load_errors"], 1)
+
+    def test_invalidate_during_load_does_not_cache_the_result(self):
+        release = threading.Event()
+
+        def loader(key):
+            release.wait(5)
+            return "loaded before invalidation"
+
+        async def run():
+            lookup = asyncio.ensure_future(self.cache.get_or_load("abc123", loader))
+            await asyncio.sleep(0.05)
+            self.cache.invalidate("abc123")
+            release.set()
+            return await lookup
+
+        self.assertEqual(asyncio.run(run()), "loaded before invalidation")
+        self.assertIsNone(self.cache.get("abc123"))
+
+    def test_evicts_least_recently_used(self):
+        cache = LookupCache(ttl=30, max_entries=2, clock=self.clock)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_invalidate_and_purge_expired(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.invalidate("a")
+        self.clock.now = 31
+
+        self.assertEqual(self.cache.purge_expired(), 1)
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
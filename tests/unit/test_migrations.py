@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from sqlalchemy import inspect
+from datetime import datetime, timezone
+from app.config.database import (
+    DatabaseConfig, DatabaseConnection, apply_sql_migrations, list_migrations, run_migrations, split_statements
+)
+from app.models.url import URLModel
+from app.repositories.url_event_repository import URLEventRepository
+from app.repositories.url_repository import URLRepository
+
+# The urls table as the first release created it, before any later column.
+_BASELINE_URLS_TABLE = """
+CREATE TABLE urls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    original_url VARCHAR NOT NULL,
+    short_code VARCHAR NOT NULL UNIQUE,
+    created_at DATETIME NOT NULL,
+    click_count INTEGER NOT NULL,
+    expires_at DATETIME,
+    is_active BOOLEAN NOT NULL
+)
+"""
+
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.migrations_dir = Path(tmpdir.name) / "migrations"
+        self.migrations_dir.mkdir()
+        self.db = DatabaseConnection(DatabaseConfig(f"sqlite:///{os.path.join(tmpdir.name, 'urls.db')}"))
+        self.addCleanup(self.db.engine.dispose)
+
+    def write(self, name: str, sql: str):
+        (self.migrations_dir / name).write_text(sql)
+
+    def columns(self, table: str) -> set[str]:
+        return {column["name"] for column in inspect(self.db.engine).get_columns(table)}
+
+    def versions(self) -> list[int]:
+        with self.db.engine.connect() as connection:
+            return [row[0] for row in connection.exec_driver_sql("SELECT version FROM schema_migrations ORDER BY version")]
+
+    def test_database_without_version_table_is_upgraded_from_version_one(self):
+        self.write("001_create.sql", "CREATE TABLE urls (id INTEGER PRIMARY KEY, short_code TEXT);")
+        self.write("002_add_note.sql", "-- A comment line.\nALTER TABLE urls ADD COLUMN note TEXT;\nCREATE INDEX idx_note ON urls(note);")
+        self.db.execute_migration("CREATE TABLE urls (id INTEGER PRIMARY KEY, short_code TEXT);")
+
+        self.assertEqual(apply_sql_migrations(self.db, self.migrations_dir), [2])
+        self.assertEqual(apply_sql_migrations(self.db, self.migrations_dir), [])
+
+        self.assertIn("note", self.columns("urls"))
+        self.assertEqual(self.versions(), [1, 2])
+
+    def test_empty_database_gets_the_model_schema_and_every_version(self):
+        self.write("001_create.sql", "CREATE TABLE urls (id INTEGER PRIMARY KEY);")
+        self.write("002_broken.sql", "THIS IS NOT SQL;")
+
+        self.assertEqual(apply_sql_migrations(self.db, self.migrations_dir), [])
+
+        self.assertIn("routing_rules", self.columns("urls"))
+        self.assertEqual(self.versions(), [1, 2])
+
+    def test_failed_migration_is_not_recorded(self):
+        self.write("001_create.sql", "CREATE TABLE urls (id INTEGER PRIMARY KEY);")
+        self.write("002_broken.sql", "ALTER TABLE urls ADD COLUMN note TEXT;\nTHIS IS NOT SQL;")
+        self.db.execute_migration("CREATE TABLE urls (id INTEGER PRIMARY KEY);")
+
+        with self.assertRaises(Exception):
+            apply_sql_migrations(self.db, self.migrations_dir)
+
+        self.assertNotIn(2, self.versions())
+
+    def test_baseline_database_serves_the_newer_columns_after_migrating(self):
+        self.db.execute_migration(_BASELINE_URLS_TABLE)
+
+        run_migrations(self.db)
+
+        repository = URLRepository(self.db)
+        repository.create(URLModel(
+            original_url="https://example.com",
+            short_code="abc123",
+            created_at=datetime.now(timezone.utc),
+            routing_rules='[{"country": "DE", "url": "https://example.de"}]',
+            owner="acme",
+        ))
+        url = repository.get_by_short_code("abc123")
+        self.assertEqual(url.owner, "acme")
+        self.assertIn("example.de", url.routing_rules)
+        self.assertEqual(repository.count_active_by_owner(), {"acme": 1})
+        [event] = URLEventRepository(self.db).list_after(0, 10)
+        self.assertEqual(event["short_code"], "abc123")
+        self.assertIn("txid", self.columns("url_events"))
+
+    def test_shipped_migrations_are_numbered_in_sequence(self):
+        migrations = list_migrations()
+
+        self.assertEqual([version for version, _ in migrations], list(range(1, len(migrations) + 1)))
+        for _, path in migrations:
+            self.assertTrue(split_statements(path.read_text()), path.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import asyncio
+import threading
+import time
+import unittest
+from datetime import datetime, timezone
+from litestar import Litestar, get
+from litestar.middleware import DefineMiddleware
+from litestar.testing import TestClient
+from sqlalchemy import create_engine, text
+from app.middleware.profiling import (
+    ProfilingMiddleware,
+    RequestProfiler,
+    RequestTrace,
+    StackSampler,
+    _current_trace,
+    install_sql_tracing,
+    run_in_executor,
+    span,
+)
+from app.models.url import URLModel
+from app.repositories.url_repository import URLRepository
+from app.services.lookup_cache import LookupCache
+from app.services.url_service import URLService
+from tests.sqlite import SQLiteTestCase
+
+
+def busy_wait(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestSpans(unittest.TestCase):
+    def test_span_is_noop_without_trace(self):
+        with span("db"):
+            pass
+
+        self.assertIsNone(_current_trace.get())
+
+    def test_span_and_sql_are_recorded_on_active_trace(self):
+        install_sql_tracing()
+        engine = create_engine("sqlite://")
+        trace = RequestTrace(method="GET", path="/abc123")
+        token = _current_trace.set(trace)
+        try:
+            with span("db"):
+                with engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+        finally:
+            _current_trace.reset(token)
+
+        summary = trace.summary()
+        self.assertIn("db", summary["spans_ms"])
+        self.assertEqual([query["statement"] for query in summary["queries"]], ["SELECT 1"])
+
+
+class TestExecutorTracing(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        install_sql_tracing()
+        self.repository = URLRepository(self.db)
+        self.repository.create(URLModel(
+            original_url="https://example.com", short_code="abc123", created_at=datetime.now(timezone.utc)
+        ))
+
+    def traced(self, coroutine_function) -> RequestTrace:
+        trace = RequestTrace(method="GET", path="/abc123")
+        token = _current_trace.set(trace)
+        try:
+            asyncio.run(coroutine_function())
+        finally:
+            _current_trace.reset(token)
+        return trace
+
+    def test_redirect_lookups_record_their_sql(self):
+        for cache in (None, LookupCache(ttl=30)):
+            with self.subTest(cached=cache is not None):
+                service = URLService(self.repository, cache=cache)
+
+                trace = self.traced(lambda: service.resolve_url("abc123"))
+
+                self.assertEqual(len(trace.queries), 1)
+                self.assertIn("FROM urls", trace.queries[0][0])
+
+    def test_executor_calls_do_not_leak_the_trace(self):
+        self.traced(lambda: run_in_executor(lambda: None))
+
+        self.assertIsNone(asyncio.run(run_in_executor(_current_trace.get)))
+
+
+class TestStackSampler(unittest.TestCase):
+    def test_collects_folded_stacks_for_target_thread(self):
+        sampler = StackSampler(interval=0.001)
+        thread_id = threading.get_ident()
+
+        sampler.start(thread_id)
+        busy_wait(0.05)
+        sampler.stop(thread_id)
+
+        folded = sampler.folded()
+        self.assertGreater(sampler.samples, 0)
+        self.assertIn("busy_wait", folded)
+        stack, count = folded.splitlines()[0].rsplit(" ", 1)
+        self.assertTrue(count.isdigit())
+
+
+class TestProfilingMiddleware(unittest.TestCase):
+    def _client(self, profiler: RequestProfiler) -> TestClient:
+        @get("/slow")
+        async def slow() -> dict:
+            with span("validation"):
+                busy_wait(0.02)
+            return {"ok": True}
+
+        app = Litestar(
+            route_handlers=[slow],
+            middleware=[DefineMiddleware(ProfilingMiddleware, profiler=profiler)],
+        )
+        return TestClient(app=app)
+
+    def test_slow_requests_are_captured_with_spans(self):
+        profiler = RequestProfiler(slow_request_ms=5)
+
+        with self._client(profiler) as client:
+            response = client.get("/slow")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(profiler.slow_requests), 1)
+        captured = profiler.slow_requests[0]
+        self.assertEqual(captured["path"], "/slow")
+        self.assertGreaterEqual(captured["spans_ms"]["validation"], 20)
+        self.assertIn("serialization", captured["spans_ms"])
+
+    def test_fast_requests_are_not_captured(self):
+        profiler = RequestProfiler(slow_request_ms=10_000)
+
+        with self._client(profiler) as client:
+            client.get("/slow")
+
+        self.assertEqual(len(profiler.slow_requests), 0)
+
+    def test_sampled_requests_are_profiled(self):
+        profiler = RequestProfiler(sample_rate=1.0, sample_interval=0.001)
+
+        with self._client(profiler) as client:
+            client.get("/slow")
+
+        self.assertEqual(profiler.profiled_requests, 1)
+        self.assertIn("busy_wait", profiler.sampler.folded())
+
+    def test_executor_threads_working_for_a_sampled_request_are_profiled(self):
+        @get("/offloaded")
+        async def offloaded() -> dict:
+            await run_in_executor(busy_wait, 0.05)
+            return {"ok": True}
+
+        profiler = RequestProfiler(sample_rate=1.0, sample_interval=0.001)
+        app = Litestar(
+            route_handlers=[offloaded],
+            middleware=[DefineMiddleware(ProfilingMiddleware, profiler=profiler)],
+        )
+
+        with TestClient(app=app) as client:
+            client.get("/offloaded")
+
+        self.assertIn("busy_wait", profiler.sampler.folded())
+
+    def test_disabled_profiler(self):
+        self.assertFalse(RequestProfiler().enabled)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import io
+import os
+import tempfile
+import threading
+import unittest
+import zipfile
+from app.qr import qr_digest, render_qr, snap_size
+from app.services.qr_service import QRCodeService, QRRenderCache, stream_zip
+
+
+class TestQRRender(unittest.TestCase):
+    def test_png_and_svg(self):
+        self.assertTrue(render_qr("https://sho.rt/abc123", "png").startswith(b"\x89PNG"))
+        self.assertIn(b"<svg", render_qr("https://sho.rt/abc123", "svg"))
+
+    def test_digest_depends_on_every_input(self):
+        base = qr_digest("https://sho.rt/abc123", "png", 256, "m")
+
+        self.assertEqual(base, qr_digest("https://sho.rt/abc123", "png", 256, "m"))
+        self.assertNotEqual(base, qr_digest("https://sho.rt/abc124", "png", 256, "m"))
+        self.assertNotEqual(base, qr_digest("https://sho.rt/abc123", "svg", 256, "m"))
+        self.assertNotEqual(base, qr_digest("https://sho.rt/abc123", "png", 512, "m"))
+        self.assertNotEqual(base, qr_digest("https://sho.rt/abc123", "png", 256, "h"))
+
+
+class TestSnapSize(unittest.TestCase):
+    def test_rounds_up_to_fixed_steps(self):
+        self.assertEqual([snap_size(size) for size in (64, 65, 200, 256, 2000, 2048, 5000)],
+                         [64, 128, 256, 256, 2048, 2048, 2048])
+
+
+class TestQRRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_memory_tier_is_bounded_by_bytes(self):
+        cache = QRRenderCache(max_memory_bytes=25)
+
+        for digest in ("a" * 64, "b" * 64, "c" * 64):
+            cache.put(digest, b"x" * 10)
+
+        self.assertIsNone(cache.get("a" * 64))
+        self.assertEqual(cache.get("c" * 64), b"x" * 10)
+        self.assertEqual(cache.stats()["memory_bytes"], 20)
+
+    def test_disk_tier_survives_restart_and_promotes(self):
+        cache = QRRenderCache(max_memory_bytes=1000, disk_dir=self.tmpdir.name, max_disk_bytes=1000)
+        cache.put("a" * 64, b"image")
+
+        reopened = QRRenderCache(max_memory_bytes=1000, disk_dir=self.tmpdir.name, max_disk_bytes=1000)
+
+        self.assertEqual(reopened.get("a" * 64), b"image")
+        self.assertEqual(reopened.get("a" * 64), b"image")
+        stats = reopened.stats()
+        self.assertEqual((stats["disk_hits"], stats["memory_hits"]), (1, 1))
+
+    def test_disk_tier_evicts_oldest_files(self):
+        cache = QRRenderCache(max_memory_bytes=0, disk_dir=self.tmpdir.name, max_disk_bytes=25)
+
+        for digest in ("a" * 64, "b" * 64, "c" * 64):
+            cache.put(digest, b"x" * 10)
+
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir.name, "aa", "a" * 64)))
+        self.assertIsNone(cache.get("a" * 64))
+        self.assertEqual(cache.get("b" * 64), b"x" * 10)
+        self.assertEqual(cache.stats()["disk_bytes"], 20)
+
+
+class TestQRCodeService(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.service = QRCodeService(QRRenderCache(max_memory_bytes=10 * 1024 * 1024), max_workers=2, chunk_size=3)
+        self.addCleanup(self.service.close)
+
+    async def test_repeat_render_is_served_from_cache(self):
+        first = await self.service.render("https://sho.rt/abc123", "png", 256, "m")
+        second = await self.service.render("https://sho.rt/abc123", "png", 256, "m")
+
+        self.assertEqual(first, second)
+        self.assertEqual(first[1], render_qr("https://sho.rt/abc123", "png", 256, "m"))
+        self.assertEqual(self.service.renders, 1)
+
+    async def test_single_render_keeps_disk_io_off_the_event_loop(self):
+        with tempfile.TemporaryDirectory() as disk_dir:
+            service = QRCodeService(QRRenderCache(0, disk_dir=disk_dir, max_disk_bytes=1 << 20), max_workers=1)
+            self.addCleanup(service.close)
+            loop_thread = threading.current_thread()
+            calls = []
+            for name in ("get", "put"):
+                original = getattr(service.cache, name)
+                def record(*args, _original=original, _name=name):
+                    calls.append((_name, threading.current_thread() is loop_thread))
+                    return _original(*args)
+                setattr(service.cache, name, record)
+
+            _, content = await service.render("https://sho.rt/abc123", "png", 256, "m")
+
+            self.assertTrue(content.startswith(b"\x89PNG"))
+            self.assertEqual(calls, [("get", False), ("put", False)])
+
+    async def test_batch_renders_misses_in_pool_and_keeps_order(self):
+        items = [(f"code{i}.svg", f"https://sho.rt/code{i}") for i in range(8)]
+        await self.service.render("https://sho.rt/code3", "svg", 128, "m")
+
+        results = [item async for item in self.service.render_batch(items, "svg", 128, "m")]
+
+        self.assertEqual([name for name, _ in results], [name for name, _ in items])
+        self.assertEqual(results[5][1], render_qr("https://sho.rt/code5", "svg", 128, "m"))
+        self.assertEqual(self.service.renders, 8)
+
+        again = [item async for item in self.service.render_batch(items, "svg", 128, "m")]
+        self.assertEqual(again, results)
+        self.assertEqual(self.service.renders, 8)
+
+    async def test_stream_zip(self):
+        async def entries():
+            yield "a.txt", b"first"
+            yield "b.txt", b"second"
+
+        data = b"".join([chunk async for chunk in stream_zip(entries(), compress=True)])
+
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            self.assertEqual(archive.namelist(), ["a.txt", "b.txt"])
+            self.assertEqual(archive.read("b.txt"), b"second")
+
+
+if __name__ == '__main__':
+    unittest.main()
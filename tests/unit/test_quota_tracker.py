@@ -0,0 +1,55 @@
+import unittest
+from app.services.quota_tracker import QuotaExceededError, QuotaTracker
+
+
+class TestQuotaTracker(unittest.TestCase):
+    def test_acquire_up_to_quota(self):
+        tracker = QuotaTracker()
+
+        tracker.acquire("acme", 2)
+        tracker.acquire("acme", 2)
+
+        with self.assertRaises(QuotaExceededError):
+            tracker.acquire("acme", 2)
+        self.assertEqual(tracker.usage("acme"), 2)
+        self.assertEqual(tracker.stats()["rejected"], 1)
+
+    def test_default_quota_applies_when_key_has_none(self):
+        tracker = QuotaTracker(default_quota=1)
+
+        tracker.acquire("acme")
+
+        with self.assertRaises(QuotaExceededError):
+            tracker.acquire("acme")
+
+    def test_zero_quota_is_unlimited(self):
+        tracker = QuotaTracker()
+
+        for _ in range(100):
+            tracker.acquire("acme", 0)
+
+        self.assertEqual(tracker.usage("acme"), 100)
+
+    def test_release_frees_a_slot(self):
+        tracker = QuotaTracker()
+        tracker.acquire("acme", 1)
+
+        tracker.release("acme")
+
+        tracker.acquire("acme", 1)
+        self.assertEqual(tracker.usage("acme"), 1)
+
+    def test_sync_replaces_counters(self):
+        tracker = QuotaTracker()
+        tracker.acquire("acme", 5)
+
+        tracker.sync({"acme": 5, "globex": 1})
+
+        self.assertEqual(tracker.usage("acme"), 5)
+        self.assertEqual(tracker.usage("globex"), 1)
+        with self.assertRaises(QuotaExceededError):
+            tracker.acquire("acme", 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
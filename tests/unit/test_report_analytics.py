@@ -0,0 +1,98 @@
+import csv
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.models.url import Base, URLModel
+import numpy as np
+from app.reports.analytics import STRING, ReportAccumulator, _hosts, read_url_batches, write_reports
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+class TestReportAnalytics(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        rows = [
+            ("https://example.com/a", "aaa111", 50, NOW - timedelta(days=2), None),
+            ("https://Example.com/b", "bbb222", 5, NOW - timedelta(days=2), NOW - timedelta(hours=1)),
+            ("http://user@other.org:8080/x", "ccc333", 20, NOW - timedelta(days=1), NOW + timedelta(hours=5)),
+            ("https://third.net", "ddd444", 1, NOW - timedelta(days=1), NOW + timedelta(days=40)),
+            ("https://other.org/y", "eee555", 30, NOW, None),
+        ]
+        with Session(self.engine) as session:
+            for original_url, short_code, clicks, created_at, expires_at in rows:
+                session.add(URLModel(
+                    original_url=original_url,
+                    short_code=short_code,
+                    click_count=clicks,
+                    created_at=created_at,
+                    expires_at=expires_at,
+                ))
+            session.commit()
+
+    def _accumulate(self, batch_size: int) -> ReportAccumulator:
+        accumulator = ReportAccumulator(top_k=3, now=NOW.timestamp())
+        return accumulator.add_all(read_url_batches(self.engine, batch_size=batch_size))
+
+    def test_reads_table_in_batches(self):
+        batches = list(read_url_batches(self.engine, batch_size=2))
+
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual(batches[0].domains.tolist(), ["example.com", "example.com"])
+
+    def test_hosts_are_parsed_without_per_row_python(self):
+        urls = np.array([
+            "HTTPS://Example.com?q=1", "http://user:pw@other.org:8080/x", "https://third.net#top", "mailto:a@b.c", "",
+        ], dtype=STRING)
+
+        self.assertEqual(_hosts(urls).tolist(), ["example.com", "other.org", "third.net", "", ""])
+
+    def test_top_links(self):
+        report = self._accumulate(batch_size=2).top_links()
+
+        self.assertEqual(report["short_code"], ["aaa111", "eee555", "ccc333"])
+        self.assertEqual(report["click_count"], [50, 30, 20])
+
+    def test_clicks_by_domain(self):
+        report = self._accumulate(batch_size=2).clicks_by_domain()
+
+        self.assertEqual(report["domain"], ["example.com", "other.org", "third.net"])
+        self.assertEqual(report["links"], [2, 2, 1])
+        self.assertEqual(report["clicks"], [55, 50, 1])
+
+    def test_creation_rate(self):
+        report = self._accumulate(batch_size=2).creation_rate()
+
+        self.assertEqual(report["date"], ["2024-05-30", "2024-05-31", "2024-06-01"])
+        self.assertEqual(report["links_created"], [2, 2, 1])
+
+    def test_expiry_distribution(self):
+        report = self._accumulate(batch_size=2).expiry_distribution()
+
+        distribution = dict(zip(report["bucket"], report["links"]))
+        self.assertEqual(distribution["expired"], 1)
+        self.assertEqual(distribution["<1d"], 1)
+        self.assertEqual(distribution["30-365d"], 1)
+        self.assertEqual(distribution["never"], 2)
+
+    def test_results_do_not_depend_on_batch_size(self):
+        self.assertEqual(self._accumulate(batch_size=1).reports(), self._accumulate(batch_size=1000).reports())
+
+    def test_write_reports_as_csv(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            paths = write_reports(self._accumulate(batch_size=2).reports(), output_dir, "csv")
+
+            with open(os.path.join(output_dir, "top_links.csv")) as handle:
+                rows = list(csv.reader(handle))
+
+        self.assertEqual(len(paths), 4)
+        self.assertEqual(rows[0], ["short_code", "id", "click_count"])
+        self.assertEqual(rows[1][0], "aaa111")
+
+
+if __name__ == '__main__':
+    unittest.main()
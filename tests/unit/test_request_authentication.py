@@ -0,0 +1,53 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, Mock
+from app.controllers.url_controller import _authenticate
+from app.exceptions import InvalidAPIKeyException
+from app.services.api_key_service import APIKeyIdentity
+
+
+class TestRequestAuthentication(unittest.TestCase):
+    def setUp(self):
+        self.api_keys = Mock()
+        self.api_keys.authenticate = AsyncMock()
+        self.identity = APIKeyIdentity(key_id="abc", owner="acme", link_quota=None)
+
+    def authenticate(self, request, api_keys, required: bool):
+        return asyncio.run(_authenticate(request, api_keys, required=required))
+
+    def _request(self, headers: dict) -> Mock:
+        request = Mock()
+        request.headers = headers
+        return request
+
+    def test_reads_x_api_key_header(self):
+        self.api_keys.authenticate.return_value = self.identity
+
+        identity = self.authenticate(self._request({"x-api-key": "usk_abc_secret"}), self.api_keys, required=False)
+
+        self.assertEqual(identity, self.identity)
+        self.api_keys.authenticate.assert_called_once_with("usk_abc_secret")
+
+    def test_reads_bearer_token(self):
+        self.api_keys.authenticate.return_value = self.identity
+
+        self.authenticate(self._request({"authorization": "Bearer usk_abc_secret"}), self.api_keys, required=True)
+
+        self.api_keys.authenticate.assert_called_once_with("usk_abc_secret")
+
+    def test_anonymous_allowed_when_not_required(self):
+        self.assertIsNone(self.authenticate(self._request({}), self.api_keys, required=False))
+
+    def test_missing_key_rejected_when_required(self):
+        with self.assertRaises(InvalidAPIKeyException):
+            self.authenticate(self._request({}), self.api_keys, required=True)
+
+    def test_invalid_key_always_rejected(self):
+        self.api_keys.authenticate.return_value = None
+
+        with self.assertRaises(InvalidAPIKeyException):
+            self.authenticate(self._request({"x-api-key": "usk_abc_wrong"}), self.api_keys, required=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import unittest
+from collections import Counter
+from datetime import datetime, timezone
+from pydantic import ValidationError
+from app.schemas.url import CreateURLRequest
+from app.routing import CompiledRouter, classify_device, compile_rules, primary_language
+
+IPHONE = "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) Mobile/15E148 Safari/604.1"
+IPAD = "Mozilla/5.0 (iPad; CPU OS 17_0 like Mac OS X) Safari/604.1"
+ANDROID_TABLET = "Mozilla/5.0 (Linux; Android 13; SM-X700) AppleWebKit/537.36 Chrome/120.0 Safari/537.36"
+DESKTOP = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0 Safari/537.36"
+GOOGLEBOT = "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)"
+
+
+class TestClientClassification(unittest.TestCase):
+    def test_classify_device(self):
+        self.assertEqual(classify_device(IPHONE), "mobile")
+        self.assertEqual(classify_device(IPAD), "tablet")
+        self.assertEqual(classify_device(ANDROID_TABLET), "tablet")
+        self.assertEqual(classify_device(DESKTOP), "desktop")
+        self.assertEqual(classify_device(GOOGLEBOT), "bot")
+        self.assertEqual(classify_device(""), "bot")
+
+    def test_primary_language(self):
+        self.assertEqual(primary_language("de-DE,de;q=0.9,en;q=0.8"), "de")
+        self.assertEqual(primary_language("EN"), "en")
+        self.assertEqual(primary_language(""), "*")
+
+
+class TestCompiledRouter(unittest.TestCase):
+    def test_device_and_language_rules_in_priority_order(self):
+        router = CompiledRouter([
+            {"devices": ["mobile"], "languages": ["de"], "targets": [{"url": "https://m.example.de"}]},
+            {"devices": ["mobile", "tablet"], "targets": [{"url": "https://m.example.com"}]},
+            {"languages": ["de-AT", "fr"], "targets": [{"url": "https://example.eu"}]},
+        ])
+
+        self.assertEqual(router.resolve(IPHONE, "de-DE"), "https://m.example.de")
+        self.assertEqual(router.resolve(IPHONE, "en-US"), "https://m.example.com")
+        self.assertEqual(router.resolve(IPAD, "de"), "https://m.example.com")
+        self.assertEqual(router.resolve(DESKTOP, "fr-FR"), "https://example.eu")
+        self.assertIsNone(router.resolve(DESKTOP, "en-US"))
+
+    def test_time_windows(self):
+        router = CompiledRouter([
+            {
+                "start_at": "2024-11-29T00:00:00Z",
+                "end_at": "2024-12-02T00:00:00Z",
+                "targets": [{"url": "https://example.com/black-friday"}],
+            },
+            {"targets": [{"url": "https://example.com/regular"}]},
+        ])
+        during = datetime(2024, 11, 30, tzinfo=timezone.utc).timestamp()
+        after = datetime(2024, 12, 2, tzinfo=timezone.utc).timestamp()
+
+        self.assertEqual(router.resolve(DESKTOP, now=during), "https://example.com/black-friday")
+        self.assertEqual(router.resolve(DESKTOP, now=after), "https://example.com/regular")
+
+    def test_weighted_split_is_sticky_and_proportional(self):
+        router = CompiledRouter([{"targets": [
+            {"url": "https://example.com/a", "weight": 3},
+            {"url": "https://example.com/b", "weight": 1},
+        ]}])
+
+        counts = Counter(router.resolve(DESKTOP, client_key=f"10.0.0.{i}") for i in range(4000))
+
+        self.assertEqual(router.resolve(DESKTOP, client_key="client"), router.resolve(DESKTOP, client_key="client"))
+        self.assertAlmostEqual(counts["https://example.com/a"] / 4000, 0.75, delta=0.05)
+
+    def test_compile_rules_is_cached_by_rules_text(self):
+        rules = json.dumps([{"targets": [{"url": "https://example.com"}]}])
+
+        self.assertIs(compile_rules(rules), compile_rules(rules))
+
+
+class TestRoutingRuleSchema(unittest.TestCase):
+    def test_rules_are_validated_and_normalized(self):
+        request = CreateURLRequest(
+            original_url="https://example.com",
+            routing_rules=[{"devices": ["mobile"], "targets": [{"url": "https://m.example.com"}]}],
+        )
+
+        self.assertEqual(
+            request.routing_rules,
+            [{"devices": ["mobile"], "targets": [{"url": "https://m.example.com", "weight": 1}]}],
+        )
+
+    def test_invalid_rules_are_rejected(self):
+        with self.assertRaises(ValidationError):
+            CreateURLRequest(original_url="https://example.com", routing_rules=[{"devices": ["fridge"], "targets": []}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+import os
+import tempfile
+import unittest
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from app.config.database import create_shard_connections
+from app.config.settings import parse_shard_rings, parse_shard_urls
+from app.models.url import URLModel
+from app.repositories.url_repository import URLRepository
+from app.repositories.url_core_repository import URLCoreRepository
+from app.repositories.sharded_url_repository import (
+    ConsistentHashRing,
+    ShardedURLRepository,
+    decode_id,
+    encode_id,
+)
+from app.services.url_service import URLService
+
+
+class TestConsistentHashRing(unittest.TestCase):
+    def test_same_key_maps_to_same_shard(self):
+        ring = ConsistentHashRing(range(4))
+
+        self.assertEqual(ring.get("abc123"), ring.get("abc123"))
+
+    def test_adding_shard_moves_only_a_fraction_of_keys(self):
+        keys = [f"code{i}" for i in range(5000)]
+        ring = ConsistentHashRing(range(4))
+        before = {key: ring.get(key) for key in keys}
+
+        ring.add(4)
+        moved = [key for key in keys if ring.get(key) != before[key]]
+
+        self.assertTrue(all(ring.get(key) == 4 for key in moved))
+        self.assertLess(len(moved), len(keys) * 0.35)
+
+    def test_keys_are_spread_across_shards(self):
+        ring = ConsistentHashRing(range(4))
+
+        counts = Counter(ring.get(f"code{i}") for i in range(8000))
+
+        self.assertEqual(set(counts), {0, 1, 2, 3})
+        self.assertGreater(min(counts.values()), 1000)
+
+    def test_id_round_trip(self):
+        self.assertEqual(decode_id(encode_id(3, 42)), (3, 42))
+
+    def test_parse_shard_urls_reads_explicit_slots(self):
+        self.assertEqual(
+            parse_shard_urls("4=sqlite:///a.db, 7=postgresql://db/urls?sslmode=require"),
+            {4: "sqlite:///a.db", 7: "postgresql://db/urls?sslmode=require"},
+        )
+        self.assertEqual(parse_shard_urls("sqlite:///a.db,sqlite:///b.db"), {0: "sqlite:///a.db", 1: "sqlite:///b.db"})
+        with self.assertRaises(ValueError):
+            parse_shard_urls("1=sqlite:///a.db,sqlite:///b.db")
+
+    def test_parse_shard_rings_newest_first(self):
+        self.assertEqual(parse_shard_rings("0,1,2; 0,1"), [[0, 1, 2], [0, 1]])
+        self.assertEqual(parse_shard_rings("0,1"), [[0, 1]])
+        self.assertEqual(parse_shard_rings(""), [])
+
+
+class TestShardedURLRepository(unittest.TestCase):
+    """Runs against one SQLite file per shard."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        urls = [f"sqlite:///{os.path.join(self.tmpdir.name, f'shard{i}.db')}" for i in range(3)]
+        self.connections = create_shard_connections(urls)
+        for connection in self.connections:
+            connection.create_tables()
+        self.repository = ShardedURLRepository([URLRepository(c) for c in self.connections])
+
+    def tearDown(self):
+        for connection in self.connections:
+            connection.close_session()
+            connection.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def _create(self, short_code: str, **kwargs) -> URLModel:
+        return self.repository.create(URLModel(
+            original_url=f"https://example.com/{short_code}",
+            short_code=short_code,
+            created_at=datetime.now(timezone.utc),
+            **kwargs
+        ))
+
+    def test_create_stores_row_on_hashed_shard(self):
+        url = self._create("abc123")
+
+        slot = self.repository.shard_for_code("abc123")
+        self.assertEqual(decode_id(url.id)[0], slot)
+        for index, shard in enumerate(self.repository.shards):
+            found = shard.get_by_short_code("abc123")
+            self.assertEqual(found is not None, index == slot)
+
+    def test_id_operations_are_routed_by_global_id(self):
+        created = [self._create(f"code{i}") for i in range(12)]
+
+        for url in created:
+            self.assertEqual(self.repository.get_by_id(url.id).short_code, url.short_code)
+        clicked = self.repository.increment_click_count(created[5].id)
+        self.assertEqual(clicked.click_count, 1)
+        self.assertEqual(clicked.id, created[5].id)
+        self.assertTrue(self.repository.deactivate_url(created[7].id))
+        self.assertIsNone(self.repository.get_by_short_code(created[7].short_code))
+
+    def test_get_by_short_codes_groups_lookups_by_shard(self):
+        created = {url.short_code: url for url in (self._create(f"code{i}") for i in range(12))}
+
+        urls = self.repository.get_by_short_codes(list(created) + ["missing"])
+
+        self.assertEqual({url.short_code: url.id for url in urls}, {code: url.id for code, url in created.items()})
+
+    def test_increment_click_counts_routes_to_owning_shards(self):
+        created = [self._create(f"code{i}") for i in range(6)]
+
+        updated = self.repository.increment_click_counts({url.id: 2 for url in created})
+
+        self.assertEqual(updated, 6)
+        self.assertTrue(all(self.repository.get_by_id(url.id).click_count == 2 for url in created))
+
+    def test_cleanup_expired_urls_scatters_to_all_shards(self):
+        past = datetime.utcnow() - timedelta(days=1)
+        for i in range(9):
+            self._create(f"old{i}", expires_at=past)
+        self._create("fresh1")
+
+        self.assertEqual(self.repository.cleanup_expired_urls(), 9)
+
+    def test_core_repository_shards_return_records_with_global_ids(self):
+        repository = ShardedURLRepository([URLCoreRepository(c) for c in self.connections])
+        url = repository.create(URLModel(
+            original_url="https://example.com", short_code="core01", created_at=datetime.now(timezone.utc)
+        ))
+
+        self.assertEqual(decode_id(url.id)[0], repository.shard_for_code("core01"))
+        self.assertEqual(repository.increment_click_count(url.id).click_count, 1)
+
+    def test_service_allocates_codes_round_robin_across_shards(self):
+        service = URLService(self.repository)
+
+        slots = [self.repository.shard_for_code(service.generate_short_code()) for _ in range(6)]
+
+        self.assertEqual(sorted(slots[:3]), [0, 1, 2])
+        self.assertEqual(slots[3:], slots[:3])
+
+    def test_explicit_slots_are_embedded_in_ids(self):
+        repository = ShardedURLRepository([URLRepository(c) for c in self.connections], slots=[5, 9, 2])
+        url = repository.create(URLModel(
+            original_url="https://example.com", short_code="abc123", created_at=datetime.now(timezone.utc)
+        ))
+
+        self.assertEqual(decode_id(url.id)[0], repository.shard_for_code("abc123"))
+        self.assertIn(decode_id(url.id)[0], {5, 9, 2})
+        self.assertEqual(repository.get_by_id(url.id).short_code, "abc123")
+        self.assertIsNone(repository.get_by_id(encode_id(0, decode_id(url.id)[1])))
+
+    def test_lookups_fall_back_to_previous_owner_after_adding_a_shard(self):
+        before = ShardedURLRepository([URLRepository(c) for c in self.connections[:2]], slots=[0, 1])
+        created = {}
+        for i in range(30):
+            created[f"code{i}"] = before.create(URLModel(
+                original_url="https://example.com", short_code=f"code{i}", created_at=datetime.now(timezone.utc)
+            ))
+        after = ShardedURLRepository(
+            [URLRepository(c) for c in self.connections], slots=[0, 1, 2], previous_rings=[[0, 1]]
+        )
+        moved = [code for code in created if after.shard_for_code(code) == 2]
+        self.assertTrue(moved)
+
+        for code, url in created.items():
+            self.assertEqual(after.get_by_short_code(code).id, url.id)
+        self.assertEqual({url.short_code: url.id for url in after.get_by_short_codes(list(created))},
+                         {code: url.id for code, url in created.items()})
+        self.assertTrue(after.deactivate_url(created[moved[0]].id))
+        self.assertIsNone(after.get_by_short_code(moved[0]))
+        without_fallback = ShardedURLRepository([URLRepository(c) for c in self.connections], slots=[0, 1, 2])
+        self.assertIsNone(without_fallback.get_by_short_code(moved[1]))
+
+    def test_lookups_reach_codes_stored_two_expansions_ago(self):
+        def create(repository, short_code):
+            return repository.create(URLModel(
+                original_url="https://example.com", short_code=short_code, created_at=datetime.now(timezone.utc)
+            ))
+
+        one = ShardedURLRepository([URLRepository(self.connections[0])], slots=[0])
+        oldest = {f"old{i}": create(one, f"old{i}") for i in range(20)}
+        two = ShardedURLRepository([URLRepository(c) for c in self.connections[:2]], slots=[0, 1], previous_rings=[[0]])
+        middle = {f"mid{i}": create(two, f"mid{i}") for i in range(20)}
+        three = ShardedURLRepository(
+            [URLRepository(c) for c in self.connections], slots=[0, 1, 2], previous_rings=[[0, 1], [0]]
+        )
+        created = {**oldest, **middle}
+        # Codes stored on shard 0 whose owner moved to shard 2 and, one ring earlier, to shard 1.
+        self.assertTrue([code for code in oldest if two.shard_for_code(code) == 1 and three.shard_for_code(code) == 2])
+
+        for code, url in created.items():
+            self.assertEqual(three.get_by_short_code(code).id, url.id)
+        self.assertEqual({url.short_code: url.id for url in three.get_by_short_codes(list(created))},
+                         {code: url.id for code, url in created.items()})
+        only_last_ring = ShardedURLRepository(
+            [URLRepository(c) for c in self.connections], slots=[0, 1, 2], previous_rings=[[0, 1]]
+        )
+        self.assertTrue(any(only_last_ring.get_by_short_code(code) is None for code in oldest))
+
+    def test_write_cursor_is_shared_by_repositories_built_per_request(self):
+        slots = []
+        for _ in range(6):
+            repository = ShardedURLRepository([URLRepository(c) for c in self.connections])
+            slots.append(repository.shard_for_code(URLService(repository).generate_short_code()))
+
+        self.assertEqual(sorted(slots[:3]), [0, 1, 2])
+        self.assertEqual(slots[3:], slots[:3])
+
+
+if __name__ == '__main__':
+    unittest.main()
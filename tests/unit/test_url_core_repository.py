@@ -0,0 +1,121 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event
+from app.models.url import URLModel, URLRecord
+from app.repositories.url_core_repository import URLCoreRepository
+from app.repositories.url_event_repository import URLEventRepository
+from tests.sqlite import SQLiteTestCase
+
+
+class TestURLCoreRepository(SQLiteTestCase):
+    """The statements are dialect-neutral, so SQLite covers them."""
+
+    def setUp(self):
+        super().setUp()
+        self.repository = URLCoreRepository(self.db)
+        self.statements = []
+        event.listen(self.db.engine, "before_cursor_execute", self._record_statement)
+
+    def _record_statement(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def _create(self, short_code: str = "abc123", **kwargs) -> URLRecord:
+        return self.repository.create(URLModel(
+            original_url="https://example.com",
+            short_code=short_code,
+            created_at=datetime.now(timezone.utc),
+            **kwargs
+        ))
+
+    def _event_types(self) -> list[tuple[str, str]]:
+        return [(event["event_type"], event["short_code"]) for event in URLEventRepository(self.db).list_after(0, 100)]
+
+    def test_create_returns_record_and_writes_event(self):
+        url = self._create()
+
+        self.assertIsInstance(url, URLRecord)
+        self.assertIsNotNone(url.id)
+        self.assertEqual(url.short_code, "abc123")
+        self.assertEqual(url.click_count, 0)
+        self.assertTrue(url.is_active)
+        self.assertEqual(len(self.statements), 2)
+        self.assertIn("url_events", self.statements[1])
+        self.assertEqual(self._event_types(), [("created", "abc123")])
+
+    def test_create_duplicate_short_code_raises(self):
+        self._create()
+
+        with self.assertRaises(Exception) as context:
+            self._create()
+
+        self.assertIn("Failed to create URL", str(context.exception))
+
+    def test_get_by_short_code(self):
+        created = self._create()
+
+        self.assertEqual(self.repository.get_by_short_code("abc123"), created)
+        self.assertIsNone(self.repository.get_by_short_code("missing"))
+
+    def test_get_by_short_codes_uses_one_statement(self):
+        for code in ("abc123", "def456", "ghi789"):
+            self._create(code)
+        self.statements.clear()
+
+        urls = self.repository.get_by_short_codes(["abc123", "ghi789", "missing"])
+
+        self.assertEqual(sorted(url.short_code for url in urls), ["abc123", "ghi789"])
+        self.assertEqual(len(self.statements), 1)
+
+    def test_count_active_by_owner(self):
+        self._create("abc123", owner="acme")
+        self._create("def456", owner="acme")
+        self._create("ghi789", owner="globex", is_active=False)
+        self._create("jkl012")
+
+        self.assertEqual(self.repository.count_active_by_owner(), {"acme": 2})
+
+    def test_get_by_id(self):
+        created = self._create()
+
+        self.assertEqual(self.repository.get_by_id(created.id).short_code, "abc123")
+        self.assertIsNone(self.repository.get_by_id(created.id + 1))
+
+    def test_increment_click_count_returns_updated_record(self):
+        created = self._create()
+        self.statements.clear()
+
+        result = self.repository.increment_click_count(created.id)
+
+        self.assertEqual(result.click_count, 1)
+        self.assertEqual(len(self.statements), 1)
+        self.assertIsNone(self.repository.increment_click_count(created.id + 1))
+
+    def test_increment_click_counts(self):
+        first = self._create("first1")
+        second = self._create("second")
+
+        self.assertEqual(self.repository.increment_click_counts({first.id: 3, second.id: 1}), 2)
+
+        self.assertEqual(self.repository.get_by_id(first.id).click_count, 3)
+        self.assertEqual(self.repository.get_by_id(second.id).click_count, 1)
+
+    def test_deactivate_url(self):
+        created = self._create()
+
+        self.assertTrue(self.repository.deactivate_url(created.id))
+        self.assertIsNone(self.repository.get_by_short_code("abc123"))
+        self.assertTrue(self.repository.deactivate_url(created.id))
+        self.assertFalse(self.repository.deactivate_url(created.id + 1))
+        self.assertEqual(self._event_types(), [("created", "abc123"), ("deactivated", "abc123")])
+
+    def test_cleanup_expired_urls(self):
+        self._create("old111", expires_at=datetime.utcnow() - timedelta(days=1))
+        self._create("new111", expires_at=datetime.utcnow() + timedelta(days=1))
+
+        self.assertEqual(self.repository.cleanup_expired_urls(), 1)
+        self.assertIsNone(self.repository.get_by_short_code("old111"))
+        self.assertEqual(self._event_types()[-1], ("expired", "old111"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,250 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.dialects import postgresql
+from app.config.database import create_shard_connections
+from app.models.url import URLModel
+from app.repositories.sharded_url_repository import ShardedURLRepository
+from app.repositories.url_event_repository import _LIST_AFTER_POSTGRESQL, URLEventRepository
+from app.repositories.url_repository import URLRepository
+from app.services.event_dispatcher import EventDispatcher
+from app.services.event_feed import EventFeed
+from app.services.webhook_receiver import WebhookReceiver
+from tests.sqlite import SQLiteDatabase, SQLiteTestCase
+
+
+def _url(short_code: str, **kwargs) -> URLModel:
+    return URLModel(
+        original_url=f"https://example.com/{short_code}",
+        short_code=short_code,
+        created_at=datetime.now(timezone.utc),
+        **kwargs
+    )
+
+
+class FakeEventRepository:
+    """Serves events at fixed ``(txid, id)`` positions, as PostgreSQL would."""
+
+    def __init__(self, positions: list[tuple[int, int]]):
+        self.positions = positions
+
+    def list_after(self, after_id: int, limit: int, after_txid: int = 0) -> list[dict]:
+        return [
+            {"id": event_id, "txid": txid, "created_at": None}
+            for txid, event_id in self.positions if (txid, event_id) > (after_txid, after_id)
+        ][:limit]
+
+
+class OutboxTestCase(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repository = URLRepository(self.db)
+        self.events = URLEventRepository(self.db)
+
+
+class TestOutboxWrites(OutboxTestCase):
+    def test_create_deactivate_and_expire_write_events(self):
+        url = self.repository.create(_url("abc123"))
+        self.repository.create(_url("old111", expires_at=datetime.utcnow() - timedelta(days=1)))
+
+        self.repository.deactivate_url(url.id)
+        self.repository.deactivate_url(url.id)
+        self.repository.cleanup_expired_urls()
+
+        events = self.events.list_after(0, 100)
+        self.assertEqual(
+            [(event["event_type"], event["short_code"]) for event in events],
+            [("created", "abc123"), ("created", "old111"), ("deactivated", "abc123"), ("expired", "old111")]
+        )
+        self.assertEqual(events[0]["url_id"], url.id)
+        self.assertEqual(events[0]["payload"]["original_url"], "https://example.com/abc123")
+
+    def test_failed_create_writes_no_event(self):
+        self.repository.create(_url("abc123"))
+
+        with self.assertRaises(Exception):
+            self.repository.create(_url("abc123"))
+
+        self.assertEqual(len(self.events.list_after(0, 100)), 1)
+
+    def test_mark_delivered_and_purge(self):
+        for i in range(3):
+            self.repository.create(_url(f"code{i}"))
+        first = self.events.pending(10)[0]
+
+        self.events.mark_delivered([first["id"]])
+
+        self.assertEqual([event["id"] for event in self.events.pending(10)], [first["id"] + 1, first["id"] + 2])
+        self.assertEqual(self.events.purge(datetime.now(timezone.utc) + timedelta(seconds=1)), 1)
+        self.assertEqual(len(self.events.list_after(0, 100)), 2)
+
+
+class TestEventFeed(OutboxTestCase):
+    def test_pages_with_cursor(self):
+        for i in range(5):
+            self.repository.create(_url(f"code{i}"))
+        feed = EventFeed([self.events])
+
+        first, cursor = feed.read(None, 3)
+        second, cursor = feed.read(cursor, 3)
+        third, _ = feed.read(cursor, 3)
+
+        self.assertEqual([event["short_code"] for event in first + second], [f"code{i}" for i in range(5)])
+        self.assertEqual(third, [])
+
+    def test_cursor_carries_transaction_position(self):
+        feed = EventFeed([FakeEventRepository([(7, 3), (7, 4), (9, 2)])])
+
+        first, cursor = feed.read(None, 2)
+        second, cursor = feed.read(cursor, 2)
+
+        self.assertEqual([event["id"] for event in first + second], [3, 4, 2])
+        self.assertEqual(cursor, "9:2")
+        self.assertNotIn("txid", first[0])
+        self.assertEqual(feed.read(cursor, 2)[0], [])
+
+    def test_postgresql_feed_only_returns_events_of_finished_transactions(self):
+        statement = str(_LIST_AFTER_POSTGRESQL.compile(dialect=postgresql.dialect()))
+
+        self.assertIn("(url_events.txid, url_events.id) >", statement)
+        self.assertIn("pg_snapshot_xmin(pg_current_snapshot())", statement)
+        self.assertIn("ORDER BY url_events.txid, url_events.id", statement)
+
+    def test_rejects_malformed_cursor(self):
+        feed = EventFeed([self.events])
+
+        for cursor in ("abc", "1,2", "-1", "1:", "-1:2"):
+            with self.assertRaises(ValueError):
+                feed.read(cursor)
+
+    def test_sharded_feed_uses_global_ids(self):
+        urls = [f"sqlite:///{os.path.join(self.tmpdir.name, f'shard{i}.db')}" for i in range(2)]
+        connections = create_shard_connections(urls)
+        try:
+            for connection in connections:
+                connection.create_tables()
+            sharded = ShardedURLRepository([URLRepository(c) for c in connections])
+            created = {url.short_code: url.id for url in (sharded.create(_url(f"code{i}")) for i in range(6))}
+            feed = EventFeed([URLEventRepository(c, shard_slot=slot) for slot, c in enumerate(connections)])
+
+            events, cursor = feed.read(None, 4)
+            more, cursor = feed.read(cursor, 4)
+
+            self.assertEqual({event["short_code"]: event["url_id"] for event in events + more}, created)
+            self.assertEqual(len(cursor.split(",")), 2)
+        finally:
+            for connection in connections:
+                connection.close_session()
+                connection.engine.dispose()
+
+
+class TestEventDispatcher(SQLiteDatabase, unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repository = URLRepository(self.db)
+        self.events = URLEventRepository(self.db)
+
+    def _receiver(self, **kwargs) -> WebhookReceiver:
+        receiver = WebhookReceiver(**kwargs).start()
+        self.addCleanup(receiver.stop)
+        return receiver
+
+    def _dispatcher(self, *receivers: WebhookReceiver, **kwargs) -> EventDispatcher:
+        dispatcher = EventDispatcher(
+            [self.events], [receiver.url for receiver in receivers],
+            run_blocking=asyncio.to_thread, retry_backoff=0.01, **kwargs
+        )
+        self.addAsyncCleanup(dispatcher.close)
+        return dispatcher
+
+    async def test_delivers_in_batches_and_marks_delivered(self):
+        receiver = WebhookReceiver().start()
+        self.addCleanup(receiver.stop)
+        for i in range(25):
+            url = self.repository.create(_url(f"code{i:02d}"))
+            if i % 5 == 0:
+                self.repository.deactivate_url(url.id)
+        dispatcher = self._dispatcher(receiver, batch_size=4, partitions=3)
+
+        self.assertEqual(await dispatcher.dispatch_once(), 30)
+
+        self.assertEqual(self.events.pending(100), [])
+        self.assertTrue(all(len(batch) <= 4 for batch in receiver.batches))
+        by_code = {}
+        for event in receiver.events:
+            by_code.setdefault(event["short_code"], []).append(event["event_type"])
+        self.assertEqual(by_code["code05"], ["created", "deactivated"])
+        self.assertEqual(await dispatcher.dispatch_once(), 0)
+
+    async def test_retries_failed_posts(self):
+        receiver = WebhookReceiver(fail_first=2).start()
+        self.addCleanup(receiver.stop)
+        self.repository.create(_url("abc123"))
+        dispatcher = self._dispatcher(receiver, max_attempts=3)
+
+        self.assertEqual(await dispatcher.dispatch_once(), 1)
+
+        self.assertEqual(dispatcher.failed_attempts, 2)
+        self.assertEqual(len(receiver.events), 1)
+
+    async def test_undelivered_events_stay_pending(self):
+        receiver = WebhookReceiver(fail_first=100).start()
+        self.addCleanup(receiver.stop)
+        self.repository.create(_url("abc123"))
+        dispatcher = self._dispatcher(receiver, max_attempts=2)
+
+        self.assertEqual(await dispatcher.dispatch_once(), 0)
+
+        self.assertEqual(len(self.events.pending(10)), 1)
+
+    async def test_failing_endpoint_does_not_hold_back_the_others(self):
+        healthy = self._receiver()
+        down = self._receiver(fail_first=2)
+        for i in range(3):
+            self.repository.create(_url(f"code{i}"))
+        dispatcher = self._dispatcher(healthy, down, max_attempts=2, partitions=1)
+
+        self.assertEqual(await dispatcher.dispatch_once(), 0)
+        self.assertEqual(len(healthy.events), 3)
+        self.assertEqual(self.events.pending(10, endpoint=healthy.url), [])
+        self.assertEqual(len(self.events.pending(10, endpoint=down.url)), 3)
+
+        # The endpoint is back: it catches up, and the healthy one is not posted to again.
+        self.assertEqual(await dispatcher.dispatch_once(), 3)
+        self.assertEqual(len(healthy.events), 3)
+        self.assertEqual(len(down.events), 3)
+        self.assertEqual(self.events.pending(10), [])
+        with self.db.engine.connect() as connection:
+            self.assertEqual(connection.exec_driver_sql("SELECT COUNT(*) FROM url_event_deliveries").scalar(), 0)
+
+    async def test_dead_letters_events_that_stay_undelivered(self):
+        down = self._receiver(fail_first=100)
+        self.repository.create(_url("abc123"))
+        dispatcher = self._dispatcher(down, max_attempts=1, dead_letter_after=3600)
+        await dispatcher.dispatch_once()
+        dispatcher.dead_letter_after = 0
+
+        with self.assertLogs("app.services.event_dispatcher", level="ERROR"):
+            self.assertEqual(await dispatcher.dispatch_once(), 0)
+
+        self.assertEqual(dispatcher.stats()["dead_lettered"], 1)
+        self.assertEqual(self.events.pending(10), [])
+        self.assertEqual(down.requests, 1)
+        self.assertEqual(self.events.purge(datetime.now(timezone.utc) + timedelta(seconds=1)), 1)
+
+    async def test_skips_a_database_another_instance_is_dispatching(self):
+        receiver = self._receiver()
+        self.repository.create(_url("abc123"))
+        dispatcher = self._dispatcher(receiver)
+
+        with patch.object(self.events, "try_lock_dispatch", return_value=False):
+            self.assertEqual(await dispatcher.dispatch_once(), 0)
+
+        self.assertEqual(receiver.events, [])
+        self.assertEqual(dispatcher.stats()["lock_busy"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -100,6 +100,19 @@ class TestURLRepository(unittest.TestCase):
         self.assertEqual(result.click_count, 6)
         self.mock_session.commit.assert_called_once()
 
+    def test_increment_click_counts_groups_updates_by_increment(self):
+        mock_query = Mock()
+        mock_filter = Mock()
+        mock_query.filter.return_value = mock_filter
+        mock_filter.update.side_effect = [2, 1]
+        self.mock_session.query.return_value = mock_query
+
+        result = self.repository.increment_click_counts({1: 1, 2: 1, 3: 4})
+
+        self.assertEqual(result, 3)
+        self.assertEqual(mock_filter.update.call_count, 2)
+        self.mock_session.commit.assert_called_once()
+
     def test_deactivate_url(self):
         mock_url = URLModel(
             original_url="https://example.com",
@@ -1,8 +1,11 @@
+import asyncio
 import unittest
 from unittest.mock import Mock, patch
 from datetime import datetime, timedelta
 from app.services.url_service import URLService
 from app.models.url import URLModel
+from app.services.lookup_cache import LookupCache
+from app.services.quota_tracker import QuotaExceededError, QuotaTracker
 
 
 class TestURLService(unittest.TestCase):
@@ -73,6 +76,104 @@ class TestURLService(unittest.TestCase):
         self.assertEqual(result, expected_url)
         self.mock_repository.get_by_short_code.assert_called_once_with(short_code)
 
+    def test_resolve_url_uses_cache(self):
+        self.url_service.cache = LookupCache(ttl=30)
+        self.mock_repository.get_by_short_code.return_value = URLModel(
+            id=1, original_url="https://example.com", short_code="abc123"
+        )
+
+        first = asyncio.run(self.url_service.resolve_url("abc123"))
+        second = asyncio.run(self.url_service.resolve_url("abc123"))
+
+        self.mock_repository.get_by_short_code.assert_called_once_with("abc123")
+        self.assertIs(first, second)
+        self.assertEqual(first.original_url, "https://example.com")
+
+    def test_get_urls_by_short_codes_queries_only_cache_misses(self):
+        cache = LookupCache(ttl=30)
+        cache.set("abc123", URLModel(id=1, short_code="abc123"))
+        self.url_service.cache = cache
+        self.mock_repository.get_by_short_codes.return_value = [URLModel(id=2, short_code="def456")]
+
+        urls = self.url_service.get_urls_by_short_codes(["abc123", "def456", "missing", "def456"])
+
+        self.mock_repository.get_by_short_codes.assert_called_once_with(["def456", "missing"])
+        self.assertEqual(sorted(urls), ["abc123", "def456"])
+        self.assertEqual(cache.get("def456").id, 2)
+
+    def test_get_urls_by_short_codes_can_bypass_cache(self):
+        cache = LookupCache(ttl=30)
+        cache.set("abc123", URLModel(id=1, short_code="abc123", click_count=1))
+        self.url_service.cache = cache
+        self.mock_repository.get_by_short_codes.return_value = [URLModel(id=1, short_code="abc123", click_count=7)]
+
+        urls = self.url_service.get_urls_by_short_codes(["abc123"], cached=False)
+
+        self.mock_repository.get_by_short_codes.assert_called_once_with(["abc123"])
+        self.assertEqual(urls["abc123"].click_count, 7)
+        self.assertEqual(cache.get("abc123").click_count, 1)
+
+    def test_deactivate_url_invalidates_cache(self):
+        cache = LookupCache(ttl=30)
+        cache.set("abc123", URLModel(id=1, short_code="abc123"))
+        self.url_service.cache = cache
+        self.mock_repository.get_by_id.return_value = URLModel(id=1, short_code="abc123")
+        self.mock_repository.deactivate_url.return_value = True
+
+        self.assertTrue(self.url_service.deactivate_url(1))
+
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_deactivate_url_invalidates_cache_after_the_deactivation_commits(self):
+        cache = LookupCache(ttl=30)
+        self.url_service.cache = cache
+        active = URLModel(id=1, short_code="abc123", is_active=True)
+        self.mock_repository.get_by_id.return_value = active
+
+        def deactivate(url_id):
+            # A lookup that lands before the commit caches the still-active row.
+            cache.set("abc123", active)
+            return True
+
+        self.mock_repository.deactivate_url.side_effect = deactivate
+
+        self.assertTrue(self.url_service.deactivate_url(1))
+
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_create_url_counts_against_owner_quota(self):
+        self.url_service.quotas = QuotaTracker()
+        self.mock_repository.get_by_short_code.return_value = None
+        self.mock_repository.create.side_effect = lambda url: url
+
+        url = self.url_service.create_url("https://example.com", owner="acme", link_quota=1)
+
+        self.assertEqual(url.owner, "acme")
+        with self.assertRaises(QuotaExceededError):
+            self.url_service.create_url("https://example.com", owner="acme", link_quota=1)
+        self.assertEqual(self.mock_repository.create.call_count, 1)
+
+    def test_create_url_releases_quota_when_insert_fails(self):
+        self.url_service.quotas = QuotaTracker()
+        self.mock_repository.get_by_short_code.return_value = None
+        self.mock_repository.create.side_effect = Exception("Failed to create URL")
+
+        with self.assertRaises(Exception):
+            self.url_service.create_url("https://example.com", owner="acme", link_quota=1)
+
+        self.assertEqual(self.url_service.quotas.usage("acme"), 0)
+
+    def test_deactivate_url_releases_owner_quota(self):
+        quotas = QuotaTracker()
+        quotas.sync({"acme": 1})
+        self.url_service.quotas = quotas
+        self.mock_repository.get_by_id.return_value = URLModel(id=1, short_code="abc123", owner="acme")
+        self.mock_repository.deactivate_url.return_value = True
+
+        self.assertTrue(self.url_service.deactivate_url(1))
+
+        self.assertEqual(quotas.usage("acme"), 0)
+
     def test_increment_click_count(self):
         url_id = 1
         expected_url = URLModel(id=url_id, click_count=5)
@@ -83,6 +184,31 @@ class TestURLService(unittest.TestCase):
         self.assertEqual(result, expected_url)
         self.mock_repository.increment_click_count.assert_called_once_with(url_id)
 
+    def test_increment_click_count_is_queued_when_worker_accepts(self):
+        self.url_service.click_queue = Mock()
+        self.url_service.click_queue.submit.return_value = True
+
+        result = self.url_service.increment_click_count(1)
+
+        self.assertIsNone(result)
+        self.url_service.click_queue.submit.assert_called_once_with(1)
+        self.mock_repository.increment_click_count.assert_not_called()
+
+    def test_increment_click_count_falls_back_when_queue_is_full(self):
+        self.url_service.click_queue = Mock()
+        self.url_service.click_queue.submit.return_value = False
+
+        self.url_service.increment_click_count(1)
+
+        self.mock_repository.increment_click_count.assert_called_once_with(1)
+
+    def test_flush_clicks_aggregates_per_url(self):
+        self.mock_repository.increment_click_counts.return_value = 2
+
+        self.url_service.flush_clicks([1, 2, 1, 1])
+
+        self.mock_repository.increment_click_counts.assert_called_once_with({1: 3, 2: 1})
+
     def test_is_url_expired_returns_false_for_non_expired(self):
         future_date = datetime.utcnow() + timedelta(days=1)
         url = URLModel(expires_at=future_date)